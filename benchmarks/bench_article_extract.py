@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+韭研公社文章正文提取基准测试 - 旧版路径 vs 单次解码+lxml路径
+使用方法：
+  python benchmarks/bench_article_extract.py                    # 使用 benchmarks/pages/*.html
+  python benchmarks/bench_article_extract.py 保存的页面目录       # 使用指定目录下的页面
+  python benchmarks/bench_article_extract.py --rounds 50
+  python benchmarks/bench_article_extract.py --record 5         # 下载 articles/index.json 中最近 5 篇文章的原始页面
+
+--record 把线上原始页面保存到 benchmarks/pages/（与 benchmarks/fixtures/ 一样提交到仓库），已保存的跳过。
+页面目录为空时，才用 articles/ 下已保存的正文文本合成与线上结构一致的页面
+（正文作为 content:"..." 字符串嵌在页面脚本中，/ 和 < 以 \\u002F、\\u003C 转义）。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import glob
+import codecs
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bs4 import BeautifulSoup
+from scraper import extract_article_html, parse_article_html, HTML_PARSER, JIUYAN_HEADERS
+
+PAGES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'pages')
+ARTICLE_INDEX = os.path.join(ROOT_DIR, 'articles', 'index.json')
+
+
+def legacy_extract(html):
+    """旧版 fetch_article_content 的处理流程（不含网络请求）"""
+    match = re.search(r'content:"(.*?)",url:', html, re.DOTALL)
+    if not match:
+        return None
+    content_html = match.group(1)
+    content_html = content_html.replace('\\\\u', '\\u')
+    content_html = codecs.decode(content_html, 'unicode_escape')
+    content_html = content_html.encode('latin1').decode('utf-8')
+    content_html = content_html.replace('\\"', '"')
+    return BeautifulSoup(content_html, "html.parser")
+
+
+def fast_extract(html):
+    """新版处理流程"""
+    content_html = extract_article_html(html)
+    if content_html is None:
+        return None
+    return parse_article_html(content_html)
+
+
+def synthesize_pages(limit=20):
+    """用已保存的文章文本合成页面"""
+    pages = []
+    txt_files = sorted(glob.glob(os.path.join(ROOT_DIR, 'articles', '*', '*', '*.txt')))
+    txt_files += sorted(glob.glob(os.path.join(ROOT_DIR, 'articles', '*', '*.txt')))
+    for path in txt_files[:limit]:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+        if not text.strip():
+            continue
+
+        blocks = []
+        for i, line in enumerate(text.split('\n')):
+            line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            if line.startswith('[图片:'):
+                blocks.append(f'<p><img src="https://img.jiuyangongshe.com/{i}.png" alt=""/></p>')
+            elif line.strip():
+                blocks.append(f'<div><p style="text-align: justify;"><span>{line}</span></p></div>')
+        content = ''.join(blocks)
+
+        literal = json.dumps(content, ensure_ascii=False)[1:-1]
+        literal = literal.replace('/', '\\u002F').replace('<', '\\u003C').replace('>', '\\u003E')
+        padding = ('var x="' + 'a' * 64 + '";') * 2000
+        page = (
+            '<!doctype html><html><head><title>韭研公社</title></head><body><div id="__nuxt"></div>'
+            f'<script>{padding}window.__NUXT__=(function(a,b){{return {{data:[{{detail:{{'
+            f'title:"盘前纪要",content:"{literal}",url:"https:\\u002F\\u002Fwww.jiuyangongshe.com"}}}}]}}}}(1,2));</script>'
+            '</body></html>'
+        )
+        pages.append((os.path.basename(path), page))
+    return pages
+
+
+def record_pages(pages_dir, count):
+    """下载 articles/index.json 中最近 count 篇文章的原始页面，文件名取文章链接的最后一段"""
+    import requests
+    with open(ARTICLE_INDEX, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    urls = [article['url'] for date in sorted(index, reverse=True)
+            for article in index[date].get('articles', []) if article.get('url')]
+    os.makedirs(pages_dir, exist_ok=True)
+    saved = 0
+    for url in urls[:count]:
+        path = os.path.join(pages_dir, url.rstrip('/').rsplit('/', 1)[-1] + '.html')
+        if os.path.exists(path):
+            print(f"已存在，跳过: {os.path.relpath(path, ROOT_DIR)}")
+            continue
+        try:
+            resp = requests.get(url, headers=JIUYAN_HEADERS, timeout=15)
+            resp.raise_for_status()
+        except Exception as e:
+            print(f"下载失败: {url} ({e})")
+            continue
+        if extract_article_html(resp.text) is None:
+            print(f"页面中没有正文数据，跳过: {url}")
+            continue
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(resp.text)
+        saved += 1
+        print(f"已保存: {os.path.relpath(path, ROOT_DIR)}（{len(resp.content) / 1024:.0f}KB）")
+    print(f"共保存 {saved} 个页面")
+
+
+def load_pages(pages_dir):
+    """读取保存的文章页面"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def soup_text(soup):
+    return '\n'.join(soup.stripped_strings) if soup is not None else None
+
+
+def run(pages, rounds):
+    for name, func in (("旧版 (regex + unicode_escape + html.parser)", legacy_extract),
+                       (f"新版 (find + JSON解码 + {HTML_PARSER})", fast_extract)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for _, page in pages:
+                func(page)
+        elapsed = time.perf_counter() - start
+        per_page = elapsed / (rounds * len(pages)) * 1000
+        print(f"{name}: 共 {elapsed:.3f}s，平均每页 {per_page:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章正文提取基准测试')
+    parser.add_argument('pages_dir', nargs='?', default=PAGES_DIR)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--record', type=int, metavar='N', help='下载最近 N 篇文章的原始页面到页面目录后退出')
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.pages_dir, args.record)
+        return
+
+    pages = load_pages(args.pages_dir)
+    source = args.pages_dir
+    if not pages:
+        pages = synthesize_pages()
+        source = '合成页面（articles/ 正文）'
+    if not pages:
+        print("没有可用的页面")
+        return
+
+    total_kb = sum(len(page.encode('utf-8')) for _, page in pages) / 1024
+    print(f"页面来源: {source}，共 {len(pages)} 页，{total_kb:.0f}KB")
+
+    # 先校验两条路径提取的文本一致
+    mismatched = [name for name, page in pages if soup_text(legacy_extract(page)) != soup_text(fast_extract(page))]
+    if mismatched:
+        print(f"⚠️ 文本不一致: {', '.join(mismatched)}")
+    else:
+        print("✓ 两条路径提取的文本一致")
+
+    run(pages, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
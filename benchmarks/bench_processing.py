@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据处理与文本生成基准测试 - 用 benchmarks/fixtures/ 中的真实响应测量各 process_* / format_* / generate_* 函数
+使用方法：
+  python benchmarks/bench_processing.py                   # 全部用例，结果追加到 benchmarks/results/processing.jsonl
+  python benchmarks/bench_processing.py limitup rzrq      # 只跑名称包含关键字的用例
+  python benchmarks/bench_processing.py --rounds 15 --threshold 0.2
+  python benchmarks/bench_processing.py --check           # 有用例比上次慢超过阈值时返回非零退出码
+  python benchmarks/bench_processing.py --no-save         # 只打印，不写结果
+
+样本由 benchmarks/record_fixtures.py 从归档数据生成。
+每个用例先自动确定循环次数（单轮不少于 50ms），再跑 --rounds 轮取每次调用的中位数和最小值。
+结果按提交记录在 benchmarks/results/processing.jsonl，和同一台机器上最近一次结果对比，
+最小值变慢超过阈值（默认 15%）且每次调用慢 50μs 以上的用例标记为退化。
+需要网络的函数（龙虎榜个股详情、单日融资融券）用返回样本响应的假会话 / 假接口替换请求部分，只测解析。
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import scraper
+import ztts_crawler_simple as ztts
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+RESULTS_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'results', 'processing.jsonl')
+MIN_ROUND_TIME = 0.05   # 单轮最短耗时（秒）
+DEFAULT_THRESHOLD = 0.15
+REGRESSION_FLOOR_MS = 0.05   # 每次调用变慢不足 50μs 的不算退化（亚毫秒用例的抖动可达 20% 以上）
+
+
+def load_fixture(name):
+    path = os.path.join(FIXTURES_DIR, name)
+    if not os.path.exists(path):
+        raise SystemExit(f"样本不存在: {path}，先运行 python benchmarks/record_fixtures.py")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FixtureSession:
+    """按请求参数返回样本响应的假会话（龙虎榜个股详情）"""
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def post(self, url, data=None, **kwargs):
+        code = json.loads(data)['Params'][1]
+        return FakeResponse(self.bodies[code])
+
+
+# ---------- 用例 ----------
+
+def build_cases():
+    """返回 [(用例名, 无参函数, 行数)]；样本解析和前置处理在这里完成，不计入耗时"""
+    cases = []
+
+    limit_up = load_fixture('cls_up_down_analysis.json')['data']
+    cases.append(('limitup.process_limit_up_data', lambda: scraper.process_limit_up_data(limit_up), len(limit_up)))
+
+    analysis_raw = load_fixture('jiuyan_action_field.json')['data']
+    analysis = scraper.process_stock_analysis_data(analysis_raw, '2000-01-01')
+    cases.append(('analysis.process_stock_analysis_data',
+                  lambda: scraper.process_stock_analysis_data(analysis_raw, '2000-01-01'), analysis['total_stocks']))
+    cases.append(('analysis.generate_analysis_text_content',
+                  lambda: scraper.generate_analysis_text_content(analysis), analysis['total_stocks']))
+
+    overview_raw = load_fixture('tdx_lhbd_lhbzl.json')
+    overview = scraper.parse_lhb_overview(overview_raw)
+    cases.append(('dragon_tiger.parse_lhb_overview', lambda: scraper.parse_lhb_overview(overview_raw), overview['total_count']))
+
+    detail_bodies = load_fixture('tdx_lhbd_ggxq.json')
+    session = FixtureSession(detail_bodies)
+    trading_date = overview['trading_date']
+    stocks = [stock for stock in overview['stocks'] if stock['code'] in detail_bodies]
+
+    def parse_details():
+        return [scraper.get_single_dragon_tiger_detail(stock['code'], trading_date) for stock in stocks]
+
+    seat_count = sum(body['ResultSets'][1]['Count'] for body in detail_bodies.values())
+    cases.append(('dragon_tiger.get_single_dragon_tiger_detail', parse_details, seat_count))
+
+    with patched(scraper, {'get_http_session': lambda: session}):
+        details = parse_details()
+    dragon_tiger = {
+        "date": trading_date,
+        "update_time": "2000-01-01 00:00:00",
+        "total_count": len(overview['stocks']),
+        "overview": overview,
+        "details": {},
+        "statistics": {"success_count": 0, "failed_count": 0, "no_detail_count": 0}
+    }
+    for stock, detail in zip(stocks, details):
+        detail.update({
+            "name": stock["name"],
+            "market_name": stock["market_name"],
+            "overview_change_percent": stock["change_percent"],
+            "overview_close_price": stock["close_price"]
+        })
+        dragon_tiger["details"][stock['code']] = detail
+        dragon_tiger["statistics"]["success_count"] += detail['status'] == 'success'
+    cases.append(('dragon_tiger.generate_dragon_tiger_text_content',
+                  lambda: scraper.generate_dragon_tiger_text_content(dragon_tiger), seat_count))
+
+    report_rows = load_fixture('tdx_jzfx_ggtzpj.json')['ResultSets'][0]['Content']
+    reports = scraper.format_tdx_reports(report_rows)
+    cases.append(('tdx_reports.format_tdx_reports', lambda: scraper.format_tdx_reports(report_rows), len(report_rows)))
+    cases.append(('tdx_reports.group_reports_by_date', lambda: scraper.group_reports_by_date(reports), len(reports)))
+
+    market_rows = load_fixture('tdx_rzrq_sc.json')['ResultSets'][0]['Content']
+    market_data = scraper.process_rzrq_market_data(market_rows)
+    cases.append(('rzrq.process_rzrq_market_data', lambda: scraper.process_rzrq_market_data(market_rows), len(market_rows)))
+
+    industry_rows = load_fixture('tdx_rzrq_hy.json')['ResultSets'][0]['Content']
+    stock_rows = {code: body['ResultSets'][0]['Content'] for code, body in load_fixture('tdx_rzrq_gg.json').items()}
+    rzrq_date = os.path.basename(load_fixture('manifest.json')['sources']['tdx_rzrq_gg.json'])[:10]
+
+    def process_rzrq_day():
+        return scraper.process_rzrq_data_for_date(rzrq_date, market_data)
+
+    cases.append(('rzrq.process_rzrq_data_for_date', process_rzrq_day,
+                  len(industry_rows) + sum(len(rows) for rows in stock_rows.values())))
+
+    ladder_items = load_fixture('dzh_getZttdData.json')['data']
+    collected = load_fixture('dzh_ztts_collected.json')
+    collected['涨停梯队数据'] = ztts.process_ladder_data(ladder_items)
+    actual_date = datetime.strptime(collected['实际数据日期'], '%Y-%m-%d').date()
+    formatter = ztts.DataFormatter(collected, actual_date)
+    cases.append(('ztts.process_ladder_data', lambda: ztts.process_ladder_data(ladder_items), len(ladder_items)))
+    cases.append(('ztts.DataFormatter.generate_txt', formatter.generate_txt, len(ladder_items)))
+    cases.append(('ztts.DataFormatter.generate_json', formatter.generate_json, len(ladder_items)))
+
+    patches = {
+        'get_http_session': lambda: session,
+        'get_rzrq_industry_data': lambda query_date: industry_rows,
+        'get_rzrq_stock_data': lambda market_code, query_date: stock_rows.get(market_code)
+    }
+    return cases, patches
+
+
+@contextlib.contextmanager
+def patched(module, replacements):
+    originals = {name: getattr(module, name) for name in replacements}
+    for name, func in replacements.items():
+        setattr(module, name, func)
+    try:
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(module, name, func)
+
+
+# ---------- 计时 ----------
+
+def calibrate(func):
+    """确定单轮循环次数，使单轮耗时不少于 MIN_ROUND_TIME"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME:
+            return number
+        number = max(number * 2, int(number * MIN_ROUND_TIME / max(elapsed, 1e-9)) + 1)
+
+
+def measure(func, rounds):
+    """返回每次调用的 (中位数, 最小值) 秒数和单轮循环次数"""
+    number = calibrate(func)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings), min(timings), number
+
+
+# ---------- 结果记录 ----------
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return result.stdout.strip() + ('-dirty' if dirty else '') if result.returncode == 0 else None
+    except OSError:
+        return None
+
+
+def machine_id():
+    return f"{platform.node()}/{platform.machine()}/py{platform.python_version()}"
+
+
+def load_previous(machine):
+    """同一台机器上最近一次的结果记录"""
+    if not os.path.exists(RESULTS_PATH):
+        return None
+    previous = None
+    with open(RESULTS_PATH, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('machine') == machine:
+                previous = record
+    return previous
+
+
+def save_result(record):
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据处理与文本生成基准测试')
+    parser.add_argument('filters', nargs='*', help='只运行名称包含这些关键字的用例')
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='判定退化的变慢比例（按最小值）')
+    parser.add_argument('--check', action='store_true', help='有退化时以退出码 1 结束')
+    parser.add_argument('--no-save', action='store_true', help='不写入结果文件')
+    args = parser.parse_args()
+
+    cases, patches = build_cases()
+    if args.filters:
+        cases = [case for case in cases if any(keyword in case[0] for keyword in args.filters)]
+    if not cases:
+        print("没有匹配的用例")
+        return
+
+    machine = machine_id()
+    previous = load_previous(machine)
+    previous_cases = previous['cases'] if previous else {}
+    if previous:
+        print(f"对比基准: {previous['time']}（{previous.get('commit') or '未知提交'}）")
+
+    print(f"{'用例':<50}{'行数':>7}{'中位数ms':>11}{'最小ms':>10}{'μs/行':>9}{'对比':>9}")
+    results = {}
+    regressions = []
+    for name, func, rows in cases:
+        # 被测函数的进度输出不计入结果，也不打印
+        with patched(scraper, patches), contextlib.redirect_stdout(io.StringIO()):
+            median, best, number = measure(func, args.rounds)
+        results[name] = {
+            "median_ms": round(median * 1000, 4),
+            "min_ms": round(best * 1000, 4),
+            "rows": rows,
+            "loops": number
+        }
+        change = ''
+        if name in previous_cases:
+            # 用最小值比较：中位数受调度和缓存抖动影响大
+            previous_ms = previous_cases[name]['min_ms']
+            ratio = best * 1000 / previous_ms - 1
+            change = f"{ratio:+.0%}"
+            if ratio > args.threshold and best * 1000 - previous_ms > REGRESSION_FLOOR_MS:
+                regressions.append(name)
+                change += ' ⚠️'
+        per_row = median / rows * 1e6 if rows else 0
+        print(f"{name:<50}{rows:>7}{median * 1000:>11.3f}{best * 1000:>10.3f}{per_row:>9.2f}{change:>9}")
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} 个用例比上次慢超过 {args.threshold:.0%}"
+              f"（且超过 {REGRESSION_FLOOR_MS * 1000:.0f}μs）: {', '.join(regressions)}")
+    elif previous_cases:
+        print(f"\n✓ 没有用例比上次慢超过 {args.threshold:.0%}（且超过 {REGRESSION_FLOOR_MS * 1000:.0f}μs）")
+
+    if not args.no_save:
+        save_result({
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "commit": git_commit(),
+            "machine": machine,
+            "rounds": args.rounds,
+            "cases": results
+        })
+        print(f"结果已追加到 {os.path.relpath(RESULTS_PATH, ROOT_DIR)}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
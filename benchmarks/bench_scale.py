@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规模测试 - 用 benchmarks/synthetic.py 生成 1× / 10× / 100× 的上游数据，测量各处理和保存路径的耗时与内存峰值
+使用方法：
+  python benchmarks/bench_scale.py                               # 全部数据源，1× 10× 100×
+  python benchmarks/bench_scale.py rzrq tdx_reports --scales 1 10
+  python benchmarks/bench_scale.py --max-rows 5000000            # 放开行数上限（100× 研报为 300 万行）
+  python benchmarks/bench_scale.py --repeat 1 --no-memory        # 只跑一遍计时，不统计内存
+  python benchmarks/bench_scale.py --no-save                     # 只打印，不写结果
+
+每个数据源按线上流程分成若干步骤，前一步的返回值交给下一步：
+  limit_up      process_limit_up_data → save_limit_up_data（含连板梯队增量更新）
+  dragon_tiger  解析总览和个股详情 → save_dragon_tiger_data（含席位库更新）
+  tdx_reports   crawl_tdx_reports 首次运行（流式格式化并按日期全部落盘）→ smart_archive_new_reports（全部已归档，只做检测）
+  rzrq          process_rzrq_data_for_date → save_rzrq_data + update_rzrq_index
+网络请求替换为返回合成响应的假接口；每次运行都在新的临时目录中进行，不会读写仓库内的数据。
+耗时取 --repeat 次中的最小值；内存峰值另跑一遍，用 tracemalloc 统计每个步骤新增的峰值。
+μs/行 或 字节/行 比 1× 高出 50% 以上的步骤标记为超线性，即数据量继续增长时最先出问题的地方。
+结果追加到 benchmarks/results/scale.jsonl。
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_processing import ROOT_DIR, FixtureSession, patched, git_commit, machine_id
+import synthetic
+import scraper
+
+RESULTS_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'results', 'scale.jsonl')
+SOURCES = ('limit_up', 'dragon_tiger', 'tdx_reports', 'rzrq')
+DEFAULT_MAX_ROWS = 1000000     # 超过此行数的规模跳过（100× 研报 300 万行需要数 GB 内存）
+SUPERLINEAR = 1.5              # 单行耗时或单行内存达到 1× 的 1.5 倍即视为超线性
+
+
+# ---------- 用例 ----------
+
+def build_dragon_tiger_data(overview_raw):
+    """按 crawl_dragon_tiger_data 的方式解析总览和个股详情并组装保存用的数据"""
+    overview = scraper.parse_lhb_overview(overview_raw)
+    data = {
+        "date": overview['trading_date'],
+        "update_time": scraper.get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_count": len(overview['stocks']),
+        "overview": overview,
+        "details": {},
+        "statistics": {"success_count": 0, "failed_count": 0, "no_detail_count": 0}
+    }
+    for stock in overview['stocks']:
+        detail = scraper.get_single_dragon_tiger_detail(stock['code'], overview['trading_date'])
+        detail.update({
+            "name": stock["name"],
+            "market_name": stock["market_name"],
+            "overview_change_percent": stock["change_percent"],
+            "overview_close_price": stock["close_price"]
+        })
+        data["details"][stock['code']] = detail
+        data["statistics"]["success_count"] += detail['status'] == 'success'
+    return data
+
+
+def save_rzrq_day(data):
+    scraper.save_rzrq_data(data)
+    scraper.update_rzrq_index(data['date'], data)
+
+
+def build_case(source, scale, seed):
+    """返回 (行数, [(步骤名, 函数)], 替换的接口)；合成数据在这里生成，不计入耗时"""
+    count = synthetic.volumes(scale)[source]
+
+    if source == 'limit_up':
+        rows = synthetic.gen_limit_up(count, seed=seed)['data']
+        steps = [
+            ('process_limit_up_data', lambda _: scraper.process_limit_up_data(rows)),
+            ('save_limit_up_data', scraper.save_limit_up_data),
+        ]
+        return count, steps, {}
+
+    if source == 'dragon_tiger':
+        overview_raw, details = synthetic.gen_dragon_tiger(count, seed=seed)
+        session = FixtureSession(details)
+        steps = [
+            ('parse_lhb_overview + get_single_dragon_tiger_detail', lambda _: build_dragon_tiger_data(overview_raw)),
+            ('save_dragon_tiger_data', scraper.save_dragon_tiger_data),
+        ]
+        return count * synthetic.SEATS_PER_STOCK, steps, {'get_http_session': lambda: session}
+
+    if source == 'tdx_reports':
+        rows = synthetic.gen_tdx_reports(count, seed=seed)['ResultSets'][0]['Content']
+        steps = [
+            ('crawl_tdx_reports（首次运行）', lambda _: scraper.crawl_tdx_reports()),
+            ('smart_archive_new_reports（无新增）', lambda _: scraper.smart_archive_new_reports()),
+        ]
+        return count, steps, {'get_tdx_reports_data': lambda stream=False: iter(rows) if stream else rows}
+
+    if source == 'rzrq':
+        date_str = scraper.get_beijing_time().strftime('%Y-%m-%d')
+        market, industry, stocks = synthetic.gen_rzrq(count, seed=seed, date_str=date_str)
+        market_data = scraper.process_rzrq_market_data(market['ResultSets'][0]['Content'])
+        industry_rows = industry['ResultSets'][0]['Content']
+        stock_rows = {code: body['ResultSets'][0]['Content'] for code, body in stocks.items()}
+        steps = [
+            ('process_rzrq_data_for_date', lambda _: scraper.process_rzrq_data_for_date(date_str, market_data)),
+            ('save_rzrq_data + update_rzrq_index', save_rzrq_day),
+        ]
+        patches = {
+            'get_rzrq_industry_data': lambda query_date: industry_rows,
+            'get_rzrq_stock_data': lambda market_code, query_date: stock_rows.get(market_code)
+        }
+        return count * len(synthetic.RZRQ_MARKETS), steps, patches
+
+    raise ValueError(f"未知数据源: {source}")
+
+
+# ---------- 运行 ----------
+
+@contextlib.contextmanager
+def scratch_dir():
+    """在临时目录中运行，保存函数写出的相对路径不会落到仓库里"""
+    cwd = os.getcwd()
+    path = tempfile.mkdtemp(prefix='bench_scale_')
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def run_steps(steps, patches, memory=False):
+    """依次执行各步骤，返回 [(耗时秒, 新增内存峰值字节或 None)]"""
+    results = []
+    value = None
+    with scratch_dir(), patched(scraper, patches), contextlib.redirect_stdout(io.StringIO()):
+        if memory:
+            tracemalloc.start()
+        try:
+            for _, func in steps:
+                if memory:
+                    tracemalloc.reset_peak()
+                    base = tracemalloc.get_traced_memory()[0]
+                start = time.perf_counter()
+                value = func(value)
+                elapsed = time.perf_counter() - start
+                results.append((elapsed, tracemalloc.get_traced_memory()[1] - base if memory else None))
+        finally:
+            if memory:
+                tracemalloc.stop()
+    return results
+
+
+def measure_case(source, scale, seed, repeat, memory):
+    rows, steps, patches = build_case(source, scale, seed)
+    runs = [run_steps(steps, patches) for _ in range(repeat)]
+    peaks = [peak for _, peak in run_steps(steps, patches, memory=True)] if memory else [None] * len(steps)
+    return rows, [{
+        "step": name,
+        "seconds": min(run[i][0] for run in runs),
+        "peak_bytes": peaks[i]
+    } for i, (name, _) in enumerate(steps)]
+
+
+# ---------- 报告 ----------
+
+def growth(value, base):
+    if value is None or not base:
+        return None
+    return value / base
+
+
+def format_growth(ratio):
+    if ratio is None:
+        return ''
+    return f"{ratio:.2f}x" + (' ⚠️' if ratio >= SUPERLINEAR else '')
+
+
+def save_result(record):
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按 1× / 10× / 100× 合成数据测量处理和保存路径的规模表现')
+    parser.add_argument('sources', nargs='*', metavar='source',
+                        help=f"数据源（{' / '.join(SOURCES)}），默认全部")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(synthetic.SCALES))
+    parser.add_argument('--max-rows', type=int, default=DEFAULT_MAX_ROWS, help='超过此行数的规模跳过')
+    parser.add_argument('--repeat', type=int, default=3, help='计时重复次数，取最小值')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='不统计内存峰值')
+    parser.add_argument('--no-save', action='store_true', help='不写入结果文件')
+    args = parser.parse_args()
+
+    unknown = [source for source in args.sources if source not in SOURCES]
+    if unknown:
+        parser.error(f"未知数据源: {', '.join(unknown)}（可选 {' / '.join(SOURCES)}）")
+    sources = args.sources or list(SOURCES)
+    scales = sorted(set(args.scales))
+    memory = not args.no_memory
+
+    results = {}
+    flagged = []
+    skipped = []
+    for source in sources:
+        print(f"\n[{source}]")
+        print(f"{'规模':>6}  {'步骤':<52}{'行数':>9}{'秒':>9}{'μs/行':>9}{'峰值MB':>9}{'字节/行':>9}"
+              f"{'μs/行增长':>11}{'内存/行增长':>12}")
+        baseline = {}
+        for scale in scales:
+            rows = synthetic.volumes(scale)[source]
+            if rows > args.max_rows:
+                skipped.append(f"{source} {scale}×")
+                print(f"{scale:>5}×  跳过：{rows:,} 行超过 --max-rows {args.max_rows:,}")
+                continue
+            rows, steps = measure_case(source, scale, args.seed, args.repeat, memory)
+            results.setdefault(source, {})[f"{scale}x"] = {"rows": rows, "steps": steps}
+            for step in steps:
+                per_row = step['seconds'] / rows * 1e6
+                bytes_per_row = step['peak_bytes'] / rows if step['peak_bytes'] is not None else None
+                base = baseline.setdefault(step['step'], (per_row, bytes_per_row))
+                time_growth = growth(per_row, base[0]) if scale != scales[0] else None
+                memory_growth = growth(bytes_per_row, base[1]) if scale != scales[0] else None
+                if any(ratio is not None and ratio >= SUPERLINEAR for ratio in (time_growth, memory_growth)):
+                    flagged.append(f"{source} {scale}× {step['step']}")
+                peak = f"{step['peak_bytes'] / 1024 / 1024:.1f}" if bytes_per_row is not None else '-'
+                per_row_bytes = f"{bytes_per_row:.0f}" if bytes_per_row is not None else '-'
+                print(f"{scale:>5}×  {step['step']:<52}{rows:>9}{step['seconds']:>9.3f}{per_row:>9.2f}"
+                      f"{peak:>9}{per_row_bytes:>9}{format_growth(time_growth):>11}{format_growth(memory_growth):>12}")
+
+    print()
+    if flagged:
+        print(f"⚠️ 超线性（相对 {scales[0]}× 增长 {SUPERLINEAR} 倍以上）:")
+        for name in flagged:
+            print(f"  {name}")
+    else:
+        print(f"✓ 各步骤单行耗时和内存相对 {scales[0]}× 均未超过 {SUPERLINEAR} 倍")
+    if skipped:
+        print(f"跳过: {', '.join(skipped)}")
+
+    if not args.no_save and results:
+        save_result({
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "commit": git_commit(),
+            "machine": machine_id(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "results": results
+        })
+        print(f"结果已追加到 {os.path.relpath(RESULTS_PATH, ROOT_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行启动开销基准测试 - 基于 python -X importtime 统计各入口的导入耗时
+使用方法：
+  python benchmarks/bench_startup.py               # 每个入口运行 5 次取中位数
+  python benchmarks/bench_startup.py --rounds 10
+  python benchmarks/bench_startup.py --top 15      # 同时列出导入最慢的模块
+
+每个入口在新的解释器进程中执行（与 CI 上每次冷启动一致），
+导入耗时 = 顶层模块累计耗时之和 - 空解释器（python -c pass）的同项耗时。
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口 -> 该命令启动阶段实际会导入的内容
+TARGETS = [
+    ('scraper.py（ladder / seats / 帮助）', 'import scraper'),
+    ('scraper.py limitup / rzrq', 'import scraper; scraper.get_http_session()'),
+    ('scraper.py jiuyan', 'import scraper, bs4; scraper.get_http_session()'),
+    ('ztts_crawler_simple.py rebuild_index', 'import ztts_crawler_simple'),
+    ('ztts_crawler_simple.py（涨停梯队接口）', 'import ztts_crawler_simple; ztts_crawler_simple.new_session()'),
+]
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 (顶层累计耗时μs, {模块: 自身耗时μs})"""
+    total = 0
+    self_times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        head, cumulative_us, name = line.split('|', 2)
+        name = name[1:]  # 去掉分隔符后的空格，剩余的前导空格表示嵌套层级
+        if not name.startswith(' '):
+            total += int(cumulative_us)
+        self_times[name.strip()] = int(head.split(':')[1])
+    return total, self_times
+
+
+def run_once(code):
+    """在新进程中执行代码，返回 (墙钟耗时秒, 顶层导入耗时μs, 各模块自身耗时)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total, self_times = parse_importtime(result.stderr)
+    return elapsed, total, self_times
+
+
+def measure(code, rounds):
+    walls, totals, runs = [], [], []
+    for _ in range(rounds):
+        wall, total, self_times = run_once(code)
+        walls.append(wall)
+        totals.append(total)
+        runs.append(self_times)
+    return statistics.median(walls), statistics.median(totals), runs[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行启动开销基准测试')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help='列出导入最慢的前 N 个模块')
+    args = parser.parse_args()
+
+    base_wall, base_total, base_modules = measure('pass', args.rounds)
+    print(f"空解释器: 启动 {base_wall * 1000:.0f}ms，导入 {base_total / 1000:.1f}ms（{args.rounds} 次中位数）\n")
+    print(f"{'入口':<42}{'导入耗时':>10}{'进程耗时':>10}")
+    for label, code in TARGETS:
+        try:
+            wall, total, modules = measure(code, args.rounds)
+        except RuntimeError as e:
+            print(f"{label:<42}失败: {e}")
+            continue
+        print(f"{label:<42}{(total - base_total) / 1000:>8.1f}ms{wall * 1000:>8.0f}ms")
+        if args.top:
+            extra = {name: us for name, us in modules.items() if name not in base_modules}
+            for name, us in sorted(extra.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+                print(f"    {name:<38}{us / 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试样本 - 用已归档的真实数据还原各接口的原始响应，保存到 benchmarks/fixtures/
+使用方法：
+  python benchmarks/record_fixtures.py                   # 每个数据源取最近一个有数据的交易日
+  python benchmarks/record_fixtures.py --date 2025-10-10 # 优先使用指定日期（没有时退回最近一天）
+
+归档文件是处理后的结果，这里按各处理函数的字段映射反推回接口返回的结构
+（财联社涨停池、韭研异动解析、通达信 TQLEX 各 Entry、大智慧 api.php），
+样本与线上响应的字段、行数、数值一致，可以直接喂给 process_* / format_* / parse_* 函数。
+每个文件保存一个接口的完整响应体；按参数区分的接口（个股龙虎榜、分市场融资融券）保存为 {参数: 响应体}。
+"""
+
+import os
+import json
+import glob
+import argparse
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+MANIFEST_FILE = 'manifest.json'
+
+TDX_REPORT_DAYS = 20        # 研报样本覆盖的交易日数（线上一次返回 365 天，这里取最近一段）
+RZRQ_MARKET_CODES = {'沪市': '012001', '深市': '012002', '京市': '012046'}
+RZRQ_STOCK_MARKETS = {'沪市': '1', '深市': '0', '京市': '2'}
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pick_file(pattern, date_str=None, accept=None):
+    """按日期倒序找第一个满足 accept 的归档文件，指定日期存在时优先使用"""
+    paths = sorted((p for p in glob.glob(os.path.join(ROOT_DIR, pattern)) if not p.endswith('index.json')), reverse=True)
+    if date_str:
+        paths.sort(key=lambda p: os.path.basename(p) != f'{date_str}.json')
+    for path in paths:
+        try:
+            data = load_json(path)
+        except ValueError:
+            continue
+        if accept is None or accept(data):
+            return path, data
+    return None, None
+
+
+def tqlex_body(*tables):
+    """通达信 TQLEX 响应体"""
+    return {
+        "ErrorCode": 0,
+        "ResultSets": [{"Count": len(rows), "Content": rows} for rows in tables]
+    }
+
+
+def none_if_missing(value):
+    return None if value in ('--', '', None) else value
+
+
+# ---------- 各接口 ----------
+
+def build_limit_up(date_str):
+    """财联社 up_down_analysis（process_limit_up_data 的输入）"""
+    path, day = pick_file('data/*.json', date_str, lambda d: d.get('stocks'))
+    rows = []
+    for stock in day['stocks']:
+        code, market = stock['code'].split('.')
+        rows.append({
+            "secu_code": market.lower() + code,
+            "secu_name": stock['name'],
+            "change": round(float(stock['change_percent'].rstrip('%')) / 100, 4),
+            "last_px": stock['price'],
+            "time": stock['limit_up_time'],
+            "up_reason": stock['reason'],
+            "plate": [{"secu_name": name} for name in stock['plates'].split('|')] if stock['plates'] else []
+        })
+    return path, {"code": 200, "msg": "", "data": rows}
+
+
+def build_analysis(date_str):
+    """韭研公社 action/field（process_stock_analysis_data 的输入）"""
+    path, day = pick_file('analysis/*.json', date_str, lambda d: d.get('categories'))
+    categories = []
+    for category in day['categories']:
+        categories.append({
+            "name": category['name'],
+            "reason": category['reason'],
+            "list": [{
+                "code": stock['code'],
+                "name": stock['name'],
+                "article": {"action_info": {"time": stock['limit_time'], "expound": stock['analysis']}}
+            } for stock in category['stocks']]
+        })
+    return path, {"errCode": "0", "data": categories}
+
+
+def build_dragon_tiger(date_str):
+    """通达信龙虎榜总览 lhbd_lhbzl 和个股详情 lhbd_ggxq"""
+    path, day = pick_file('dragon_tiger/*.json', date_str, lambda d: d.get('details'))
+    overview = tqlex_body(
+        [[s['code'], s['name'], s['market_code'], s['change_percent'], s['close_price'], s['market_name']]
+         for s in day['overview']['stocks']],
+        [['', '', day['overview']['trading_date']]]
+    )
+
+    details = {}
+    for code, detail in day['details'].items():
+        info = detail.get('lhb_info')
+        if detail.get('status') != 'success' or not info:
+            continue
+        seats = []
+        for seat in detail.get('buy_seats', []) + detail.get('sell_seats', []):
+            seats.append([seat['rank'], '', seat['department_name'], seat['buy_amount'], seat['sell_amount'],
+                          seat['net_amount'], '', seat['direction'], '', '', '', '', seat['label']])
+        details[code] = tqlex_body(
+            [[info['list_code'], info['list_reason'], info['volume'], info['amount'],
+              info['close_price'], info['change_percent']]],
+            seats
+        )
+    return path, overview, details
+
+
+def build_tdx_reports(date_str, days=TDX_REPORT_DAYS):
+    """通达信研报 jzfx_ggtzpj（format_tdx_reports 的输入），取最近若干个交易日"""
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, 'tdx_value', '*', '*.json')), reverse=True)
+    if date_str:
+        paths = [p for p in paths if os.path.basename(p)[:10] <= date_str] or paths
+    rows = []
+    used = []
+    for path in paths[:days]:
+        day = load_json(path)
+        for report in day.get('研报数据', []):
+            eps = report['EPS预测']
+            eps_actual = report['EPS实际值(元)']
+            rows.append([
+                len(rows) + 1,
+                report['证券代码'],
+                report['证券简称'],
+                int(report['报告日期'].replace('-', '')),
+                none_if_missing(report['评级']),
+                none_if_missing(report['评级变化']),
+                none_if_missing(report['目标价']),
+                eps_actual.split('(')[0] if eps_actual != '--' else None,
+                none_if_missing(eps['T年']),
+                none_if_missing(eps['T+1年']),
+                none_if_missing(eps['T+2年']),
+                none_if_missing(report['标题']),
+                '',
+                none_if_missing(report['研究机构']),
+                report['T年度']
+            ])
+        used.append(path)
+    return used, tqlex_body(rows)
+
+
+def build_rzrq(date_str):
+    """通达信融资融券：市场 rzrq_sc（全部归档日期）、行业 rzrq_hy 和分市场个股 rzrq_gg（单日）"""
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, 'tdx_rztq', '*', '*.json')))
+    market_rows = []
+    for path in paths:
+        day = load_json(path)
+        for market, values in (day.get('market_data') or {}).items():
+            market_rows.append([day['date'], RZRQ_MARKET_CODES.get(market, market)] +
+                               [none_if_missing(values[key]) for key in ('融资余额', '融资买入额', '融券余量金额', '融资融券余额')])
+
+    path, day = pick_file('tdx_rztq/*/*.json', date_str,
+                          lambda d: d.get('industry_data') and any(d.get('stock_data', {}).values()))
+    industry = tqlex_body([[
+        row['融券余额(万)'], row['融资余额(亿)'], row['融资买入额(亿)'], row['融资偿还额(亿)'],
+        row['融券卖出量(万)'], row['融券偿还量(万)'], row['融券余量(万)'], row['行业名称']
+    ] for row in day['industry_data']])
+
+    stocks = {}
+    for market, code in RZRQ_STOCK_MARKETS.items():
+        rows = []
+        for i, stock in enumerate(day['stock_data'].get(market, []), 1):
+            values = list(stock.values())[2:]    # 字段顺序与 RzrqStock 一致
+            raw = [value if j in (2, 3) else round(value * 10000, 2) for j, value in enumerate(values)]
+            rows.append([i, stock['股票代码'], stock['股票名称']] + raw)
+        stocks[code] = tqlex_body(rows)
+    return path, tqlex_body(market_rows), industry, stocks
+
+
+def build_ztts(date_str):
+    """大智慧 getZttdData（process_ladder_data 的输入）和 DataFormatter 使用的采集结果"""
+    path, day = pick_file('dzh_ztts/*/*.json', date_str,
+                          lambda d: any(d.get('涨停梯队', {}).values()))
+    items = []
+    for stocks in day['涨停梯队'].values():
+        for stock in stocks:
+            items.append({
+                "code": stock['code'],
+                "name": stock['name'],
+                "close": stock['close_price'],
+                "zf": round(stock['change_rate'] / 100, 4),
+                "fbrate": round(stock['turnover_rate'] / 100, 4),
+                "dnum": stock['dnum'],
+                "bnum": stock['bnum']
+            })
+    collected = {key: value for key, value in day['原始数据'].items() if key != '涨停梯队数据'}
+    collected['实际数据日期'] = day['报告信息']['数据日期']
+    return path, {"code": 0, "msg": "", "data": items}, collected
+
+
+# ---------- 写出 ----------
+
+def write_fixture(name, data):
+    path = os.path.join(FIXTURES_DIR, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    return os.path.getsize(path)
+
+
+def relative(path):
+    return os.path.relpath(path, ROOT_DIR).replace(os.sep, '/')
+
+
+def build_all(date_str=None):
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    sources = {}
+    files = {}
+
+    path, body = build_limit_up(date_str)
+    files['cls_up_down_analysis.json'] = body
+    sources['cls_up_down_analysis.json'] = relative(path)
+
+    path, body = build_analysis(date_str)
+    files['jiuyan_action_field.json'] = body
+    sources['jiuyan_action_field.json'] = relative(path)
+
+    path, overview, details = build_dragon_tiger(date_str)
+    files['tdx_lhbd_lhbzl.json'] = overview
+    files['tdx_lhbd_ggxq.json'] = details
+    sources['tdx_lhbd_lhbzl.json'] = sources['tdx_lhbd_ggxq.json'] = relative(path)
+
+    paths, body = build_tdx_reports(date_str)
+    files['tdx_jzfx_ggtzpj.json'] = body
+    sources['tdx_jzfx_ggtzpj.json'] = f"{relative(paths[-1])} ~ {relative(paths[0])}"
+
+    path, market, industry, stocks = build_rzrq(date_str)
+    files['tdx_rzrq_sc.json'] = market
+    files['tdx_rzrq_hy.json'] = industry
+    files['tdx_rzrq_gg.json'] = stocks
+    sources['tdx_rzrq_sc.json'] = 'tdx_rztq/*/*.json'
+    sources['tdx_rzrq_hy.json'] = sources['tdx_rzrq_gg.json'] = relative(path)
+
+    path, ladder, collected = build_ztts(date_str)
+    files['dzh_getZttdData.json'] = ladder
+    files['dzh_ztts_collected.json'] = collected
+    sources['dzh_getZttdData.json'] = sources['dzh_ztts_collected.json'] = relative(path)
+
+    print(f"{'样本':<28}{'KB':>8}  来源")
+    for name, data in files.items():
+        size = write_fixture(name, data)
+        print(f"{name:<28}{size / 1024:>8.0f}  {sources[name]}")
+
+    manifest = {
+        "generated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "sources": sources
+    }
+    with open(os.path.join(FIXTURES_DIR, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"\n样本已保存到 {relative(FIXTURES_DIR)}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用归档数据生成基准测试样本')
+    parser.add_argument('--date', help='优先使用的数据日期 YYYY-MM-DD')
+    args = parser.parse_args()
+    build_all(args.date)
+
+
+if __name__ == "__main__":
+    main()
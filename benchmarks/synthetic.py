@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成上游数据 - 按 1× / 10× / 100× 规模生成与线上结构一致的接口响应，用于规模测试
+使用方法：
+  python benchmarks/synthetic.py --scale 10 --out /tmp/synthetic_10x   # 写出一套样本目录
+  python mock_upstream.py --fixtures /tmp/synthetic_10x                # 让模拟上游服务回放合成数据
+
+  from synthetic import volumes, gen_limit_up, gen_dragon_tiger, gen_tdx_reports, gen_rzrq
+
+1× 为当前日常量级（取整），各数据源的行数：
+  涨停池         50 只        100× 为 5,000 只
+  龙虎榜         100 只 × 10 个席位   10× 为 1,000 只
+  研报接口       30,000 行（365 天）  10× 为 300,000 行
+  融资融券个股   3 个市场 × 2,000 行  10× 为 3 × 20,000 行
+字符串字段（名称、原因、营业部、标题等）轮流取自 benchmarks/fixtures/ 中的真实样本，长度分布与线上一致；
+代码、日期、金额按序号和随机数生成，保证代码和研报唯一，同一 seed 生成的数据相同。
+"""
+
+import os
+import json
+import random
+import shutil
+import argparse
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+MANIFEST_FILE = 'manifest.json'
+
+SCALES = (1, 10, 100)
+BASE_VOLUMES = {
+    'limit_up': 50,
+    'dragon_tiger': 100,
+    'tdx_reports': 30000,
+    'rzrq': 2000,
+}
+SEATS_PER_STOCK = 10
+REPORT_DAYS = 365
+
+# 市场代码前缀 -> 起始代码
+LIMIT_UP_MARKETS = (('sh', 600000), ('sz', 1), ('sz', 300000))
+RZRQ_MARKETS = {'1': 600000, '0': 1, '2': 830000}
+
+
+def load_fixture(name):
+    path = os.path.join(FIXTURES_DIR, name)
+    if not os.path.exists(path):
+        raise SystemExit(f"样本不存在: {path}，先运行 python benchmarks/record_fixtures.py")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def volumes(scale):
+    return {source: count * scale for source, count in BASE_VOLUMES.items()}
+
+
+def stock_code(i, markets):
+    """第 i 只股票的 (市场前缀, 6 位代码)，轮流分配到各市场"""
+    prefix, start = markets[i % len(markets)]
+    return prefix, f"{start + i // len(markets):06d}"
+
+
+def tqlex_body(*tables):
+    return {
+        "ErrorCode": 0,
+        "ResultSets": [{"Count": len(rows), "Content": rows} for rows in tables]
+    }
+
+
+# ---------- 各数据源 ----------
+
+def gen_limit_up(count, seed=0):
+    """财联社涨停池响应（process_limit_up_data 的输入在 ['data']）"""
+    rng = random.Random(seed)
+    templates = load_fixture('cls_up_down_analysis.json')['data']
+    today = datetime.now().strftime('%Y-%m-%d')
+    rows = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        prefix, code = stock_code(i, LIMIT_UP_MARKETS)
+        seconds = rng.randrange(0, 4 * 3600)   # 9:30 之后 4 小时内
+        rows.append({
+            "secu_code": prefix + code,
+            "secu_name": template['secu_name'],
+            "change": round(rng.choice((0.1, 0.2, 0.3)) + rng.uniform(-0.002, 0.002), 4),
+            "last_px": round(rng.uniform(2, 300), 2),
+            "time": f"{today} {9 + (seconds + 1800) // 3600:02d}:{(seconds + 1800) % 3600 // 60:02d}:{seconds % 60:02d}",
+            "up_reason": template['up_reason'],
+            "plate": template['plate']
+        })
+    return {"code": 200, "msg": "", "data": rows}
+
+
+def gen_dragon_tiger(count, seats=SEATS_PER_STOCK, seed=0, trading_date=None):
+    """龙虎榜总览响应和 {代码: 个股详情响应}"""
+    rng = random.Random(seed)
+    overview_rows = load_fixture('tdx_lhbd_lhbzl.json')['ResultSets'][0]['Content']
+    detail_templates = list(load_fixture('tdx_lhbd_ggxq.json').values())
+    departments = sorted({row[2] for body in detail_templates for row in body['ResultSets'][1]['Content']})
+    labels = sorted({row[12] for body in detail_templates for row in body['ResultSets'][1]['Content']})
+    trading_date = trading_date or datetime.now().strftime('%Y-%m-%d')
+
+    stocks = []
+    details = {}
+    for i in range(count):
+        template = overview_rows[i % len(overview_rows)]
+        _, code = stock_code(i, LIMIT_UP_MARKETS)
+        stocks.append([code, template[1], template[2], template[3], template[4], template[5]])
+
+        basic = list(detail_templates[i % len(detail_templates)]['ResultSets'][0]['Content'][0])
+        amount = round(rng.uniform(5000, 500000), 2)
+        basic[3] = amount
+        seat_rows = []
+        for rank in range(seats):
+            direction = 'B' if rank < seats // 2 else 'S'
+            value = round(amount * rng.uniform(0.005, 0.08), 2)
+            buy, sell = (value, round(value * rng.uniform(0, 0.3), 2)) if direction == 'B' else \
+                        (round(value * rng.uniform(0, 0.3), 2), value)
+            seat_rows.append([rank % (seats // 2 or 1) + 1, '', rng.choice(departments), buy, sell,
+                              round(buy - sell, 2), '', direction, '', '', '', '', rng.choice(labels)])
+        details[code] = tqlex_body([basic], seat_rows)
+
+    overview = tqlex_body(stocks, [['', '', trading_date]])
+    return overview, details
+
+
+def gen_tdx_reports(count, seed=0, days=REPORT_DAYS):
+    """研报接口响应（jzfx_ggtzpj），报告日期分布在最近 days 天"""
+    rng = random.Random(seed)
+    templates = load_fixture('tdx_jzfx_ggtzpj.json')['ResultSets'][0]['Content']
+    today = datetime.now()
+    dates = [int((today - timedelta(days=d)).strftime('%Y%m%d')) for d in range(days)]
+    stock_count = max(count // 6, 1)   # 平均每只股票约 6 篇
+    rows = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        _, code = stock_code(rng.randrange(stock_count), LIMIT_UP_MARKETS)
+        row = list(template)
+        row[0] = i + 1
+        row[1] = code
+        row[3] = dates[i * days // count]
+        row[11] = f"{template[11] or '研报'}（{i}）"   # 标题唯一，研报ID不重复
+        rows.append(row)
+    return tqlex_body(rows)
+
+
+def gen_rzrq(count, seed=0, date_str=None):
+    """融资融券：市场响应、行业响应和 {市场代码: 个股响应}，每个市场 count 行"""
+    rng = random.Random(seed)
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    market_rows = [[date_str] + row[1:] for row in load_fixture('tdx_rzrq_sc.json')['ResultSets'][0]['Content'][-3:]]
+    industry = load_fixture('tdx_rzrq_hy.json')
+    templates = [row for body in load_fixture('tdx_rzrq_gg.json').values() for row in body['ResultSets'][0]['Content']]
+
+    stocks = {}
+    for market_code, start in RZRQ_MARKETS.items():
+        rows = []
+        for i in range(count):
+            template = templates[(i * 7 + start) % len(templates)]
+            factor = rng.uniform(0.5, 1.5)
+            values = [value if j in (2, 3) else round(value * factor, 2) for j, value in enumerate(template[3:])]
+            rows.append([i + 1, f"{start + i:06d}", template[2]] + values)
+        stocks[market_code] = tqlex_body(rows)
+    return tqlex_body(market_rows), industry, stocks
+
+
+# ---------- 写出样本目录 ----------
+
+def write_fixtures(out_dir, scale, seed=0):
+    """写出与 benchmarks/fixtures/ 同名的一套样本，未合成的接口复制原样本"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = volumes(scale)
+    overview, details = gen_dragon_tiger(counts['dragon_tiger'], seed=seed)
+    market, industry, stocks = gen_rzrq(counts['rzrq'], seed=seed)
+    files = {
+        'cls_up_down_analysis.json': gen_limit_up(counts['limit_up'], seed=seed),
+        'tdx_lhbd_lhbzl.json': overview,
+        'tdx_lhbd_ggxq.json': details,
+        'tdx_jzfx_ggtzpj.json': gen_tdx_reports(counts['tdx_reports'], seed=seed),
+        'tdx_rzrq_sc.json': market,
+        'tdx_rzrq_hy.json': industry,
+        'tdx_rzrq_gg.json': stocks,
+    }
+    for name, data in files.items():
+        with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"{name:<28}{os.path.getsize(os.path.join(out_dir, name)) / 1024 / 1024:>8.1f} MB")
+    for name in os.listdir(FIXTURES_DIR):
+        if name not in files and name != MANIFEST_FILE:
+            shutil.copy(os.path.join(FIXTURES_DIR, name), os.path.join(out_dir, name))
+
+    manifest = {
+        "generated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "synthetic": {"scale": scale, "seed": seed, "volumes": counts, "seats_per_stock": SEATS_PER_STOCK}
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"\n{scale}× 合成样本已保存到 {out_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按规模生成合成上游数据')
+    parser.add_argument('--scale', type=int, default=10, help=f"规模倍数（常用 {' / '.join(map(str, SCALES))}）")
+    parser.add_argument('--out', required=True, help='输出目录')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_fixtures(args.out, args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 请求跟踪 - 逐条记录请求耗时，按接口统计延迟分位数
+使用方法：
+  python http_trace.py                         # 统计今天的跟踪日志
+  python http_trace.py 2025-09-08              # 统计指定日期
+  python http_trace.py logs/http_trace/a.jsonl # 统计指定文件
+
+scraper.py / ztts_crawler_simple.py 的 HTTP 会话挂载 TracingAdapter 后，每个请求向
+logs/http_trace/<日期>.jsonl 追加一行：接口、状态码、字节数、建连（TCP+TLS，复用连接为 0）、
+首字节、总耗时（含读取正文，流式响应为首字节时间）和 urllib3 重试次数。
+环境变量 HTTP_TRACE=0 关闭记录。
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+TRACE_DIR = os.path.join('logs', 'http_trace')
+TRACE_ENABLED = os.environ.get('HTTP_TRACE', '1') != '0'
+PERCENTILES = (50, 95, 99)
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def get_beijing_time():
+    """获取北京时间 (UTC+8)"""
+    return datetime.utcnow() + timedelta(hours=8)
+
+
+# ---------- 建连计时 ----------
+
+class _ConnectTimer:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _local.connect_time = getattr(_local, 'connect_time', 0.0) + time.perf_counter() - start
+
+
+class TracedHTTPConnection(_ConnectTimer, HTTPConnection):
+    pass
+
+
+class TracedHTTPSConnection(_ConnectTimer, HTTPSConnection):
+    pass
+
+
+class TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracedHTTPConnection
+
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracedHTTPSConnection
+
+
+# ---------- 接口归类 ----------
+
+def endpoint_name(url):
+    """把 URL 归到接口：TQLEX 的 Entry、财联社/韭研接口路径、韭研页面类型、大智慧服务名
+
+    除图片外按路径归类，请求发往本地模拟服务（UPSTREAM_BASE）时接口名与线上一致。
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    path = parts.path
+    query = parse_qs(parts.query)
+    if 'Entry' in query:
+        return query['Entry'][0]
+    if path.endswith('/ztts/api.php') and 'service' in query:
+        return f"dzh:{query['service'][0]}"
+    if path.startswith('/u/'):
+        return 'jiuyan:user_page'
+    if path.startswith('/a/'):
+        return 'jiuyan:article'
+    if path.startswith('/jystock-app/'):
+        return '/'.join(path.rstrip('/').split('/')[-2:])
+    if host.startswith('img') or path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
+        return f'image:{host}'
+    if path.startswith('/quote/'):
+        return path.rstrip('/').rsplit('/', 1)[-1]
+    return f'{host}{path}'
+
+
+# ---------- 适配器 ----------
+
+class TracingAdapter(HTTPAdapter):
+    """记录每个请求耗时的 HTTPAdapter，其余行为与 HTTPAdapter 相同"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TracedHTTPConnectionPool,
+            'https': TracedHTTPSConnectionPool
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        if not TRACE_ENABLED:
+            return super().send(request, stream=stream, **kwargs)
+
+        _local.connect_time = 0.0
+        start = time.perf_counter()
+        record = {
+            "time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            "endpoint": endpoint_name(request.url),
+            "method": request.method,
+            "host": urlsplit(request.url).hostname
+        }
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+        except Exception as e:
+            record.update({
+                "status": None,
+                "bytes": 0,
+                "connect": round(_local.connect_time, 4),
+                "ttfb": None,
+                "total": round(time.perf_counter() - start, 4),
+                "retries": 0,
+                "error": type(e).__name__
+            })
+            write_trace(record)
+            raise
+
+        ttfb = time.perf_counter() - start
+        if stream:
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content)  # 与 Session 随后读取正文的行为一致，这里提前读取以计入总耗时
+        retries = getattr(response.raw, 'retries', None)
+        record.update({
+            "status": response.status_code,
+            "bytes": size,
+            "connect": round(_local.connect_time, 4),
+            "ttfb": round(ttfb, 4),
+            "total": round(time.perf_counter() - start, 4),
+            "retries": len(retries.history) if retries is not None else 0
+        })
+        write_trace(record)
+        return response
+
+
+def trace_session(session, pool_size=10):
+    """给 requests 会话挂载 TracingAdapter"""
+    adapter = TracingAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def write_trace(record):
+    """追加到 logs/http_trace/<日期>.jsonl"""
+    path = os.path.join(TRACE_DIR, f"{record['time'][:10]}.jsonl")
+    line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+    try:
+        with _write_lock:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except Exception as e:
+        print(f"写入HTTP跟踪日志失败: {e}")
+
+
+# ---------- 统计 ----------
+
+def percentile(sorted_values, p):
+    """最近秩法分位数"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def load_traces(paths):
+    records = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def summarize(records):
+    """按接口汇总：请求数、失败数、字节数、首字节与总耗时分位数"""
+    groups = {}
+    for record in records:
+        groups.setdefault(record['endpoint'], []).append(record)
+
+    summary = {}
+    for endpoint, items in groups.items():
+        totals = sorted(r['total'] for r in items)
+        ttfbs = sorted(r['ttfb'] for r in items if r.get('ttfb') is not None)
+        summary[endpoint] = {
+            "count": len(items),
+            "errors": sum(1 for r in items if r.get('status') is None or r['status'] >= 400),
+            "retries": sum(r.get('retries', 0) for r in items),
+            "bytes": sum(r.get('bytes', 0) for r in items),
+            "connect": sum(r.get('connect', 0) for r in items),
+            "total": {p: percentile(totals, p) for p in PERCENTILES},
+            "ttfb": {p: percentile(ttfbs, p) for p in PERCENTILES}
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]['total'][95] or 0, reverse=True))
+
+
+def print_summary(summary):
+    def ms(value):
+        return f"{value * 1000:.0f}" if value is not None else '-'
+
+    header = f"{'接口':<34}{'请求':>6}{'失败':>6}{'重试':>6}{'KB':>9}{'建连ms':>9}"
+    header += ''.join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f"{'首字节p95':>11}"
+    print(header)
+    for endpoint, item in summary.items():
+        line = f"{endpoint:<34}{item['count']:>6}{item['errors']:>6}{item['retries']:>6}"
+        line += f"{item['bytes'] / 1024:>9.0f}{ms(item['connect']):>9}"
+        line += ''.join(f"{ms(item['total'][p]):>8}" for p in PERCENTILES)
+        line += f"{ms(item['ttfb'][95]):>11}"
+        print(line)
+    print("（p50/p95/p99 为总耗时，单位 ms；建连为合计耗时）")
+
+
+def main():
+    args = sys.argv[1:] or [get_beijing_time().strftime('%Y-%m-%d')]
+    paths = [arg if os.path.exists(arg) else os.path.join(TRACE_DIR, f'{arg}.jsonl') for arg in args]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        print(f"跟踪日志不存在: {', '.join(missing)}")
+        return
+    records = load_traces(paths)
+    if not records:
+        print("跟踪日志为空")
+        return
+    print(f"共 {len(records)} 个请求（{', '.join(paths)}）\n")
+    print_summary(summarize(records))
+
+
+if __name__ == "__main__":
+    main()
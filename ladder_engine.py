@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连板梯队引擎 - 基于本地财联社涨停池历史（data/*.json）增量计算连板
+使用方法：
+  python scraper.py ladder                          # 增量更新并显示最新交易日梯队
+  python scraper.py ladder 2025-09-08               # 显示指定日期梯队
+  python scraper.py ladder rebuild                  # 从 data/*.json 全量重算
+  python scraper.py ladder 2025-09-01 2025-09-30    # 显示日期区间梯队
+
+连板口径与大智慧涨停梯队一致：涨停之间最多间隔1个交易日视为同一波，
+dnum 为本波起点到当日的交易日数，bnum 为本波涨停次数，即“N天M板”。
+"""
+
+import os
+import json
+from datetime import datetime, timedelta
+from trading_calendar import is_trading_day, trading_days_between
+
+# 配置
+LIMIT_UP_DIR = 'data'
+LADDER_DIR = 'ladder'
+LADDER_STATE_PATH = os.path.join(LADDER_DIR, 'state.json')
+MAX_GAP_DAYS = 2  # 相邻两次涨停的交易日间距上限（中间最多断1天）
+STATE_VERSION = 2
+
+
+def get_beijing_time():
+    """获取北京时间 (UTC+8)"""
+    return datetime.utcnow() + timedelta(hours=8)
+
+
+def get_market_type(code):
+    """根据股票代码判断市场类型（财联社格式：600000.SH）"""
+    number = code.split('.')[0]
+    if code.endswith('.BJ') or number.startswith(('8', '4', '92')):
+        return '北交所'
+    if number.startswith('68'):
+        return '科创板'
+    if number.startswith('6'):
+        return '沪市主板'
+    if number.startswith('3'):
+        return '创业板'
+    if number.startswith('0'):
+        return '深市主板'
+    return '其他'
+
+
+def parse_percent(value):
+    """'10.01%' -> 10.01"""
+    try:
+        return round(float(str(value).rstrip('%')), 2)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def list_limit_up_dates(data_dir=LIMIT_UP_DIR):
+    """本地已有涨停池数据的交易日（升序，节假日误存的重复文件会被跳过）"""
+    if not os.path.exists(data_dir):
+        return []
+    dates = []
+    for filename in os.listdir(data_dir):
+        if not filename.endswith('.json') or filename == 'index.json':
+            continue
+        date_str = filename[:-5]
+        try:
+            if not is_trading_day(date_str):
+                continue
+        except ValueError:
+            continue
+        dates.append(date_str)
+    return sorted(dates)
+
+
+def load_limit_up_pool(date_str, data_dir=LIMIT_UP_DIR):
+    """读取某日涨停池"""
+    path = os.path.join(data_dir, f'{date_str}.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class LadderEngine:
+    def __init__(self):
+        self.dates = []       # 已处理的交易日（升序）
+        self.streaks = {}     # 股票代码 -> [本波起点日期, 最近涨停日期, 板数]
+        self.base = None      # 最后一个交易日之前的状态，用于当日重算
+
+    # ---------- 持久化 ----------
+
+    @classmethod
+    def load(cls, path=LADDER_STATE_PATH):
+        """加载连板状态，文件不存在或损坏时返回空状态"""
+        engine = cls()
+        if not os.path.exists(path):
+            return engine
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            if raw.get('version') != STATE_VERSION:
+                return engine
+            engine.dates = raw.get('dates', [])
+            engine.streaks = raw.get('streaks', {})
+            engine.base = raw.get('base')
+        except Exception as e:
+            print(f"读取连板状态失败: {e}")
+            return cls()
+        return engine
+
+    def save(self, path=LADDER_STATE_PATH):
+        """保存连板状态"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        raw = {
+            "version": STATE_VERSION,
+            "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+            "dates": self.dates,
+            "streaks": self.streaks,
+            "base": self.base
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False, separators=(',', ':'))
+
+    # ---------- 计算 ----------
+
+    def advance(self, pool):
+        """推进一个交易日，返回当日梯队"""
+        date_str = pool['date']
+        self.base = {
+            "dates_count": len(self.dates),
+            "streaks": {code: list(streak) for code, streak in self.streaks.items()}
+        }
+        self.dates.append(date_str)
+
+        # 按交易日历计算间隔，本地缺失的交易日不会被当作连续
+        stocks = []
+        for stock in pool.get('stocks', []):
+            code = stock['code']
+            streak = self.streaks.get(code)
+            if streak and trading_days_between(streak[1], date_str) <= MAX_GAP_DAYS:
+                streak[1] = date_str
+                streak[2] += 1
+            else:
+                streak = [date_str, date_str, 1]
+                self.streaks[code] = streak
+            stocks.append((stock, trading_days_between(streak[0], date_str) + 1, streak[2]))
+
+        # 清理已断开的连板，状态只保留仍可能延续的股票
+        self.streaks = {
+            code: streak for code, streak in self.streaks.items()
+            if trading_days_between(streak[1], date_str) < MAX_GAP_DAYS
+        }
+        return build_ladder(date_str, stocks)
+
+    def rewind(self):
+        """撤销最后一个交易日（同日重复运行时重算）"""
+        if not self.base:
+            return False
+        self.dates = self.dates[:self.base['dates_count']]
+        self.streaks = self.base['streaks']
+        self.base = None
+        return True
+
+
+def build_ladder(date_str, stocks):
+    """把 (涨停池记录, dnum, bnum) 组织成与大智慧涨停梯队相同结构"""
+    board_groups = {}
+    market_count = {}
+
+    for stock, dnum, bnum in stocks:
+        market = get_market_type(stock['code'])
+        board_groups.setdefault(bnum, []).append({
+            'code': stock['code'],
+            'name': stock['name'],
+            'close_price': stock.get('price'),
+            'change_rate': parse_percent(stock.get('change_percent')),
+            'limit_up_time': stock.get('limit_up_time', ''),
+            'dnum': dnum,
+            'bnum': bnum,
+            'board_label': f"{dnum}天{bnum}板",
+            'market': market
+        })
+        market_count[market] = market_count.get(market, 0) + 1
+
+    # 按板数从高到低排序，同板数按首次涨停时间排序
+    sorted_board_groups = dict(sorted(board_groups.items(), key=lambda x: x[0], reverse=True))
+    for group in sorted_board_groups.values():
+        group.sort(key=lambda s: s['limit_up_time'] or '')
+
+    return {
+        'date': date_str,
+        'update_time': get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+        'source': '财联社涨停池',
+        'max_board': max(sorted_board_groups) if sorted_board_groups else 0,
+        'limit_up_count': len(stocks),
+        'consecutive_count': sum(len(v) for k, v in sorted_board_groups.items() if k >= 2),
+        'ladder_stocks': {f"{k}板": v for k, v in sorted_board_groups.items()},
+        'market_distribution': market_count,
+        'board_distribution': {f"{k}板": len(v) for k, v in sorted_board_groups.items()}
+    }
+
+
+def save_ladder(ladder):
+    """保存单日梯队并更新索引"""
+    os.makedirs(LADDER_DIR, exist_ok=True)
+    date_str = ladder['date']
+    with open(os.path.join(LADDER_DIR, f'{date_str}.json'), 'w', encoding='utf-8') as f:
+        json.dump(ladder, f, ensure_ascii=False, indent=2)
+
+    index_path = os.path.join(LADDER_DIR, 'index.json')
+    index_data = {}
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            try:
+                index_data = json.load(f)
+            except:
+                index_data = {}
+
+    index_data[date_str] = {
+        "date": date_str,
+        "max_board": ladder['max_board'],
+        "limit_up_count": ladder['limit_up_count'],
+        "consecutive_count": ladder['consecutive_count'],
+        "board_distribution": ladder['board_distribution'],
+        "files": {"json": f"{LADDER_DIR}/{date_str}.json"}
+    }
+    index_data = dict(sorted(index_data.items(), reverse=True))
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index_data, f, ensure_ascii=False, indent=2)
+
+
+def rebuild_ladders():
+    """从 data/*.json 全量重算所有日期的连板梯队"""
+    print("开始全量重算连板梯队...")
+    engine = LadderEngine()
+    ladders = {}
+    for date_str in list_limit_up_dates():
+        try:
+            pool = load_limit_up_pool(date_str)
+        except Exception as e:
+            print(f"读取 {date_str} 涨停池失败: {e}")
+            continue
+        ladder = engine.advance(pool)
+        save_ladder(ladder)
+        ladders[date_str] = ladder
+    engine.save()
+    print(f"连板梯队重算完成: {len(ladders)} 个交易日")
+    return ladders
+
+
+def update_ladder(pool=None):
+    """增量更新连板梯队：只处理状态之后的新交易日"""
+    try:
+        if pool and not is_trading_day(pool['date']):
+            print(f"{pool['date']} 不是交易日，跳过连板梯队计算")
+            return None
+
+        engine = LadderEngine.load()
+        if not engine.dates:
+            ladders = rebuild_ladders()
+            return ladders[max(ladders)] if ladders else None
+
+        if pool and engine.dates[-1] == pool['date'] and engine.rewind():
+            pending = [pool['date']]
+        else:
+            pending = [d for d in list_limit_up_dates() if d > engine.dates[-1]]
+            if pool and pool['date'] < engine.dates[-1]:
+                # 补录了更早的日期，后续状态全部失效
+                ladders = rebuild_ladders()
+                return ladders.get(pool['date'])
+
+        ladder = None
+        for date_str in pending:
+            day_pool = pool if pool and pool['date'] == date_str else load_limit_up_pool(date_str)
+            ladder = engine.advance(day_pool)
+            save_ladder(ladder)
+        engine.save()
+
+        if ladder is None:
+            print(f"连板梯队已是最新: {engine.dates[-1]}")
+            return load_saved_ladder(engine.dates[-1])
+        else:
+            print(f"连板梯队已更新: {ladder['date']}, 最高{ladder['max_board']}板，连板{ladder['consecutive_count']}只")
+        return ladder
+    except Exception as e:
+        print(f"更新连板梯队失败: {e}")
+        return None
+
+
+def load_saved_ladder(date_str):
+    """读取已保存的单日梯队"""
+    path = os.path.join(LADDER_DIR, f'{date_str}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_ladder(date_str):
+    """获取指定日期的连板梯队（不访问网络）"""
+    ladder = load_saved_ladder(date_str)
+    if ladder is None:
+        update_ladder()
+        ladder = load_saved_ladder(date_str)
+    return ladder
+
+
+def get_ladders(start_date, end_date):
+    """获取日期区间内的连板梯队"""
+    ladders = {}
+    for date_str in list_limit_up_dates():
+        if start_date <= date_str <= end_date:
+            ladder = get_ladder(date_str)
+            if ladder:
+                ladders[date_str] = ladder
+    return ladders
+
+
+def print_ladder(ladder, detail=True):
+    """打印连板梯队"""
+    print(f"\n连板梯队 - {ladder['date']}（涨停{ladder['limit_up_count']}只，连板{ladder['consecutive_count']}只，最高{ladder['max_board']}板）")
+    print("板数分布: " + "  ".join(f"{k}: {v}只" for k, v in ladder['board_distribution'].items()))
+    if not detail:
+        return
+    for board_type, stocks in ladder['ladder_stocks'].items():
+        if board_type == '1板':
+            continue
+        print(f"  {board_type}: " + "、".join(f"{s['name']}({s['board_label']})" for s in stocks))
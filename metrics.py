@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集指标 - 记录每次 crawl_* / main_* 运行的分阶段耗时和吞吐
+使用方法：
+  import metrics
+
+  @metrics.instrumented('limitup')
+  def main_limit_up():
+      with metrics.stage('fetch'):
+          raw = fetch()
+      metrics.add_rows(len(rows))
+      metrics.write_json(path, data, ensure_ascii=False, indent=2)
+
+每次运行结束后向 metrics/<日期>.jsonl 追加一行：各阶段耗时（fetch / parse / format /
+serialize / write，嵌套阶段互不重复计时）、下载/写入字节数、请求数、行数和每秒行数。
+设置环境变量 PROMETHEUS_TEXTFILE_DIR 时，另外为每个任务写一份 node_exporter textfile
+（<目录>/cls_spider_<任务>.prom）。
+请求数和下载字节数通过 install_session_hooks(session) 挂在 requests 会话上自动统计；
+流式响应只能按 Content-Length 计入。
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+METRICS_DIR = 'metrics'
+PROMETHEUS_TEXTFILE_DIR = os.environ.get('PROMETHEUS_TEXTFILE_DIR')
+STAGES = ('fetch', 'parse', 'format', 'serialize', 'write')
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def get_beijing_time():
+    """获取北京时间 (UTC+8)"""
+    return datetime.utcnow() + timedelta(hours=8)
+
+
+class CrawlMetrics:
+    """一次任务运行的指标"""
+    def __init__(self, task):
+        self.task = task
+        self.start_time = get_beijing_time()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.stages = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.requests = 0
+        self.rows = 0
+        self.status = 'running'
+        self.error = None
+        self._lock = threading.Lock()   # 任务内部的工作线程也会累加计数
+
+    def add(self, field, value):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+    def add_stage(self, name, seconds):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def to_dict(self):
+        rows_per_sec = self.rows / self.elapsed if self.elapsed > 0 else 0.0
+        return {
+            "task": self.task,
+            "start": self.start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "status": self.status,
+            "elapsed": round(self.elapsed, 3),
+            "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "requests": self.requests,
+            "rows": self.rows,
+            "rows_per_sec": round(rows_per_sec, 1),
+            "error": self.error
+        }
+
+
+# ---------- 当前运行 ----------
+
+def current():
+    """当前线程所属的运行，没有时返回 None（此时所有记录函数都不做任何事）"""
+    return getattr(_local, 'run', None)
+
+
+@contextmanager
+def bind(run):
+    """让工作线程把指标记到调用方的运行上：在线程函数里 with metrics.bind(run): ..."""
+    previous = current()
+    _local.run = run
+    try:
+        yield run
+    finally:
+        _local.run = previous
+
+
+def instrumented(task):
+    """装饰 crawl_* / main_* 函数：记录一次运行并写出指标；嵌套调用时并入外层运行"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is not None:
+                return func(*args, **kwargs)
+            run = CrawlMetrics(task)
+            _local.run = run
+            _local.stages = []
+            try:
+                result = func(*args, **kwargs)
+                run.status = 'success' if result else 'empty'
+                return result
+            except BaseException as e:
+                run.status = 'failed'
+                run.error = str(e) or type(e).__name__
+                raise
+            finally:
+                run.elapsed = time.perf_counter() - run.started
+                _local.run = None
+                try:
+                    save_metrics(run)
+                except Exception as e:
+                    print(f"写入采集指标失败: {e}")
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def stage(name):
+    """计时一个阶段；嵌套的阶段只计入最内层（例如 format 中的 fetch 不会重复计入 format）"""
+    run = current()
+    if run is None:
+        yield
+        return
+    stack = getattr(_local, 'stages', None)
+    if stack is None:
+        stack = _local.stages = []
+    now = time.perf_counter()
+    if stack:
+        outer = stack[-1]
+        run.add_stage(outer[0], now - outer[1])
+    frame = [name, now]
+    stack.append(frame)
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        run.add_stage(name, now - frame[1])
+        stack.pop()
+        if stack:
+            stack[-1][1] = now
+
+
+def add_rows(count):
+    run = current()
+    if run is not None:
+        run.add('rows', count)
+
+
+def add_bytes_in(count):
+    run = current()
+    if run is not None:
+        run.add('bytes_in', count)
+
+
+def add_bytes_out(count):
+    run = current()
+    if run is not None:
+        run.add('bytes_out', count)
+
+
+def _response_hook(response, *args, **kwargs):
+    run = current()
+    if run is None:
+        return response
+    run.add('requests', 1)
+    if kwargs.get('stream'):
+        # 流式响应不能提前读取正文
+        run.add('bytes_in', int(response.headers.get('Content-Length') or 0))
+    else:
+        run.add('bytes_in', len(response.content))
+    return response
+
+
+def install_session_hooks(session):
+    """在 requests 会话上统计请求数和下载字节数"""
+    session.hooks.setdefault('response', []).append(_response_hook)
+    return session
+
+
+# ---------- 写文件 ----------
+
+def write_text(path, text, encoding='utf-8'):
+    """写文本文件，计入 write 阶段和写入字节数"""
+    with stage('write'):
+        with open(path, 'w', encoding=encoding) as f:
+            f.write(text)
+    if current() is not None:
+        add_bytes_out(os.path.getsize(path))
+
+
+def write_json(path, data, encoding='utf-8', **dump_kwargs):
+    """序列化并写 JSON 文件，serialize 与 write 分开计时"""
+    with stage('serialize'):
+        text = json.dumps(data, **dump_kwargs)
+    write_text(path, text, encoding)
+
+
+# ---------- 输出 ----------
+
+def save_metrics(run):
+    """追加到 metrics/<日期>.jsonl，并按需写 Prometheus textfile"""
+    record = run.to_dict()
+    date_str = run.start_time.strftime('%Y-%m-%d')
+    with _write_lock:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(os.path.join(METRICS_DIR, f'{date_str}.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        if PROMETHEUS_TEXTFILE_DIR:
+            write_prometheus_textfile(record, PROMETHEUS_TEXTFILE_DIR)
+
+
+def write_prometheus_textfile(record, textfile_dir):
+    """每个任务一份 .prom 文件（原子替换），保存该任务最近一次运行的指标"""
+    task = record['task']
+    labels = f'task="{task}"'
+    lines = [
+        '# TYPE cls_spider_run_seconds gauge',
+        f'cls_spider_run_seconds{{{labels}}} {record["elapsed"]}',
+        '# TYPE cls_spider_run_success gauge',
+        f'cls_spider_run_success{{{labels}}} {1 if record["status"] == "success" else 0}',
+        '# TYPE cls_spider_last_run_timestamp_seconds gauge',
+        f'cls_spider_last_run_timestamp_seconds{{{labels}}} {int(time.time())}',
+        '# TYPE cls_spider_stage_seconds gauge',
+    ]
+    for name in STAGES:
+        lines.append(f'cls_spider_stage_seconds{{{labels},stage="{name}"}} {record["stages"].get(name, 0.0)}')
+    for key in ('bytes_in', 'bytes_out', 'requests', 'rows', 'rows_per_sec'):
+        lines.append(f'# TYPE cls_spider_{key} gauge')
+        lines.append(f'cls_spider_{key}{{{labels}}} {record[key]}')
+
+    os.makedirs(textfile_dir, exist_ok=True)
+    path = os.path.join(textfile_dir, f'cls_spider_{task}.prom')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟上游服务 - 回放 benchmarks/fixtures/ 中的真实响应，用于离线端到端运行和吞吐/并发测试
+使用方法：
+  python mock_upstream.py                                   # 监听 127.0.0.1:8800
+  python mock_upstream.py --latency 80 --jitter 40          # 每个请求延迟 80~120ms
+  python mock_upstream.py --error-rate 0.05 --scale 10      # 5% 请求返回 503，列表类响应放大 10 倍
+
+  # 另开终端，在临时目录里运行（命令会在当前目录写 data/、tdx_rztq/ 等数据目录）
+  mkdir -p /tmp/offline && cd /tmp/offline
+  UPSTREAM_BASE=http://127.0.0.1:8800 python /path/to/scraper.py all
+
+各站点的路径互不冲突，按路径分发：
+  /quote/index/up_down_analysis        财联社涨停池
+  /TQLEX?Entry=CWServ.*                通达信（龙虎榜总览/个股、研报、融资融券市场/行业/个股）
+  /jystock-app/api/v1/action/field     韭研公社异动解析
+  /u/<用户ID>  /a/<文章ID>  /img/<文件> 韭研公社用户主页、文章页（articles/index.json 中的真实正文）、图片
+  /htmlweb/ztts/api.php?service=...    大智慧涨停透视接口
+龙虎榜交易日期改为最近一个交易日，用户主页列出最近 JIUYAN_PAGE_DAYS 天每天一篇文章，其余响应原样回放。
+--scale 把响应中的列表（TQLEX 每张表、data 数组、文章段落）重复 N 遍，用于放大响应体。
+按 Ctrl+C 停止后打印各接口的请求数、注入的错误数和发送字节数（接口名与 http_trace.py 一致）。
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import signal
+import struct
+import argparse
+import threading
+from datetime import timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from http_trace import endpoint_name
+from trading_calendar import get_beijing_time, latest_trading_day, prev_trading_day
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+ARTICLES_INDEX = os.path.join(ROOT_DIR, 'articles', 'index.json')
+DEFAULT_PORT = 8800
+JIUYAN_PAGE_DAYS = 30
+
+# TQLEX Entry -> 样本文件；按参数区分的接口取 Params 中的对应位置作为键
+TQLEX_FIXTURES = {
+    'CWServ.tdxsj_lhbd_lhbzl': ('tdx_lhbd_lhbzl.json', None),
+    'CWServ.tdxsj_lhbd_ggxq': ('tdx_lhbd_ggxq.json', 1),
+    'CWServ.tdxsj_jzfx_ggtzpj': ('tdx_jzfx_ggtzpj.json', None),
+    'CWServ.tdxsj_rzrq_sc': ('tdx_rzrq_sc.json', None),
+    'CWServ.tdxsj_rzrq_hy': ('tdx_rzrq_hy.json', None),
+    'CWServ.tdxsj_rzrq_gg': ('tdx_rzrq_gg.json', 1),
+}
+
+
+def encode_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def scale_body(body, factor):
+    """把响应中的列表重复 factor 遍：TQLEX 的每张表、data 数组"""
+    if factor <= 1:
+        return body
+    body = dict(body)
+    if 'ResultSets' in body:
+        body['ResultSets'] = [{"Count": table['Count'] * factor, "Content": table['Content'] * factor}
+                              for table in body['ResultSets']]
+    elif isinstance(body.get('data'), list):
+        body['data'] = body['data'] * factor
+    return body
+
+
+def shift_market_dates(rows, latest):
+    """把融资融券市场数据的日期整体平移到以 latest 结尾的最近若干交易日，保持先后顺序"""
+    mapping = {}
+    for i, date in enumerate(sorted({row[0] for row in rows}, reverse=True)):
+        mapping[date] = (prev_trading_day(latest, i) if i else latest).strftime('%Y-%m-%d')
+    return [[mapping[row[0]]] + row[1:] for row in rows]
+
+
+def tiny_png():
+    """1x1 的 PNG 图片，能通过 PIL 校验"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(b'\x00\xff\xff\xff')) + chunk(b'IEND', b''))
+
+
+class UpstreamData:
+    """启动时载入样本并预先序列化，请求处理只做查表"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, scale=1):
+        self.fixtures_dir = fixtures_dir
+        self.scale = scale
+        self.limit_up = encode_json(scale_body(self.load('cls_up_down_analysis.json'), scale))
+        self.analysis = encode_json(scale_body(self.load('jiuyan_action_field.json'), scale))
+        self.ztts = encode_json(scale_body(self.load('dzh_getZttdData.json'), scale))
+        self.image = tiny_png()
+
+        self.tqlex = {}
+        # 带日期的样本平移到最近交易日，爬虫按“今天”筛选的路径才能离线跑通
+        # （融资融券行业和个股响应本身不含日期，按任意查询日期返回）
+        latest = latest_trading_day(get_beijing_time().date())
+        for entry, (name, key_index) in TQLEX_FIXTURES.items():
+            data = self.load(name)
+            if entry == 'CWServ.tdxsj_lhbd_lhbzl':
+                data['ResultSets'][1]['Content'][0][2] = latest.strftime('%Y-%m-%d')
+            elif entry == 'CWServ.tdxsj_rzrq_sc':
+                data['ResultSets'][0]['Content'] = shift_market_dates(data['ResultSets'][0]['Content'], latest)
+            if key_index is None:
+                self.tqlex[entry] = (encode_json(scale_body(data, scale)), None)
+            else:
+                bodies = {key: encode_json(scale_body(body, scale)) for key, body in data.items()}
+                self.tqlex[entry] = (bodies, key_index)
+
+        self.articles = self.load_articles()
+        self._article_cache = {}
+
+    def load(self, name):
+        path = os.path.join(self.fixtures_dir, name)
+        if not os.path.exists(path):
+            raise SystemExit(f"样本不存在: {path}，先运行 python benchmarks/record_fixtures.py")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # ---------- 韭研公社页面 ----------
+
+    def load_articles(self):
+        """articles/index.json 中各作者已保存的文章 {作者: [文章]}"""
+        articles = {}
+        try:
+            with open(ARTICLES_INDEX, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        for day in index.values():
+            for article in day.get('articles', []):
+                if article.get('content'):
+                    articles.setdefault(article['author'], []).append(article)
+        return articles
+
+    def author_articles(self, user_id):
+        from scraper import JIUYAN_USERS
+        for user in JIUYAN_USERS.values():
+            if user['user_url'].rstrip('/').endswith(user_id):
+                return self.articles.get(user['user_name'], [])
+        return []
+
+    def user_page(self, user_id):
+        """用户主页：最近 JIUYAN_PAGE_DAYS 天每天一篇，轮流使用该作者已保存的文章"""
+        articles = self.author_articles(user_id)
+        today = get_beijing_time().date()
+        items = []
+        for i in range(JIUYAN_PAGE_DAYS if articles else 0):
+            article = articles[i % len(articles)]
+            day = today - timedelta(days=i)
+            items.append(
+                f'<li><a href="/a/{user_id}-{day.strftime("%Y%m%d")}-{i % len(articles)}">'
+                f'<div class="book-title"><span>{article["title"]}</span></div></a>'
+                f'<span class="fs13-ash">{day.strftime("%Y-%m-%d")} {article.get("publish_time") or "08:00"}</span></li>'
+            )
+        return f'<!doctype html><html><body><ul>{"".join(items)}</ul></body></html>'.encode('utf-8')
+
+    def article_page(self, article_id):
+        """文章页：正文以 content:"..." 字符串嵌在页面脚本中，与线上页面结构一致"""
+        if article_id in self._article_cache:
+            return self._article_cache[article_id]
+        user_id, _, index = article_id.rpartition('-')
+        user_id = user_id.rsplit('-', 1)[0]
+        articles = self.author_articles(user_id)
+        if not articles or not index.isdigit():
+            return None
+        article = articles[int(index) % len(articles)]
+
+        blocks = []
+        for line in article['content'].split('\n'):
+            line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            if line.startswith('[图片:'):
+                blocks.append(f'<p><img src="/img/{line[4:-1]}" alt=""/></p>')
+            elif line.strip():
+                blocks.append(f'<div><p><span>{line}</span></p></div>')
+        content = ''.join(blocks) * self.scale
+        literal = json.dumps(content, ensure_ascii=False)[1:-1]
+        literal = literal.replace('/', '\\u002F').replace('<', '\\u003C').replace('>', '\\u003E')
+        page = (
+            '<!doctype html><html><head><title>韭研公社</title></head><body><div id="__nuxt"></div>'
+            f'<script>window.__NUXT__=(function(a,b){{return {{data:[{{detail:{{'
+            f'title:"{json.dumps(article["title"], ensure_ascii=False)[1:-1]}",content:"{literal}",url:"https:\\u002F\\u002Fwww.jiuyangongshe.com"}}}}]}}}}(1,2));</script>'
+            '</body></html>'
+        ).encode('utf-8')
+        self._article_cache[article_id] = page
+        return page
+
+    # ---------- 分发 ----------
+
+    def respond(self, method, path, query, body):
+        """返回 (状态码, Content-Type, 响应体)"""
+        if path == '/quote/index/up_down_analysis':
+            return 200, 'application/json', self.limit_up
+        if path == '/TQLEX':
+            entry = query.get('Entry', [''])[0]
+            if entry not in self.tqlex:
+                return 200, 'application/json', encode_json({"ErrorCode": -1, "ErrorInfo": f"unknown entry {entry}"})
+            data, key_index = self.tqlex[entry]
+            if key_index is None:
+                return 200, 'application/json', data
+            try:
+                key = str(json.loads(body)['Params'][key_index])
+            except (ValueError, KeyError, IndexError, TypeError):
+                return 200, 'application/json', encode_json({"ErrorCode": -2, "ErrorInfo": "bad params"})
+            if key not in data:
+                # 样本中没有的参数（放大后的龙虎榜等）按参数固定映射到某个样本
+                keys = sorted(data)
+                key = keys[zlib.crc32(key.encode('utf-8')) % len(keys)]
+            return 200, 'application/json', data[key]
+        if path == '/jystock-app/api/v1/action/field':
+            return 200, 'application/json', self.analysis
+        if path.startswith('/u/'):
+            return 200, 'text/html; charset=utf-8', self.user_page(path[3:].strip('/'))
+        if path.startswith('/a/'):
+            page = self.article_page(path[3:].strip('/'))
+            if page is None:
+                return 404, 'text/plain', b'not found'
+            return 200, 'text/html; charset=utf-8', page
+        if path.startswith('/img/'):
+            return 200, 'image/png', self.image
+        if path.endswith('/ztts/api.php'):
+            service = query.get('service', [''])[0]
+            if service == 'getZttdData':
+                return 200, 'application/json', self.ztts
+            return 200, 'application/json', encode_json({"code": 1, "msg": f"unknown service {service}"})
+        return 404, 'text/plain', b'not found'
+
+
+class MockUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data, latency=0.0, jitter=0.0, error_rate=0.0, verbose=False):
+        super().__init__(address, MockUpstreamHandler)
+        self.data = data
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    def record(self, endpoint, size, error):
+        with self._stats_lock:
+            item = self.stats.setdefault(endpoint, {"count": 0, "errors": 0, "bytes": 0})
+            item['count'] += 1
+            item['errors'] += error
+            item['bytes'] += size
+
+    def print_stats(self):
+        print(f"\n{'接口':<34}{'请求':>7}{'注入错误':>9}{'KB':>10}")
+        for endpoint, item in sorted(self.stats.items(), key=lambda kv: kv[1]['count'], reverse=True):
+            print(f"{endpoint:<34}{item['count']:>7}{item['errors']:>9}{item['bytes'] / 1024:>10.0f}")
+
+
+class MockUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # 支持长连接，与线上站点一致，客户端连接池的复用行为才有意义
+    disable_nagle_algorithm = True  # 响应头和正文分两次写出，开着 Nagle 每个响应会多出约 40ms 的延迟
+
+    def do_GET(self):
+        self.handle_request(b'')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.handle_request(self.rfile.read(length) if length else b'')
+
+    def handle_request(self, body):
+        server = self.server
+        parts = urlsplit(self.path)
+        endpoint = endpoint_name(self.path)
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if server.error_rate and random.random() < server.error_rate:
+            status, content_type, payload = 503, 'text/plain', b'injected error'
+        else:
+            status, content_type, payload = server.data.respond(self.command, parts.path, parse_qs(parts.query), body)
+        server.record(endpoint, len(payload), status == 503)
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟上游服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0, help='每个请求的固定延迟（毫秒）')
+    parser.add_argument('--jitter', type=float, default=0, help='在固定延迟上随机增加 0~N 毫秒')
+    parser.add_argument('--error-rate', type=float, default=0, help='返回 503 的请求比例（0~1）')
+    parser.add_argument('--scale', type=int, default=1, help='响应中的列表重复 N 遍')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='样本目录')
+    parser.add_argument('--seed', type=int, help='随机种子（延迟抖动和错误注入可复现）')
+    parser.add_argument('--verbose', action='store_true', help='打印每个请求')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    data = UpstreamData(args.fixtures, max(args.scale, 1))
+    server = MockUpstreamServer((args.host, args.port), data, latency=args.latency / 1000,
+                                jitter=args.jitter / 1000, error_rate=args.error_rate, verbose=args.verbose)
+    print(f"模拟上游服务已启动: http://{args.host}:{args.port}"
+          f"（延迟 {args.latency:.0f}+{args.jitter:.0f}ms，错误率 {args.error_rate:.0%}，放大 {args.scale} 倍）")
+    print(f"运行爬虫时设置 UPSTREAM_BASE=http://{args.host}:{args.port}")
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))   # 被 kill 时也打印统计
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能剖析开关 - 给 scraper.py / ztts_crawler_simple.py 的任意命令加 --profile，查看耗时和内存花在哪里
+使用方法：
+  python scraper.py rzrq --profile                 # cProfile + 栈采样
+  python scraper.py tdx_reports --profile=sample   # 只做栈采样（开销小，适合长时间运行）
+  python scraper.py rzrq --profile-memory          # 只统计内存峰值（tracemalloc）
+  python scraper.py all --profile --profile-memory # 可以同时使用
+  python ztts_crawler_simple.py --api --profile
+
+输出到 logs/profile/<命令>_<时间>.*：
+  .prof       cProfile 结果（包括工作线程），可用 python -m pstats 或 snakeviz 查看
+  .collapsed  折叠栈（每 5ms 采样所有线程的调用栈，按墙钟时间计，等待网络的时间也会出现），
+              可直接交给 flamegraph.pl 或 speedscope 生成火焰图
+  .memory.txt tracemalloc 内存峰值及接近峰值时分配最多的代码行
+运行结束后在终端打印累计耗时最多的函数和内存峰值。
+"""
+
+import os
+import re
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.path.join('logs', 'profile')
+SAMPLE_INTERVAL = 0.005      # 栈采样间隔（秒）
+MEMORY_POLL_INTERVAL = 0.2   # 检查内存峰值的间隔（秒）
+MEMORY_SNAPSHOT_STEP = 1.1   # 内存比上次快照时高出 10% 以上才重新快照
+TOP_N = 25
+
+
+def pop_profile_args(argv):
+    """从命令行参数中取出 --profile / --profile=sample / --profile-memory，返回选项（未指定时为 None）
+
+    参数会从 argv 中移除，各命令原有的参数解析不受影响。
+    """
+    options = {"mode": None, "memory": False}
+    rest = [argv[0]]
+    for arg in argv[1:]:
+        if arg == '--profile':
+            options['mode'] = 'cprofile'
+        elif arg.startswith('--profile='):
+            mode = arg.split('=', 1)[1]
+            if mode not in ('cprofile', 'sample'):
+                raise SystemExit(f"未知的剖析模式: {mode}（可选 cprofile / sample）")
+            options['mode'] = mode
+        elif arg == '--profile-memory':
+            options['memory'] = True
+        else:
+            rest.append(arg)
+    argv[:] = rest
+    return options if options['mode'] or options['memory'] else None
+
+
+# ---------- 栈采样 ----------
+
+class StackSampler:
+    """后台线程定时采样所有线程的调用栈，累计成折叠栈"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if thread_names.get(ident, '').startswith('profiler-'):
+                    continue    # 不采样剖析器自己的线程
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                # 同一线程池的工作线程合并到一个根节点下
+                stack.append(re.sub(r'_\d+$', '', thread_names.get(ident, 'thread')))
+                self.counts[';'.join(name.replace(';', ',') for name in reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# ---------- cProfile（含工作线程） ----------
+
+class ThreadedProfile:
+    """主线程和之后启动的线程各用一个 cProfile.Profile，结束时合并
+
+    Python 3.12 起 cProfile 基于 sys.monitoring，一个 Profile 已覆盖所有线程，
+    且同时只能有一个处于启用状态，此时不再为工作线程单独创建。
+    """
+
+    def __init__(self):
+        import cProfile
+        self._cprofile = cProfile
+        self.main = cProfile.Profile()
+        self.threads = []
+        self.per_thread = sys.version_info < (3, 12)
+        self._lock = threading.Lock()
+
+    def _start_thread(self, frame, event, arg):
+        # threading.setprofile 的钩子在新线程里第一次触发时换成该线程自己的 cProfile
+        sys.setprofile(None)
+        profile = self._cprofile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return      # 已有其他剖析工具启用时只剖析主线程，不能让工作线程在启动时失败
+        with self._lock:
+            self.threads.append(profile)
+
+    def enable(self):
+        if self.per_thread:
+            threading.setprofile(self._start_thread)
+        self.main.enable()
+
+    def disable(self):
+        self.main.disable()
+        threading.setprofile(None)
+
+    def stats(self):
+        import pstats
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for profile in self.threads:
+                stats.add(profile)
+        return stats
+
+
+# ---------- 内存 ----------
+
+class MemoryTracker:
+    """tracemalloc 记录内存峰值，并在内存创新高时保存快照，用于定位峰值时的分配来源"""
+
+    def __init__(self, interval=MEMORY_POLL_INTERVAL):
+        import tracemalloc
+        self.tracemalloc = tracemalloc
+        self.interval = interval
+        self.peak_snapshot = None
+        self.peak_snapshot_size = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-memory', daemon=True)
+
+    def start(self):
+        self.tracemalloc.start()
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        current, _ = self.tracemalloc.get_traced_memory()
+        if current > max(self.peak_snapshot_size * MEMORY_SNAPSHOT_STEP, 1):
+            self.peak_snapshot = self.tracemalloc.take_snapshot()
+            self.peak_snapshot_size = current
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.check()
+        current, peak = self.tracemalloc.get_traced_memory()
+        self.tracemalloc.stop()
+        return current, peak
+
+    def report(self, current, peak, top_n=TOP_N):
+        lines = [
+            f"内存峰值: {peak / 1024 / 1024:.1f} MB",
+            f"结束时仍占用: {current / 1024 / 1024:.1f} MB",
+        ]
+        if self.peak_snapshot is not None:
+            lines.append(f"\n接近峰值时（{self.peak_snapshot_size / 1024 / 1024:.1f} MB）分配最多的代码行:")
+            for stat in self.peak_snapshot.statistics('lineno')[:top_n]:
+                frame = stat.traceback[0]
+                lines.append(f"{stat.size / 1024 / 1024:>9.2f} MB {stat.count:>9} 块  "
+                             f"{frame.filename}:{frame.lineno}")
+        return '\n'.join(lines)
+
+
+# ---------- 入口 ----------
+
+def profile_name(argv):
+    """输出文件名前缀：脚本名_命令"""
+    script = os.path.splitext(os.path.basename(argv[0]))[0]
+    words = [arg for arg in argv[1:] if not arg.startswith('-')][:2]
+    name = '_'.join([script] + words)
+    return re.sub(r'[^\w.-]+', '-', name)
+
+
+def run_profiled(func, options, name):
+    """在剖析下执行 func()，结束（包括异常和 Ctrl+C）后写出结果"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    memory = MemoryTracker() if options['memory'] else None
+    sampler = StackSampler() if options['mode'] else None
+    profile = ThreadedProfile() if options['mode'] == 'cprofile' else None
+
+    if memory:
+        memory.start()
+    if sampler:
+        sampler.start()
+    if profile:
+        profile.enable()
+    start = time.perf_counter()
+    try:
+        return func()
+    finally:
+        elapsed = time.perf_counter() - start
+        if profile:
+            profile.disable()
+        if sampler:
+            sampler.stop()
+        memory_result = memory.stop() if memory else None
+
+        print("\n" + "=" * 60)
+        print(f"性能剖析结果（总耗时 {elapsed:.1f}s）")
+        print("-" * 60)
+        if profile:
+            stats = profile.stats()
+            stats.dump_stats(base + '.prof')
+            stats.stream = sys.stdout
+            stats.sort_stats('cumulative').print_stats(TOP_N)
+            threads = f"{len(profile.threads)} 个工作线程" if profile.per_thread else "含全部线程"
+            print(f"cProfile: {base}.prof（{threads}）")
+        if sampler:
+            sampler.write_collapsed(base + '.collapsed')
+            print(f"折叠栈: {base}.collapsed（{sampler.samples} 次采样）")
+        if memory_result:
+            text = memory.report(*memory_result)
+            with open(base + '.memory.txt', 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+            print(text)
+            print(f"内存报告: {base}.memory.txt")
+        print("=" * 60)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑行记录 - 涨停池、龙虎榜席位、融资融券个股、涨停梯队的内存行类型
+使用方法：
+  from records import LimitUpStock, record_to_dict
+  json.dump(data, f, ensure_ascii=False, indent=2, default=record_to_dict)
+
+每条记录是带 __slots__ 的 dataclass，不再为每行保存一份 dict 和长中文键。
+只在 JSON/TXT 序列化时通过 to_dict() 转成与原来完全相同的键和顺序；
+record['原键名'] / record.get('原键名') 的只读访问保持可用，读取
+已保存 JSON（dict）和内存记录的代码可以共用。
+"""
+
+from dataclasses import dataclass
+
+
+class Record:
+    """行记录基类，子类用 @record(...) 声明输出键名"""
+    __slots__ = ()
+    KEYS = ()         # 输出键名，顺序与字段顺序一致
+    KEY_ATTRS = {}    # 输出键名 -> 属性名
+
+    def to_dict(self):
+        return {key: getattr(self, attr) for key, attr in zip(self.KEYS, self.__slots__)}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self.KEY_ATTRS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.KEY_ATTRS
+
+    def get(self, key, default=None):
+        attr = self.KEY_ATTRS.get(key)
+        return getattr(self, attr) if attr else default
+
+
+def record(*keys):
+    """生成 slots dataclass；keys 为各字段的输出键名，省略时与属性名相同"""
+    def wrap(cls):
+        cls = dataclass(slots=True)(cls)
+        attrs = cls.__slots__
+        if keys and len(keys) != len(attrs):
+            raise TypeError(f"{cls.__name__}: 输出键名数量与字段数量不一致")
+        cls.KEYS = tuple(keys) if keys else tuple(attrs)
+        cls.KEY_ATTRS = dict(zip(cls.KEYS, attrs))
+        return cls
+    return wrap
+
+
+def record_to_dict(obj):
+    """json.dump 的 default 钩子：序列化时把记录转成 dict"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@record()
+class LimitUpStock(Record):
+    """财联社涨停池个股"""
+    code: str
+    name: str
+    change_percent: str
+    price: float
+    limit_up_time: str
+    reason: str
+    plates: str
+
+
+@record()
+class DragonTigerSeat(Record):
+    """龙虎榜营业部席位"""
+    rank: int
+    department_name: str
+    buy_amount: float
+    sell_amount: float
+    net_amount: float
+    direction: str
+    label: str
+    amount_ratio: float = 0.0
+
+
+@record(
+    '股票代码', '股票名称',
+    '融资偿还额(万元)', '融券偿还量(万股)',
+    '融资占流通市值比(%)', '融券占流通市值比(%)',
+    '融资余额(万元)', '融资买入额(万元)', '融资净买入(万元)',
+    '融券余量(万股)', '融券卖出量(万股)', '融券余额(万元)', '融券净卖出(万股)',
+    '融资融券差值(万元)'
+)
+class RzrqStock(Record):
+    """融资融券个股"""
+    code: str
+    name: str
+    margin_repay: float
+    short_repay: float
+    margin_float_ratio: float
+    short_float_ratio: float
+    margin_balance: float
+    margin_buy: float
+    margin_net_buy: float
+    short_volume: float
+    short_sell: float
+    short_balance: float
+    short_net_sell: float
+    balance_diff: float
+
+
+@record()
+class LadderStock(Record):
+    """大智慧涨停梯队个股"""
+    code: str
+    name: str
+    close_price: float
+    change_rate: float
+    turnover_rate: float
+    dnum: int
+    bnum: int
+    board_label: str
+    market: str
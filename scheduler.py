@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻调度器 - 在同一进程内按时间窗口执行定时任务，取代 cron 窗口判断和锁文件
+使用方法：
+  python scraper.py daemon           # 启动常驻调度
+  python scraper.py daemon status    # 查看各任务最近一次执行情况
+
+时间窗口与 cls_spider.yml 一致：北京时间目标时刻 ±30 分钟内、交易日、当天尚未执行过。
+执行记录保存在单个状态文件中（每个任务一条），不再为每个任务每天生成锁文件。
+进程常驻，HTTP 会话和已加载的索引在任务之间复用。
+"""
+
+import os
+import json
+import time
+from datetime import datetime, timedelta
+from trading_calendar import get_beijing_time, is_trading_day
+
+SCHEDULER_STATE_PATH = os.path.join('.github', 'scheduler_state.json')
+STATE_VERSION = 1
+POLL_INTERVAL = 30      # 检查时间窗口的间隔（秒）
+DEFAULT_WINDOW = 30     # 目标时刻前后的窗口（分钟）
+
+
+class ScheduledTask:
+    def __init__(self, name, at, func, window=DEFAULT_WINDOW, description=''):
+        self.name = name
+        self.at = datetime.strptime(at, '%H:%M').time()   # 北京时间
+        self.func = func
+        self.window = timedelta(minutes=window)
+        self.description = description or name
+
+    def run_date(self, now):
+        """now 落在某天目标时刻的窗口内时返回那一天（处理跨零点的窗口），否则返回 None"""
+        for offset in (0, -1, 1):
+            day = now.date() + timedelta(days=offset)
+            if abs(now - datetime.combine(day, self.at)) <= self.window:
+                return day
+        return None
+
+
+class Scheduler:
+    def __init__(self, tasks, state_path=SCHEDULER_STATE_PATH, poll_interval=POLL_INTERVAL):
+        self.tasks = tasks
+        self.state_path = state_path
+        self.poll_interval = poll_interval
+        self.state = self.load_state()
+
+    # ---------- 状态 ----------
+
+    def load_state(self):
+        """读取执行记录，文件不存在或损坏时返回空记录"""
+        if not os.path.exists(self.state_path):
+            return {"version": STATE_VERSION, "tasks": {}}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                return state
+        except Exception as e:
+            print(f"读取调度状态失败: {e}")
+        return {"version": STATE_VERSION, "tasks": {}}
+
+    def save_state(self):
+        """原子写入执行记录"""
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def last_run_date(self, task):
+        return self.state['tasks'].get(task.name, {}).get('date')
+
+    # ---------- 调度 ----------
+
+    def due_tasks(self, now):
+        """当前需要执行的任务：在窗口内、交易日、当天未执行"""
+        due = []
+        for task in self.tasks:
+            day = task.run_date(now)
+            if day is None or not is_trading_day(day):
+                continue
+            if self.last_run_date(task) == day.strftime('%Y-%m-%d'):
+                continue
+            due.append((task, day))
+        return due
+
+    def run_task(self, task, day):
+        print(f"\n[{get_beijing_time().strftime('%Y-%m-%d %H:%M:%S')}] 开始执行: {task.description}")
+        start = time.perf_counter()
+        status = 'success'
+        error = None
+        try:
+            task.func()
+        except Exception as e:
+            status = 'failed'
+            error = str(e)
+            print(f"任务 {task.name} 执行失败: {e}")
+        elapsed = time.perf_counter() - start
+
+        # 失败也记为当天已执行，与锁文件行为一致，避免窗口内反复重试
+        self.state['tasks'][task.name] = {
+            "date": day.strftime('%Y-%m-%d'),
+            "run_time": get_beijing_time().strftime('%Y-%m-%d %H:%M:%S'),
+            "status": status,
+            "elapsed": round(elapsed, 1),
+            "error": error
+        }
+        self.save_state()
+        print(f"[{get_beijing_time().strftime('%H:%M:%S')}] {task.description} {'完成' if status == 'success' else '失败'}，耗时 {elapsed:.1f}s")
+
+    def run_pending(self, now=None):
+        """执行当前到期的任务，返回执行的任务数"""
+        due = self.due_tasks(now or get_beijing_time())
+        for task, day in due:
+            self.run_task(task, day)
+        return len(due)
+
+    def next_run(self, now):
+        """下一个任务的名称和目标时刻（仅用于提示）"""
+        candidates = []
+        for task in self.tasks:
+            for offset in range(0, 15):
+                day = now.date() + timedelta(days=offset)
+                target = datetime.combine(day, task.at)
+                if target + task.window < now or not is_trading_day(day):
+                    continue
+                if self.last_run_date(task) == day.strftime('%Y-%m-%d'):
+                    continue
+                candidates.append((target, task))
+                break
+        return min(candidates, key=lambda item: item[0]) if candidates else (None, None)
+
+    def run_forever(self):
+        """常驻运行，Ctrl+C 退出"""
+        print(f"调度器已启动，共 {len(self.tasks)} 个任务，状态文件: {self.state_path}")
+        self.print_status()
+        try:
+            while True:
+                if self.run_pending():
+                    target, task = self.next_run(get_beijing_time())
+                    if task:
+                        print(f"下一个任务: {task.description}（{target.strftime('%Y-%m-%d %H:%M')}）")
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n调度器已停止")
+
+    def print_status(self):
+        """打印各任务的时间窗口和最近一次执行情况"""
+        print(f"{'任务':<16}{'时刻':<8}{'最近执行':<22}{'状态':<8}{'耗时':>8}")
+        for task in self.tasks:
+            record = self.state['tasks'].get(task.name, {})
+            status = {'success': '成功', 'failed': '失败'}.get(record.get('status'), '-')
+            elapsed = f"{record['elapsed']:.1f}s" if 'elapsed' in record else '-'
+            print(f"{task.name:<16}{task.at.strftime('%H:%M'):<8}{record.get('run_time', '-'):<22}{status:<8}{elapsed:>8}")
+        target, task = self.next_run(get_beijing_time())
+        if task:
+            print(f"下一个任务: {task.description}（{target.strftime('%Y-%m-%d %H:%M')}）")
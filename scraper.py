@@ -4,14 +4,44 @@ import json
 import time
 import hashlib
 import urllib.parse
-import requests
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import re
 import codecs
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from trading_calendar import check_trading_day, prev_trading_day, latest_trading_day, trading_days
+from ladder_engine import update_ladder, rebuild_ladders, get_ladder, get_ladders, print_ladder
+from seat_analytics import update_seat_store, rebuild_seat_store, print_seat_rankings, print_seat_history
+from records import LimitUpStock, DragonTigerSeat, RzrqStock, record_to_dict
+import metrics
+# requests / bs4 / concurrent.futures / task_runner / scheduler 等在各命令用到时才导入，
+# 不需要它们的命令（ladder、seats、帮助等）启动时不付出导入开销
+
+# 上游站点地址：设置环境变量 UPSTREAM_BASE（如 http://127.0.0.1:8800）后，所有接口和页面请求改发到
+# 该地址（本地模拟服务见 mock_upstream.py），路径不变；未设置时直接请求各站点
+UPSTREAM_BASE = os.environ.get('UPSTREAM_BASE', '').rstrip('/')
+
+def upstream_url(host, path):
+    """上游接口地址：host 为真实站点域名，path 以 / 开头"""
+    return f"{UPSTREAM_BASE or 'https://' + host}{path}"
+
+# 共享 HTTP 会话：同一进程内的任务（all / daemon）复用连接，避免每次请求重新握手
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """共享 HTTP 会话，首次联网时才导入 requests 并创建"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                import http_trace
+                session = requests.Session()
+                http_trace.trace_session(session, pool_size=16)
+                metrics.install_session_hooks(session)
+                _http_session = session
+    return _http_session
 
 
 
@@ -72,10 +102,10 @@ def get_beijing_time():
     return datetime.utcnow() + timedelta(hours=8)
 
 def fetch_limit_up_data():
-    url = "https://x-quote.cls.cn/quote/index/up_down_analysis"
+    url = upstream_url("x-quote.cls.cn", "/quote/index/up_down_analysis")
     try:
         params = get_params()
-        response = requests.get(url, params=params, headers=get_headers(), timeout=10)
+        response = get_http_session().get(url, params=params, headers=get_headers(), timeout=10)
         response.raise_for_status()
         data = response.json()
         if data['code'] != 200:
@@ -98,15 +128,15 @@ def process_limit_up_data(data):
         change_value = float(stock['change']) * 100
         change_percent = f"{change_value:.2f}%"
         
-        formatted_stock = {
-            "code": convert_stock_code(stock['secu_code']),
-            "name": stock['secu_name'].strip(),
-            "change_percent": change_percent,
-            "price": stock['last_px'],
-            "limit_up_time": stock['time'],
-            "reason": stock['up_reason'],
-            "plates": format_plate_names(stock['plate'])
-        }
+        formatted_stock = LimitUpStock(
+            code=convert_stock_code(stock['secu_code']),
+            name=stock['secu_name'].strip(),
+            change_percent=change_percent,
+            price=stock['last_px'],
+            limit_up_time=stock['time'],
+            reason=stock['up_reason'],
+            plates=format_plate_names(stock['plate'])
+        )
         formatted_data.append(formatted_stock)
     
     result = {
@@ -124,8 +154,7 @@ def save_limit_up_data(data):
     os.makedirs('data', exist_ok=True)
     current_date = data['date']
     
-    with open(f'data/{current_date}.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    metrics.write_json(f'data/{current_date}.json', data, ensure_ascii=False, indent=2, default=record_to_dict)
     
     dates = [f.replace('.json', '') for f in os.listdir('data') if f.endswith('.json') and f != 'index.json']
     dates.sort(reverse=True)
@@ -134,24 +163,152 @@ def save_limit_up_data(data):
         json.dump(dates, f, ensure_ascii=False)
     
     print(f"涨停池数据已保存: {current_date}, 共{data['count']}只涨停股")
+    
+    # 增量更新连板梯队
+    update_ladder(data)
+
+# 盘中轮询
+LIMIT_UP_POLL_INTERVAL = 60   # 秒
+TRADING_SESSIONS = (('09:25', '11:30'), ('13:00', '15:00'))  # 北京时间
+LIMIT_UP_EVENT_DIR = os.path.join('data', 'events')
+
+def load_limit_up_day(date_str):
+    """读取已保存的当日涨停池，不存在或损坏时返回 None"""
+    path = f'data/{date_str}.json'
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def diff_limit_up_pools(prev_stocks, curr_stocks, seen_codes=()):
+    """按股票代码比较两次快照，返回变化事件列表
+    
+    new: 新涨停；resealed: 当日炸板后回封；broken: 炸板（从涨停池消失）；reason: 涨停原因变化
+    """
+    prev_map = {stock['code']: stock for stock in prev_stocks}
+    curr_map = {stock['code']: stock for stock in curr_stocks}
+    events = []
+    
+    for code, stock in curr_map.items():
+        old = prev_map.get(code)
+        if old is None:
+            events.append({
+                "type": "resealed" if code in seen_codes else "new",
+                "code": code,
+                "name": stock['name'],
+                "limit_up_time": stock['limit_up_time'],
+                "reason": stock['reason']
+            })
+        elif old['reason'] != stock['reason']:
+            events.append({
+                "type": "reason",
+                "code": code,
+                "name": stock['name'],
+                "old_reason": old['reason'],
+                "reason": stock['reason']
+            })
+    
+    for code, stock in prev_map.items():
+        if code not in curr_map:
+            events.append({"type": "broken", "code": code, "name": stock['name']})
+    
+    return events
+
+def load_limit_up_event_codes(date_str):
+    """当日事件日志中出现过的股票代码"""
+    path = os.path.join(LIMIT_UP_EVENT_DIR, f'{date_str}.jsonl')
+    codes = set()
+    if not os.path.exists(path):
+        return codes
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                codes.add(json.loads(line)['code'])
+            except Exception:
+                continue
+    return codes
+
+def append_limit_up_events(date_str, events, event_time):
+    """把变化事件追加到当日事件日志（每行一个紧凑 JSON）"""
+    os.makedirs(LIMIT_UP_EVENT_DIR, exist_ok=True)
+    path = os.path.join(LIMIT_UP_EVENT_DIR, f'{date_str}.jsonl')
+    with open(path, 'a', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps({"time": event_time, **event}, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+def in_trading_session(now):
+    """当前是否在交易时段内，返回 (是否在时段内, 是否已收盘)"""
+    hm = now.strftime('%H:%M')
+    if any(start <= hm <= end for start, end in TRADING_SESSIONS):
+        return True, False
+    return False, hm > TRADING_SESSIONS[-1][1]
+
+def poll_limit_up_once(prev_data, seen_codes):
+    """拉取一次涨停池并与上次快照比较；有变化时写事件日志并重写当日文件，返回 (当前快照, 事件)"""
+    data = process_limit_up_data(fetch_limit_up_data())
+    if not data:
+        return prev_data, []
+    
+    prev_stocks = prev_data['stocks'] if prev_data and prev_data.get('date') == data['date'] else []
+    events = diff_limit_up_pools(prev_stocks, data['stocks'], seen_codes)
+    if events:
+        append_limit_up_events(data['date'], events, data['update_time'][11:])
+        seen_codes.update(event['code'] for event in events)
+        save_limit_up_data(data)
+        summary = {}
+        for event in events:
+            summary[event['type']] = summary.get(event['type'], 0) + 1
+        labels = {'new': '新涨停', 'resealed': '回封', 'broken': '炸板', 'reason': '原因变化'}
+        print(f"[{data['update_time'][11:]}] 涨停{data['count']}只，" + "，".join(f"{labels[k]}{v}" for k, v in summary.items()))
+    # 没有变化时不重写文件，本次快照仍作为下次比较的基准
+    return data, events
+
+def poll_limit_up(interval=LIMIT_UP_POLL_INTERVAL):
+    """盘中按固定间隔轮询涨停池，只记录变化；收盘后退出"""
+    date_str = get_beijing_time().strftime("%Y-%m-%d")
+    prev_data = load_limit_up_day(date_str)
+    seen_codes = load_limit_up_event_codes(date_str)
+    if prev_data:
+        seen_codes.update(stock['code'] for stock in prev_data.get('stocks', []))
+    print(f"开始盘中轮询涨停池，间隔 {interval} 秒，事件日志: {LIMIT_UP_EVENT_DIR}/{date_str}.jsonl")
+    
+    total_events = 0
+    try:
+        while True:
+            in_session, closed = in_trading_session(get_beijing_time())
+            if closed:
+                break
+            if in_session:
+                try:
+                    prev_data, events = poll_limit_up_once(prev_data, seen_codes)
+                    total_events += len(events)
+                except Exception as e:
+                    print(f"轮询涨停池失败: {e}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    print(f"盘中轮询结束，共记录 {total_events} 条变化")
 
 # ========== 韭研公社文章爬取相关函数 ==========
 
 JIUYAN_USERS = {
     '盘前纪要': {
-        'user_url': 'https://www.jiuyangongshe.com/u/4df747be1bf143a998171ef03559b517',
+        'user_url': upstream_url('www.jiuyangongshe.com', '/u/4df747be1bf143a998171ef03559b517'),
         'user_name': '盘前纪要',
         'save_dir_prefix': '韭研公社_盘前纪要',
         'mode': 'full'
     },
     '盘前解读': {
-        'user_url': 'https://www.jiuyangongshe.com/u/97fc2a020e644adb89570e69ae35ec02',
+        'user_url': upstream_url('www.jiuyangongshe.com', '/u/97fc2a020e644adb89570e69ae35ec02'),
         'user_name': '盘前解读',
         'save_dir_prefix': '韭研公社_盘前解读',
         'mode': 'full'
     },
     '优秀阿呆': {
-        'user_url': 'https://www.jiuyangongshe.com/u/88cf268bc56c423c985b87d1b1ff5de4',
+        'user_url': upstream_url('www.jiuyangongshe.com', '/u/88cf268bc56c423c985b87d1b1ff5de4'),
         'user_name': '优秀阿呆',
         'save_dir_prefix': '韭研公社_优秀阿呆',
         'mode': 'simple'
@@ -161,12 +318,21 @@ JIUYAN_USERS = {
 JIUYAN_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
 }
+
+# 优先使用lxml解析（C实现），未安装时退回内置解析器
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 def get_target_article_url(user_url, date_str):
     """从用户主页获取指定日期的文章链接，返回所有匹配文章按时间倒序排列"""
     try:
-        resp = requests.get(user_url, headers=JIUYAN_HEADERS, timeout=15)
+        resp = get_http_session().get(user_url, headers=JIUYAN_HEADERS, timeout=15)
         resp.encoding = resp.apparent_encoding
-        soup = BeautifulSoup(resp.text, "html.parser")
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(resp.text, HTML_PARSER)
         
         articles = []
         for li in soup.find_all('li'):
@@ -197,33 +363,122 @@ def get_target_article_url(user_url, date_str):
     return []
 
 
+def decode_article_content_legacy(content_html):
+    """旧版正文解码（unicode_escape + latin1往返），仅在JSON解码失败时使用"""
+    content_html = content_html.replace('\\\\u', '\\u')
+    content_html = codecs.decode(content_html, 'unicode_escape')
+    content_html = content_html.encode('latin1').decode('utf-8')
+    content_html = content_html.replace('\\"', '"')
+    return content_html
+
+def extract_article_html(html):
+    """从文章页面中截取并解码正文HTML
+    
+    正文是页面脚本里 content:"..." 的JS字符串字面量，按JSON字符串一次解码，
+    遇到JSON不支持的转义（如 \\x、\\'）时退回旧版解码。
+    """
+    start = html.find('content:"')
+    if start == -1:
+        return None
+    start += len('content:"')
+    end = html.find('",url:', start)
+    if end == -1:
+        return None
+
+    content_html = html[start:end]
+    if '\\\\u' in content_html:
+        content_html = content_html.replace('\\\\u', '\\u')
+    try:
+        return json.loads('"' + content_html + '"', strict=False)
+    except ValueError:
+        return decode_article_content_legacy(content_html)
+
+def parse_article_html(content_html):
+    """解析正文HTML"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(content_html, HTML_PARSER)
+
 def fetch_article_content(article_url):
     """获取文章详细内容"""
     try:
-        resp = requests.get(article_url, headers=JIUYAN_HEADERS, timeout=15)
-        html = resp.text
+        resp = get_http_session().get(article_url, headers=JIUYAN_HEADERS, timeout=15)
 
-        pattern = r'content:"(.*?)",url:'
-        match = re.search(pattern, html, re.DOTALL)
-        if not match:
-            return None, None, None
-
-        content_html = match.group(1)
-        content_html = content_html.replace('\\\\u', '\\u')
-        content_html = codecs.decode(content_html, 'unicode_escape')
-        content_html = content_html.encode('latin1').decode('utf-8')
-        content_html = content_html.replace('\\"', '"')
+        content_html = extract_article_html(resp.text)
+        if content_html is None:
+            return None, None
 
-        soup = BeautifulSoup(content_html, "html.parser")
-        return soup, article_url, html
+        with metrics.stage('parse'):
+            return parse_article_html(content_html), article_url
     except Exception as e:
         print(f"获取文章内容失败: {e}")
-        return None, None, None
+        return None, None
+
+IMAGE_PLACEHOLDER_PATTERN = re.compile(r'\[图片:([^\]]+)\]')
+
+def extract_text_blocks(soup, block_tags):
+    """单次遍历DOM，按文本块输出非空行
+    
+    块级元素内的文本按块拼接为一行；块内嵌套的子块单独成行，
+    不会在祖先块中重复输出。重复的图片占位符在遍历时直接丢弃。
+    """
+    from bs4 import NavigableString, Tag
+    lines = []
+    buffer = []
+    seen_images = set()
+
+    def flush():
+        if buffer:
+            line = ''.join(buffer)
+            buffer.clear()
+            if line.strip():
+                lines.append(line)
+
+    def dedupe_placeholders(text):
+        def replace_func(match):
+            img_name = match.group(1)
+            if img_name in seen_images:
+                return ''
+            seen_images.add(img_name)
+            return match.group(0)
+        return IMAGE_PLACEHOLDER_PATTERN.sub(replace_func, text)
+
+    # 栈中元素: (节点, 是否为块结束标记)
+    stack = [(child, False) for child in reversed(soup.contents)]
+    block_depth = 0
+    while stack:
+        node, closing = stack.pop()
+        if closing:
+            flush()
+            block_depth -= 1
+            continue
+
+        if isinstance(node, Tag):
+            if node.name in block_tags:
+                flush()
+                block_depth += 1
+                stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.contents))
+        elif type(node) is NavigableString and block_depth:
+            text = node.strip()
+            if not text:
+                continue
+            if '[图片:' in text:
+                text = dedupe_placeholders(text)
+            buffer.append(text)
+
+    flush()
+    return lines
 
 def save_article_and_generate_json(soup, article_url, save_dir, base_fname, user_info, date_str):
     """保存文章并生成JSON数据"""
     mode = user_info.get('mode', 'full')
     
+    # PIL 只导入一次，不在每张图片的循环里重复导入；未安装时图片校验失败，与原行为一致
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+    
     # 创建目录
     os.makedirs(save_dir, exist_ok=True)
     
@@ -258,7 +513,8 @@ def save_article_and_generate_json(soup, article_url, save_dir, base_fname, user
                 continue
             
             try:
-                r = requests.get(src, headers=headers_with_referer, timeout=10)
+                with metrics.stage('fetch'):
+                    r = get_http_session().get(src, headers=headers_with_referer, timeout=10)
                 if r.status_code != 200:
                     continue
                 
@@ -273,7 +529,6 @@ def save_article_and_generate_json(soup, article_url, save_dir, base_fname, user
                 
                 # 验证图片
                 try:
-                    from PIL import Image
                     with Image.open(img_path) as im:
                         im.verify()
                 except:
@@ -301,59 +556,19 @@ def save_article_and_generate_json(soup, article_url, save_dir, base_fname, user
                 print(f"下载图片失败: {e}")
                 continue
 
-    # 提取文本内容
-    if mode == 'full':
-        lines = []
-        for block in soup.find_all(['p', 'div', 'li']):
-            text = ''.join(block.stripped_strings)
-            if text.strip():
-                lines.append(text)
-        content_text = '\n'.join(lines)
-    else:
-        lines = []
-        for p in soup.find_all('p'):
-            text = ''.join(p.stripped_strings)
-            if text.strip():
-                lines.append(text)
-        content_text = '\n\n'.join(lines)
-
-    # 去除重复的图片占位符
-    def remove_duplicate_image_placeholders(text):
-        import re
-        pattern = r'\[图片:([^\]]+)\]'
-        seen_images = set()
-        
-        def replace_func(match):
-            img_name = match.group(1)
-            if img_name in seen_images:
-                return ''  # 移除重复的占位符
-            else:
-                seen_images.add(img_name)
-                return match.group(0)  # 保留第一次出现的占位符
-        
-        # 先移除重复的占位符
-        deduplicated = re.sub(pattern, replace_func, text)
-        
-        # 清理多余的空行
-        lines = deduplicated.split('\n')
-        cleaned_lines = []
-        prev_empty = False
-        
-        for line in lines:
-            is_empty = not line.strip()
-            if is_empty and prev_empty:
-                continue  # 跳过连续的空行
-            cleaned_lines.append(line)
-            prev_empty = is_empty
-        
-        return '\n'.join(cleaned_lines)
-
-    content_text = remove_duplicate_image_placeholders(content_text)
+    # 提取文本内容（单次遍历，每个文本块只输出一次，图片占位符同时去重）
+    with metrics.stage('format'):
+        if mode == 'full':
+            lines = extract_text_blocks(soup, ('p', 'div', 'li'))
+            content_text = '\n'.join(lines)
+        else:
+            lines = extract_text_blocks(soup, ('p',))
+            content_text = '\n\n'.join(lines)
+    metrics.add_rows(len(lines))
 
     # 保存文本文件
     txt_path = os.path.join(save_dir, f"{base_fname}.txt")
-    with open(txt_path, 'w', encoding='utf-8-sig') as f:
-        f.write(content_text)
+    metrics.write_text(txt_path, content_text, encoding='utf-8-sig')
 
     # 保存Word文档（如果是full模式）
     docx_path = None
@@ -384,7 +599,6 @@ def save_article_and_generate_json(soup, article_url, save_dir, base_fname, user
                     if os.path.exists(img_path):
                         try:
                             # 检查图片尺寸，避免过大
-                            from PIL import Image
                             with Image.open(img_path) as pil_img:
                                 width, height = pil_img.size
                                 # 限制最大宽度为6英寸
@@ -406,7 +620,9 @@ def save_article_and_generate_json(soup, article_url, save_dir, base_fname, user
                         doc.add_paragraph(part)
             
             docx_path = os.path.join(save_dir, f"{base_fname}.docx")
-            doc.save(docx_path)
+            with metrics.stage('write'):
+                doc.save(docx_path)
+            metrics.add_bytes_out(os.path.getsize(docx_path))
             
         except ImportError:
             print("警告：未安装python-docx，跳过Word文档生成")
@@ -451,7 +667,8 @@ def crawl_jiuyan_article(user_key, date_str=None):
     
     try:
         # 获取当天所有文章，按时间倒序排列
-        articles = get_target_article_url(user_info['user_url'], date_str)
+        with metrics.stage('fetch'):
+            articles = get_target_article_url(user_info['user_url'], date_str)
         
         if not articles:
             print(f"未找到{user_info['user_name']} {date_str}的文章")
@@ -468,7 +685,8 @@ def crawl_jiuyan_article(user_key, date_str=None):
             print(f"尝试处理第 {i+1} 篇文章：{title} ({pub_time})")
             
             try:
-                soup, article_url, _ = fetch_article_content(article_url)
+                with metrics.stage('fetch'):
+                    soup, article_url = fetch_article_content(article_url)
                 if soup is None:
                     print(f"获取文章内容失败，尝试下一篇...")
                     continue
@@ -567,6 +785,7 @@ def save_articles_index(articles_data, date_str):
     
     print(f"文章索引已更新: {date_str}")
 
+@metrics.instrumented('jiuyan')
 def crawl_single_jiuyan_user(user_key, date_str=None):
     """爬取单个用户的文章"""
     print(f"开始爬取 {user_key} 的文章...")
@@ -587,6 +806,7 @@ def crawl_single_jiuyan_user(user_key, date_str=None):
         print(f"未能获取 {user_key} 的文章")
         return None
 
+@metrics.instrumented('jiuyan')
 def crawl_all_jiuyan_articles(date_str=None):
     """爬取所有韭研公社文章"""
     print("开始爬取所有韭研公社文章...")
@@ -614,7 +834,7 @@ def fetch_stock_analysis_data(date_str=None):
     if not date_str:
         date_str = get_beijing_time().strftime('%Y-%m-%d')
     
-    url = "https://app.jiuyangongshe.com/jystock-app/api/v1/action/field"
+    url = upstream_url("app.jiuyangongshe.com", "/jystock-app/api/v1/action/field")
     
     headers = {
         "Host": "app.jiuyangongshe.com",
@@ -644,7 +864,7 @@ def fetch_stock_analysis_data(date_str=None):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = get_http_session().post(url, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         data = response.json()
         
@@ -746,14 +966,13 @@ def save_stock_analysis_data(data):
     
     # 保存JSON数据
     json_path = f'analysis/{current_date}.json'
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    metrics.write_json(json_path, data, ensure_ascii=False, indent=2)
     
     # 保存文本格式
-    text_content = generate_analysis_text_content(data)
+    with metrics.stage('format'):
+        text_content = generate_analysis_text_content(data)
     txt_path = f'analysis/{current_date}.txt'
-    with open(txt_path, 'w', encoding='utf-8') as f:
-        f.write(text_content)
+    metrics.write_text(txt_path, text_content)
     
     # 更新索引文件
     index_path = 'analysis/index.json'
@@ -785,6 +1004,7 @@ def save_stock_analysis_data(data):
     
     print(f"异动解析数据已保存: {current_date}, 共{data['category_count']}个板块，{data['total_stocks']}只股票")
 
+@metrics.instrumented('analysis')
 def crawl_stock_analysis(date_str=None):
     """爬取异动解析数据"""
     print("开始获取韭研公社异动解析数据...")
@@ -793,10 +1013,13 @@ def crawl_stock_analysis(date_str=None):
         date_str = get_beijing_time().strftime('%Y-%m-%d')
     
     try:
-        raw_data = fetch_stock_analysis_data(date_str)
-        processed_data = process_stock_analysis_data(raw_data, date_str)
+        with metrics.stage('fetch'):
+            raw_data = fetch_stock_analysis_data(date_str)
+        with metrics.stage('format'):
+            processed_data = process_stock_analysis_data(raw_data, date_str)
         
         if processed_data:
+            metrics.add_rows(processed_data['total_stocks'])
             save_stock_analysis_data(processed_data)
             print(f"异动解析数据获取成功: {date_str}")
             return processed_data
@@ -812,7 +1035,7 @@ def crawl_stock_analysis(date_str=None):
 
 def get_tdx_lhb_overview():
     """获取通达信龙虎榜总览数据"""
-    url = "https://fk.tdx.com.cn/TQLEX?Entry=CWServ.tdxsj_lhbd_lhbzl"
+    url = upstream_url("fk.tdx.com.cn", "/TQLEX?Entry=CWServ.tdxsj_lhbd_lhbzl")
     
     headers = {
         "Host": "fk.tdx.com.cn",
@@ -833,7 +1056,7 @@ def get_tdx_lhb_overview():
     data = {"Params": ["0", "0", "0"]}
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data), timeout=15)
+        response = get_http_session().post(url, headers=headers, data=json.dumps(data), timeout=15)
         response.raise_for_status()
         
         result = response.json()
@@ -883,7 +1106,7 @@ def parse_lhb_overview(overview_data):
 
 def get_single_dragon_tiger_detail(stock_code, date):
     """获取单只股票的龙虎榜详细信息"""
-    url = "https://fk.tdx.com.cn/TQLEX?Entry=CWServ.tdxsj_lhbd_ggxq"
+    url = upstream_url("fk.tdx.com.cn", "/TQLEX?Entry=CWServ.tdxsj_lhbd_ggxq")
     
     headers = {
         'Host': 'fk.tdx.com.cn',
@@ -907,7 +1130,7 @@ def get_single_dragon_tiger_detail(stock_code, date):
     payload = json.dumps({"Params": ["1", stock_code, date]})
     
     try:
-        response = requests.post(url, headers=headers, data=payload, timeout=10)
+        response = get_http_session().post(url, headers=headers, data=payload, timeout=10)
         response.raise_for_status()
         
         raw_data = response.json()
@@ -948,19 +1171,19 @@ def get_single_dragon_tiger_detail(stock_code, date):
             sell_seats = []
             
             for row in table1['Content']:
-                seat_info = {
-                    "rank": int(row[0]) if row[0] else 0,
-                    "department_name": row[2],
-                    "buy_amount": float(row[3]) if row[3] else 0,
-                    "sell_amount": float(row[4]) if row[4] else 0,
-                    "net_amount": float(row[5]) if row[5] else 0,
-                    "direction": row[7],
-                    "label": row[12] if row[12] else ""
-                }
+                seat_info = DragonTigerSeat(
+                    rank=int(row[0]) if row[0] else 0,
+                    department_name=row[2],
+                    buy_amount=float(row[3]) if row[3] else 0,
+                    sell_amount=float(row[4]) if row[4] else 0,
+                    net_amount=float(row[5]) if row[5] else 0,
+                    direction=row[7],
+                    label=row[12] if row[12] else ""
+                )
                 
                 # 计算占比
                 total_amount = basic_info[3] if basic_info[3] > 0 else 1
-                seat_info["amount_ratio"] = round(abs(row[5]) / total_amount * 100, 2)
+                seat_info.amount_ratio = round(abs(row[5]) / total_amount * 100, 2)
                 
                 if row[7] == "B":
                     buy_seats.append(seat_info)
@@ -971,8 +1194,8 @@ def get_single_dragon_tiger_detail(stock_code, date):
             structured_data["sell_seats"] = sell_seats
             
             # 计算资金流向
-            buy_total = sum([seat.get("buy_amount", 0) for seat in buy_seats])
-            sell_total = sum([seat.get("sell_amount", 0) for seat in sell_seats])
+            buy_total = sum(seat.buy_amount for seat in buy_seats)
+            sell_total = sum(seat.sell_amount for seat in sell_seats)
             
             structured_data["capital_flow"] = {
                 "buy_total": buy_total,
@@ -987,8 +1210,10 @@ def get_single_dragon_tiger_detail(stock_code, date):
     except Exception as e:
         return {"code": stock_code, "status": "query_failed", "error": str(e)}
 
+@metrics.instrumented('dragon_tiger')
 def crawl_dragon_tiger_data(date_str=None, max_workers=5, delay=0.1):
     """爬取龙虎榜数据"""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     print("开始获取通达信龙虎榜数据...")
     
     if not date_str:
@@ -997,14 +1222,16 @@ def crawl_dragon_tiger_data(date_str=None, max_workers=5, delay=0.1):
     try:
         # 获取总览数据
         print("1. 获取龙虎榜总览...")
-        overview_data = get_tdx_lhb_overview()
+        with metrics.stage('fetch'):
+            overview_data = get_tdx_lhb_overview()
         if not overview_data:
             print("获取龙虎榜总览失败")
             return None
         
         # 解析总览数据
         print("2. 解析总览数据...")
-        parsed_overview = parse_lhb_overview(overview_data)
+        with metrics.stage('parse'):
+            parsed_overview = parse_lhb_overview(overview_data)
         if not parsed_overview:
             print("解析龙虎榜总览失败")
             return None
@@ -1013,6 +1240,7 @@ def crawl_dragon_tiger_data(date_str=None, max_workers=5, delay=0.1):
         stocks_list = parsed_overview["stocks"]
         
         print(f"发现 {len(stocks_list)} 只龙虎榜股票，交易日期: {trading_date}")
+        metrics.add_rows(len(stocks_list))
         
         # 并发获取详细数据
         print(f"3. 并发获取详细数据（线程数: {max_workers}）...")
@@ -1032,12 +1260,14 @@ def crawl_dragon_tiger_data(date_str=None, max_workers=5, delay=0.1):
         
         completed_count = 0
         lock = threading.Lock()
+        run = metrics.current()
         
         def query_with_delay(stock_info):
             nonlocal completed_count
             
             time.sleep(delay)
-            detail_data = get_single_dragon_tiger_detail(stock_info["code"], trading_date)
+            with metrics.bind(run):
+                detail_data = get_single_dragon_tiger_detail(stock_info["code"], trading_date)
             
             # 合并总览信息
             detail_data.update({
@@ -1068,7 +1298,7 @@ def crawl_dragon_tiger_data(date_str=None, max_workers=5, delay=0.1):
             return detail_data
         
         # 使用线程池并发执行
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with metrics.stage('fetch'), ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_stock = {
                 executor.submit(query_with_delay, stock): stock 
                 for stock in stocks_list
@@ -1104,14 +1334,13 @@ def save_dragon_tiger_data(data):
     
     # 保存JSON数据
     json_path = f'dragon_tiger/{current_date}.json'
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    metrics.write_json(json_path, data, ensure_ascii=False, indent=2, default=record_to_dict)
     
     # 生成文本格式
-    text_content = generate_dragon_tiger_text_content(data)
+    with metrics.stage('format'):
+        text_content = generate_dragon_tiger_text_content(data)
     txt_path = f'dragon_tiger/{current_date}.txt'
-    with open(txt_path, 'w', encoding='utf-8') as f:
-        f.write(text_content)
+    metrics.write_text(txt_path, text_content)
     
     # 更新索引文件
     index_path = 'dragon_tiger/index.json'
@@ -1143,6 +1372,9 @@ def save_dragon_tiger_data(data):
         json.dump(index_data, f, ensure_ascii=False, indent=2)
     
     print(f"龙虎榜数据已保存: {current_date}, 共{data['total_count']}只股票，成功{data['statistics']['success_count']}只")
+    
+    # 更新营业部席位库（只写入当日席位）
+    update_seat_store(data)
 
 def generate_dragon_tiger_text_content(data):
     """生成龙虎榜的文本内容"""
@@ -1217,9 +1449,131 @@ def generate_dragon_tiger_text_content(data):
 
 # ========== 通达信价值分析相关函数 ==========
 
-def get_tdx_reports_data():
-    """获取通达信研报数据（固定365天）"""
-    url = "https://fk.tdx.com.cn/TQLEX?Entry=CWServ.tdxsj_jzfx_ggtzpj"
+TQLEX_CHUNK_SIZE = 64 * 1024
+TQLEX_CONTENT_PATTERN = re.compile(r'"Content"\s*:\s*\[')
+TQLEX_ERROR_CODE_PATTERN = re.compile(r'"ErrorCode"\s*:\s*(-?\d+)')
+
+def check_tqlex_error_code(error_code):
+    if error_code is not None and int(error_code) != 0:
+        raise ValueError(f"API返回错误: {error_code}")
+
+def iter_tqlex_content_ijson(response):
+    """用ijson按事件解析，逐行产出 ResultSets[0].Content
+    
+    ErrorCode 在 ResultSets 之前时读完第一个结果集即停止，否则继续解析到找到 ErrorCode 为止。
+    """
+    import ijson
+    response.raw.decode_content = True
+    result_set = -1
+    builder = None
+    error_code_seen = False
+    for prefix, event, value in ijson.parse(response.raw, use_float=True):
+        if prefix == 'ErrorCode':
+            check_tqlex_error_code(value)
+            error_code_seen = True
+            if result_set > 0:
+                break
+        elif prefix == 'ResultSets.item' and event == 'start_map':
+            result_set += 1
+            if result_set > 0 and error_code_seen:
+                break
+        elif result_set == 0 and prefix.startswith('ResultSets.item.Content.item'):
+            if builder is None:
+                builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if prefix == 'ResultSets.item.Content.item' and event in ('end_array', 'end_map'):
+                yield builder.value
+                builder = None
+
+def iter_tqlex_content_incremental(response, chunk_size=TQLEX_CHUNK_SIZE):
+    """按块读取响应，用 JSONDecoder.raw_decode 逐行解码 ResultSets[0].Content"""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = response.iter_content(chunk_size=chunk_size)
+    buffer = ''
+    error_code = None
+    
+    # 读取到 Content 数组开头，顺便取出前面的 ErrorCode
+    while True:
+        match = TQLEX_CONTENT_PATTERN.search(buffer)
+        if match:
+            header = buffer[:match.start()]
+            buffer = buffer[match.end():]
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            error_match = TQLEX_ERROR_CODE_PATTERN.search(buffer)
+            check_tqlex_error_code(error_match.group(1) if error_match else None)
+            raise ValueError("响应中没有 Content 数据")
+        buffer += text_decoder.decode(chunk)
+    error_match = TQLEX_ERROR_CODE_PATTERN.search(header)
+    if error_match:
+        error_code = error_match.group(1)
+        check_tqlex_error_code(error_code)
+    
+    # 逐行解码，缓冲区只保留尚未完整到达的一行
+    pos = 0
+    finished = False
+    while True:
+        length = len(buffer)
+        while pos < length and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < length and buffer[pos] == ']':
+            buffer = buffer[pos + 1:]
+            break
+        if pos < length:
+            try:
+                row, pos = decoder.raw_decode(buffer, pos)
+                yield row
+                continue
+            except ValueError:
+                if finished:
+                    raise
+        elif finished:
+            raise ValueError("响应在 Content 数据中途结束")
+        
+        chunk = next(chunks, None)
+        buffer = buffer[pos:]
+        pos = 0
+        if chunk is None:
+            buffer += text_decoder.decode(b'', final=True)
+            finished = True
+        else:
+            buffer += text_decoder.decode(chunk)
+    
+    # ErrorCode 在 ResultSets 之后时，读完剩余部分再检查
+    if error_code is None:
+        for chunk in chunks:
+            buffer += text_decoder.decode(chunk)
+        error_match = TQLEX_ERROR_CODE_PATTERN.search(buffer)
+        check_tqlex_error_code(error_match.group(1) if error_match else None)
+
+def stream_tqlex_content(url, headers, data, timeout=30, name="通达信数据"):
+    """流式请求通达信 TQLEX 接口，逐行产出 Content，不在内存中保留完整响应
+    
+    出错时打印错误后重新抛出：中途断开时已产出的行不完整，调用方应整体放弃，不能当作完整数据保存。
+    """
+    # 优先使用ijson流式解析（C后端），未安装时退回基于 raw_decode 的增量解析
+    try:
+        import ijson
+        iter_content = iter_tqlex_content_ijson
+    except ImportError:
+        iter_content = iter_tqlex_content_incremental
+    
+    try:
+        with get_http_session().post(url, headers=headers, data=data, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            yield from iter_content(response)
+    except Exception as e:
+        print(f"流式获取{name}失败: {e}")
+        raise
+
+def get_tdx_reports_data(stream=False):
+    """获取通达信研报数据（固定365天）
+    
+    stream=True 时返回逐行产出的迭代器，内存占用不随返回行数增长。
+    """
+    url = upstream_url("fk.tdx.com.cn", "/TQLEX?Entry=CWServ.tdxsj_jzfx_ggtzpj")
     headers = {
         "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
@@ -1232,8 +1586,11 @@ def get_tdx_reports_data():
     }
     data = '{"Params":["-1","-1","365","","1","1","30000"]}'
     
+    if stream:
+        return stream_tqlex_content(url, headers, data, timeout=15, name="通达信研报数据")
+    
     try:
-        response = requests.post(url, headers=headers, data=data, timeout=15)
+        response = get_http_session().post(url, headers=headers, data=data, timeout=15)
         response.raise_for_status()
         result = response.json()
         if result.get("ErrorCode") == 0:
@@ -1245,6 +1602,10 @@ def get_tdx_reports_data():
         print(f"获取通达信研报数据失败: {e}")
         return []
 
+def format_eps(value):
+    """格式化EPS预测值"""
+    return "{:.2f}".format(float(value)) if value else "--"
+
 def format_tdx_reports(raw_reports):
     """格式化通达信研报数据"""
     formatted_reports = []
@@ -1273,9 +1634,6 @@ def format_tdx_reports(raw_reports):
             eps_actual_str = "{}({})".format(eps_actual, eps_actual_year) if eps_actual else "--"
             target_price_str = "{:.2f}".format(float(target_price)) if target_price else "--"
             
-            def format_eps(value):
-                return "{:.2f}".format(float(value)) if value else "--"
-            
             formatted_report = {
                 "序号": i,
                 "报告日期": formatted_date,
@@ -1334,12 +1692,11 @@ def save_tdx_reports_files(reports, date_str):
     }
     
     json_path = os.path.join(dir_path, "{}.json".format(date_str))
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    metrics.write_json(json_path, json_data, ensure_ascii=False, indent=2)
     
     # 保存TXT
     txt_path = os.path.join(dir_path, "{}.txt".format(date_str))
-    with open(txt_path, "w", encoding="utf-8") as f:
+    with metrics.stage('write'), open(txt_path, "w", encoding="utf-8") as f:
         f.write("===============================\n")
         f.write("通达信价值分析_个股投资评级 - {}\n".format(date_str))
         f.write("===============================\n")
@@ -1364,9 +1721,22 @@ def save_tdx_reports_files(reports, date_str):
                 report["EPS预测"]["T+2年"], int(report["T年度"]) + 2
             ))
             f.write("    标题：{}\n\n".format(report["标题"]))
+    metrics.add_bytes_out(os.path.getsize(txt_path))
     
     return json_path, txt_path
 
+def load_tdx_reports_file(date_str):
+    """读取某日已归档的研报，文件不存在或损坏时返回空列表"""
+    json_path = os.path.join("tdx_value", date_str[:7], "{}.json".format(date_str))
+    if not os.path.exists(json_path):
+        return []
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('研报数据', [])
+    except Exception as e:
+        print(f"读取已归档研报失败 {json_path}: {e}")
+        return []
+
 def is_tdx_reports_first_run():
     """检查是否第一次运行通达信研报功能"""
     if not os.path.exists("tdx_value"):
@@ -1376,6 +1746,7 @@ def is_tdx_reports_first_run():
             return False
     return True
 
+@metrics.instrumented('tdx_reports')
 def crawl_tdx_reports(date_str=None):
     """爬取通达信研报数据"""
     print("开始获取通达信价值分析数据...")
@@ -1384,16 +1755,12 @@ def crawl_tdx_reports(date_str=None):
     beijing_today = beijing_time.strftime("%Y-%m-%d")
     
     try:
-        # 获取原始数据
-        raw_reports = get_tdx_reports_data()
-        if not raw_reports:
-            print("未获取到通达信研报数据")
-            return None
-        
-        # 格式化数据
-        formatted_reports = format_tdx_reports(raw_reports)
+        # 流式获取原始数据并逐行格式化（下载、解析与格式化交织，一并计入 fetch）
+        with metrics.stage('fetch'):
+            formatted_reports = format_tdx_reports(get_tdx_reports_data(stream=True))
+        metrics.add_rows(len(formatted_reports))
         if not formatted_reports:
-            print("格式化通达信研报数据失败")
+            print("未获取到通达信研报数据")
             return None
         
         # 按日期分组
@@ -1456,6 +1823,18 @@ def generate_report_id(report):
     key_string = f"{report['报告日期']}_{report['证券代码']}_{report['研究机构']}_{report['标题']}"
     return hashlib.md5(key_string.encode('utf-8')).hexdigest()
 
+def generate_raw_report_id(row):
+    """直接从原始研报行生成唯一标识，与 generate_report_id(格式化后的研报) 结果一致"""
+    report_date = str(row[3])
+    formatted_date = "{}-{}-{}".format(report_date[:4], report_date[4:6], report_date[6:8])
+    title = str(row[11]) if row[11] else "--"
+    institution = str(row[13]) if row[13] else "--"
+    key_string = f"{formatted_date}_{row[1]}_{institution}_{title}"
+    return hashlib.md5(key_string.encode('utf-8')).hexdigest()
+
+# 已归档研报ID缓存：json 文件路径 -> (修改时间, 研报ID集合)，常驻进程中只重读有变化的文件
+_archived_id_cache = {}
+
 def load_archived_report_ids():
     """加载所有已归档的研报ID"""
     archived_ids = set()
@@ -1474,11 +1853,14 @@ def load_archived_report_ids():
                 json_file = date_info['files']['json']
                 if os.path.exists(json_file):
                     try:
-                        with open(json_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            for report in data.get('研报数据', []):
-                                report_id = generate_report_id(report)
-                                archived_ids.add(report_id)
+                        mtime = os.path.getmtime(json_file)
+                        cached = _archived_id_cache.get(json_file)
+                        if cached is None or cached[0] != mtime:
+                            with open(json_file, 'r', encoding='utf-8') as f:
+                                data = json.load(f)
+                            cached = (mtime, {generate_report_id(report) for report in data.get('研报数据', [])})
+                            _archived_id_cache[json_file] = cached
+                        archived_ids |= cached[1]
                     except:
                         continue
     except:
@@ -1500,6 +1882,30 @@ def detect_new_reports(current_reports):
     
     return new_reports
 
+def detect_new_raw_reports(raw_reports):
+    """在格式化之前按原始字段过滤出新增研报行，返回 (新增行, 原始总行数)
+    
+    raw_reports 可以是流式迭代器，只遍历一次。
+    """
+    archived_ids = load_archived_report_ids()
+    new_rows = []
+    seen_ids = set()
+    total_count = 0
+    
+    for row in raw_reports:
+        total_count += 1
+        try:
+            report_id = generate_raw_report_id(row)
+        except Exception:
+            # 字段异常的行交给 format_tdx_reports 处理和报错
+            new_rows.append(row)
+            continue
+        if report_id not in archived_ids and report_id not in seen_ids:
+            seen_ids.add(report_id)
+            new_rows.append(row)
+    
+    return new_rows, total_count
+
 def update_tdx_reports_index(date_str, report_count, stock_count, institution_count):
     """更新通达信研报索引文件（保持前端兼容性）"""
     index_path = 'tdx_value/index.json'
@@ -1550,49 +1956,58 @@ def update_tdx_reports_index(date_str, report_count, stock_count, institution_co
         json.dump(final_index_data, f, ensure_ascii=False, indent=2)
 
 
+@metrics.instrumented('tdx_reports')
 def smart_archive_new_reports():
     """智能检测并归档新增研报"""
     print("开始智能检测新增研报...")
     
-    # 获取当前数据
-    raw_reports = get_tdx_reports_data()
-    if not raw_reports:
+    # 流式获取当前数据，先按原始字段检测新增研报，只格式化新增部分
+    try:
+        with metrics.stage('fetch'):
+            new_rows, total_count = detect_new_raw_reports(get_tdx_reports_data(stream=True))
+    except Exception:
+        print("研报数据不完整，本次不归档")
+        return None
+    metrics.add_rows(total_count)
+    if not total_count:
         print("未获取到研报数据")
         return None
     
-    current_reports = format_tdx_reports(raw_reports)
-    if not current_reports:
-        print("格式化研报数据失败")
-        return None
+    if not new_rows:
+        print("没有检测到新增研报")
+        return {}   # 正常完成，只是没有需要归档的研报
     
-    # 检测新增研报
-    new_reports = detect_new_reports(current_reports)
+    with metrics.stage('format'):
+        new_reports = format_tdx_reports(new_rows)
     if not new_reports:
-        print("没有检测到新增研报")
+        print("格式化研报数据失败")
         return None
     
-    print(f"检测到新增研报: {len(new_reports)} 条")
+    print(f"检测到新增研报: {len(new_reports)} 条（共 {total_count} 条）")
     
     # 按日期分组并归档
     grouped_new_reports = group_reports_by_date(new_reports)
     
     for date_str, date_reports in grouped_new_reports.items():
-        # 重新编号
-        for i, report in enumerate(date_reports, 1):
+        # 追加到当日已归档的研报之后，序号接着已有的编号
+        archived_reports = load_tdx_reports_file(date_str)
+        for i, report in enumerate(date_reports, len(archived_reports) + 1):
             report["序号"] = i
+        all_reports = archived_reports + date_reports
         
         # 保存文件
-        save_tdx_reports_files(date_reports, date_str)
+        save_tdx_reports_files(all_reports, date_str)
         
         # 更新索引
-        stock_count = len(set(r["证券代码"] for r in date_reports))
-        institution_count = len(set(r["研究机构"] for r in date_reports))
-        update_tdx_reports_index(date_str, len(date_reports), stock_count, institution_count)
+        stock_count = len(set(r["证券代码"] for r in all_reports))
+        institution_count = len(set(r["研究机构"] for r in all_reports))
+        update_tdx_reports_index(date_str, len(all_reports), stock_count, institution_count)
         
-        print(f"归档完成: {date_str}, {len(date_reports)}条研报")
+        print(f"归档完成: {date_str}, 新增{len(date_reports)}条，共{len(all_reports)}条研报")
     
     return grouped_new_reports
 
+@metrics.instrumented('tdx_reports')
 def crawl_tdx_reports_smart(date_str=None):
     """智能版通达信研报爬取"""
     if is_tdx_reports_first_run():
@@ -1615,9 +2030,12 @@ def create_rzrq_directories(date_str):
     os.makedirs(month_dir, exist_ok=True)
     return month_dir
 
-def get_rzrq_market_data():
-    """获取融资融券市场数据"""
-    url = "https://fk.tdx.com.cn/TQLEX?Entry=CWServ.tdxsj_rzrq_sc"
+def get_rzrq_market_data(stream=False):
+    """获取融资融券市场数据
+    
+    stream=True 时逐行解析响应并直接汇总，不在内存中保留完整历史。
+    """
+    url = upstream_url("fk.tdx.com.cn", "/TQLEX?Entry=CWServ.tdxsj_rzrq_sc")
     headers = {
         'Host': 'fk.tdx.com.cn',
         'Connection': 'keep-alive',
@@ -1632,9 +2050,16 @@ def get_rzrq_market_data():
     }
     data = '{"Params":[]}'
     
+    if stream:
+        print("正在流式请求融资融券市场数据...")
+        try:
+            return process_rzrq_market_data(stream_tqlex_content(url, headers, data, timeout=30, name="融资融券市场数据"))
+        except Exception:
+            return {}   # 不完整的汇总结果整体丢弃
+    
     try:
         print("正在请求融资融券市场数据...")
-        response = requests.post(url, headers=headers, data=data, timeout=30)
+        response = get_http_session().post(url, headers=headers, data=data, timeout=30)
         
         if response.status_code != 200:
             print(f"请求失败，状态码: {response.status_code}")
@@ -1690,7 +2115,7 @@ def process_rzrq_market_data(raw_data):
 
 def get_rzrq_industry_data(query_date):
     """获取融资融券行业数据"""
-    url = "https://fk.tdx.com.cn/TQLEX?Entry=CWServ.tdxsj_rzrq_hy"
+    url = upstream_url("fk.tdx.com.cn", "/TQLEX?Entry=CWServ.tdxsj_rzrq_hy")
     headers = {
         'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -1698,7 +2123,7 @@ def get_rzrq_industry_data(query_date):
     data = f'{{"Params":["1","{query_date.replace("-", "")}"]}}'
     
     try:
-        response = requests.post(url, headers=headers, data=data, timeout=15)
+        response = get_http_session().post(url, headers=headers, data=data, timeout=15)
         json_data = response.json()
         if json_data['ErrorCode'] == 0:
             return json_data['ResultSets'][0]['Content']
@@ -1708,7 +2133,7 @@ def get_rzrq_industry_data(query_date):
 
 def get_rzrq_stock_data(market_code, query_date):
     """获取融资融券个股数据"""
-    url = "https://fk.tdx.com.cn/TQLEX?Entry=CWServ.tdxsj_rzrq_gg"
+    url = upstream_url("fk.tdx.com.cn", "/TQLEX?Entry=CWServ.tdxsj_rzrq_gg")
     headers = {
         'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -1716,7 +2141,7 @@ def get_rzrq_stock_data(market_code, query_date):
     data = f'{{"Params":["1","{market_code}","{query_date.replace("-", "")}","040","1","1","2000"]}}'
     
     try:
-        response = requests.post(url, headers=headers, data=data, timeout=15)
+        response = get_http_session().post(url, headers=headers, data=data, timeout=15)
         json_data = response.json()
         if json_data['ErrorCode'] == 0:
             return json_data['ResultSets'][0]['Content']
@@ -1734,7 +2159,8 @@ def process_rzrq_data_for_date(date_str, all_market_data=None):
         market_data = all_market_data[date_str]
     
     # 获取行业数据
-    industry_raw = get_rzrq_industry_data(date_str)
+    with metrics.stage('fetch'):
+        industry_raw = get_rzrq_industry_data(date_str)
     industry_data = []
     if industry_raw:
         for record in industry_raw:
@@ -1755,31 +2181,33 @@ def process_rzrq_data_for_date(date_str, all_market_data=None):
     market_codes = {'1': '沪市', '0': '深市', '2': '京市'}
     
     for code, name in market_codes.items():
-        stock_raw = get_rzrq_stock_data(code, date_str)
+        with metrics.stage('fetch'):
+            stock_raw = get_rzrq_stock_data(code, date_str)
         if stock_raw:
             for record in stock_raw:
                 if len(record) >= 15 and record[1] and record[2]:
-                    stock_data[name].append({
-                        '股票代码': record[1],
-                        '股票名称': record[2],
-                        '融资偿还额(万元)': round(record[3]/10000, 2) if record[3] else 0,
-                        '融券偿还量(万股)': round(record[4]/10000, 2) if record[4] else 0,
-                        '融资占流通市值比(%)': round(record[5], 2) if record[5] else 0,
-                        '融券占流通市值比(%)': round(record[6], 2) if record[6] else 0,
-                        '融资余额(万元)': round(record[7]/10000, 2) if record[7] else 0,
-                        '融资买入额(万元)': round(record[8]/10000, 2) if record[8] else 0,
-                        '融资净买入(万元)': round(record[9]/10000, 2) if record[9] else 0,
-                        '融券余量(万股)': round(record[10]/10000, 2) if record[10] else 0,
-                        '融券卖出量(万股)': round(record[11]/10000, 2) if record[11] else 0,
-                        '融券余额(万元)': round(record[12]/10000, 2) if record[12] else 0,
-                        '融券净卖出(万股)': round(record[13]/10000, 2) if record[13] else 0,
-                        '融资融券差值(万元)': round(record[14]/10000, 2) if record[14] else 0
-                    })
+                    stock_data[name].append(RzrqStock(
+                        code=record[1],
+                        name=record[2],
+                        margin_repay=round(record[3]/10000, 2) if record[3] else 0,
+                        short_repay=round(record[4]/10000, 2) if record[4] else 0,
+                        margin_float_ratio=round(record[5], 2) if record[5] else 0,
+                        short_float_ratio=round(record[6], 2) if record[6] else 0,
+                        margin_balance=round(record[7]/10000, 2) if record[7] else 0,
+                        margin_buy=round(record[8]/10000, 2) if record[8] else 0,
+                        margin_net_buy=round(record[9]/10000, 2) if record[9] else 0,
+                        short_volume=round(record[10]/10000, 2) if record[10] else 0,
+                        short_sell=round(record[11]/10000, 2) if record[11] else 0,
+                        short_balance=round(record[12]/10000, 2) if record[12] else 0,
+                        short_net_sell=round(record[13]/10000, 2) if record[13] else 0,
+                        balance_diff=round(record[14]/10000, 2) if record[14] else 0
+                    ))
     
     # 检查是否有有效数据
     if not market_data and not industry_data and not any(stock_data.values()):
         print(f"  {date_str} 无有效融资融券数据，跳过保存")
         return None
+    metrics.add_rows(sum(len(stocks) for stocks in stock_data.values()))
     
     return {
         'date': date_str,
@@ -1804,12 +2232,11 @@ def save_rzrq_data(data):
     
     # 保存JSON文件
     json_file = f"{month_dir}/{date_str}.json"
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    metrics.write_json(json_file, data, ensure_ascii=False, indent=2, default=record_to_dict)
     
     # 保存TXT文件
     txt_file = f"{month_dir}/{date_str}.txt"
-    with open(txt_file, 'w', encoding='utf-8') as f:
+    with metrics.stage('write'), open(txt_file, 'w', encoding='utf-8') as f:
         f.write(f"融资融券数据详细记录\n")
         f.write(f"日期：{data['date']}\n")
         f.write(f"更新时间：{data['update_time']}\n\n")
@@ -1882,6 +2309,7 @@ def save_rzrq_data(data):
         
         if not has_stock_data:
             f.write("暂无个股数据\n\n")
+    metrics.add_bytes_out(os.path.getsize(txt_file))
 
 def update_rzrq_index(date_str, data):
     """更新融资融券索引文件"""
@@ -1939,19 +2367,11 @@ def is_rzrq_first_run():
 
 
 def get_previous_trading_day(current_date):
-    """获取前一个交易日（跳过周末）"""
-    target_date = current_date - timedelta(days=1)
-    
-    # 如果是周六，往前推到周五
-    if target_date.weekday() == 5:  # Saturday
-        target_date = target_date - timedelta(days=1)
-    # 如果是周日，往前推到周五  
-    elif target_date.weekday() == 6:  # Sunday
-        target_date = target_date - timedelta(days=2)
-    
-    return target_date
+    """获取前一个交易日（跳过周末和节假日）"""
+    return prev_trading_day(current_date)
 
 
+@metrics.instrumented('rzrq')
 def crawl_rzrq_data(date_str=None):
     """爬取融资融券数据"""
     print("开始获取融资融券数据...")
@@ -1960,7 +2380,8 @@ def crawl_rzrq_data(date_str=None):
     
     try:
         print("获取全量市场数据")
-        all_market_data = get_rzrq_market_data()
+        with metrics.stage('fetch'):
+            all_market_data = get_rzrq_market_data(stream=True)
         
         if not all_market_data:
             print("获取融资融券市场数据失败")
@@ -1990,7 +2411,8 @@ def crawl_rzrq_data(date_str=None):
             processed_count = 0
             
             for date_str in all_dates:
-                data = process_rzrq_data_for_date(date_str, all_market_data)
+                with metrics.stage('format'):
+                    data = process_rzrq_data_for_date(date_str, all_market_data)
                 if data:
                     save_rzrq_data(data)
                     update_rzrq_index(date_str, data)
@@ -2006,7 +2428,8 @@ def crawl_rzrq_data(date_str=None):
                 print(f"{target_date_str} 暂无融资融券市场数据")
                 return None
             
-            data = process_rzrq_data_for_date(target_date_str, all_market_data)
+            with metrics.stage('format'):
+                data = process_rzrq_data_for_date(target_date_str, all_market_data)
             if data:
                 save_rzrq_data(data)
                 update_rzrq_index(target_date_str, data)
@@ -2025,32 +2448,333 @@ def crawl_rzrq_data(date_str=None):
 
 # ========== 主函数和统一接口 ==========
 
+# ========== 大智慧涨停透视相关函数 ==========
+
+@metrics.instrumented('ztts')
+def crawl_ztts_data(date_str=None):
+    """获取大智慧涨停透视数据（调用 ztts_crawler_simple 浏览器采集，不推送）"""
+    import ztts_crawler_simple as ztts
+    
+    if date_str:
+        target_date = latest_trading_day(datetime.strptime(date_str, '%Y-%m-%d').date())
+    else:
+        target_date = ztts.get_latest_trading_day()
+    
+    print(f"开始获取涨停透视数据: {target_date}")
+    with metrics.stage('fetch'):
+        data, actual_date = ztts.collect_data(target_date)
+    if not data:
+        print("获取涨停透视数据失败")
+        return None
+    
+    with metrics.stage('write'):
+        paths, json_report, _ = ztts.save_report(data, actual_date)
+        ztts.update_index({paths['date_str']: json_report})
+    return json_report
+
+@metrics.instrumented('limitup')
 def main_limit_up():
     """主函数 - 财联社涨停池数据"""
     try:
         print("开始获取财联社涨停池数据...")
-        raw_data = fetch_limit_up_data()
-        processed_data = process_limit_up_data(raw_data)
+        with metrics.stage('fetch'):
+            raw_data = fetch_limit_up_data()
+        with metrics.stage('format'):
+            processed_data = process_limit_up_data(raw_data)
         
         if processed_data:
+            metrics.add_rows(processed_data['count'])
             save_limit_up_data(processed_data)
             print("财联社涨停池数据处理完成！")
+            return processed_data
         else:
             print("没有获取到有效数据")
     except Exception as e:
         print(f"处理涨停池数据时发生错误: {e}")
 
+# ========== 全量任务 ==========
+
+# (任务名, 函数, 依赖任务, 站点)；依赖只决定先后顺序
+ALL_TASKS = [
+    ('limitup', main_limit_up, (), 'x-quote.cls.cn'),
+    ('jiuyan', crawl_all_jiuyan_articles, (), 'www.jiuyangongshe.com'),
+    ('analysis', crawl_stock_analysis, (), 'app.jiuyangongshe.com'),
+    ('dragon_tiger', crawl_dragon_tiger_data, (), 'fk.tdx.com.cn'),
+    ('ztts', crawl_ztts_data, ('limitup',), 'webrelease.dzh.com.cn'),  # 接口失败时用本地涨停池计算梯队
+    ('tdx_reports', crawl_tdx_reports_smart, (), 'fk.tdx.com.cn'),
+    ('rzrq', crawl_rzrq_data, (), 'fk.tdx.com.cn'),
+]
+
+# 每个站点同时运行的任务数上限，未列出的站点为 1
+TASK_HOST_LIMITS = {'fk.tdx.com.cn': 2}
+
+def run_all_tasks(task_names=None):
+    """并发执行全部（或指定的）数据源任务，结束后打印耗时汇总，返回失败（或不存在）的任务名"""
+    from task_runner import TaskRunner
+    runner = TaskRunner(host_limits=TASK_HOST_LIMITS)
+    all_names = [name for name, _, _, _ in ALL_TASKS]
+    selected = set(task_names or all_names)
+    unknown = selected - set(all_names)
+    if unknown:
+        print(f"未知任务: {', '.join(sorted(unknown))}（可用: {', '.join(all_names)}）")
+    for name, func, deps, host in ALL_TASKS:
+        if name in selected:
+            runner.add(name, func, deps=[d for d in deps if d in selected], host=host)
+    runner.run()
+    return sorted(unknown) + runner.failed()
+
+# ========== 区间回补 ==========
+
+BACKFILL_STATE_PATH = os.path.join('.github', 'backfill_state.json')
+BACKFILL_SKIP_STATUS = ('done', 'empty')  # 续跑时跳过的状态，failed 会重试
+BACKFILL_ZTTS_BATCH_DAYS = 5  # 涨停透视每个任务回补的交易日数（一批复用一个浏览器）
+
+def backfill_rzrq_dates(dates, mark):
+    """融资融券：全量市场数据只下载一次，逐日处理缺失日期"""
+    all_market_data = get_rzrq_market_data(stream=True)
+    if not all_market_data:
+        print("获取融资融券市场数据失败")
+        for date_str in dates:
+            mark(date_str, 'failed')
+        return False
+    latest = max(all_market_data)
+    for date_str in dates:
+        if date_str not in all_market_data:
+            # 上游已有更晚的数据才确认当日为空，否则下次继续尝试
+            mark(date_str, 'empty' if date_str < latest else 'failed')
+            continue
+        data = process_rzrq_data_for_date(date_str, all_market_data)
+        if data:
+            save_rzrq_data(data)
+            update_rzrq_index(date_str, data)
+            mark(date_str, 'done')
+        else:
+            mark(date_str, 'failed')
+    return True
+
+def backfill_tdx_reports_dates(dates, mark):
+    """通达信研报：全量研报只下载一次，按日期分组后保存缺失日期"""
+    try:
+        grouped_reports = group_reports_by_date(format_tdx_reports(get_tdx_reports_data(stream=True)))
+    except Exception:
+        grouped_reports = {}   # 数据不完整时不能据此把缺失日期标记为 empty
+    if not grouped_reports:
+        print("未获取到通达信研报数据")
+        for date_str in dates:
+            mark(date_str, 'failed')
+        return False
+    latest = max(grouped_reports)
+    for date_str in dates:
+        date_reports = grouped_reports.get(date_str)
+        if not date_reports:
+            mark(date_str, 'empty' if date_str < latest else 'failed')
+            continue
+        save_tdx_reports_files(date_reports, date_str)
+        stock_count = len(set(r["证券代码"] for r in date_reports))
+        institution_count = len(set(r["研究机构"] for r in date_reports))
+        update_tdx_reports_index(date_str, len(date_reports), stock_count, institution_count)
+        mark(date_str, 'done')
+    return True
+
+def backfill_ztts_dates(dates, mark):
+    """涨停透视：复用 ztts_crawler_simple 的批量回补（一个浏览器会话，不推送）"""
+    import ztts_crawler_simple as ztts
+    return ztts.backfill(None, None, dates=[datetime.strptime(d, '%Y-%m-%d').date() for d in dates],
+                         on_result=lambda date_str, ok: mark(date_str, 'done' if ok else 'failed'), push=False)
+
+def backfill_crawl_date(crawl, date_str, mark):
+    """逐日采集的数据源：采集单个日期并记录进度（每个日期一个任务）"""
+    try:
+        result = crawl(date_str)
+    except Exception as e:
+        print(f"{date_str} 回补失败: {e}")
+        result = None
+    mark(date_str, 'done' if result else 'failed')
+    return result
+
+def load_jiuyan_saved_dates():
+    """articles/index.json 中每个作者已保存文章的日期"""
+    saved = {}
+    try:
+        with open('articles/index.json', 'r', encoding='utf-8') as f:
+            index_data = json.load(f)
+    except Exception:
+        return saved
+    for date_str, info in index_data.items():
+        if isinstance(info, dict):
+            for article in info.get('articles', []):
+                saved.setdefault(article.get('author'), set()).add(date_str)
+    return saved
+
+def get_backfill_sources():
+    """可回补的数据源：站点、本地是否已完整、逐日采集(crawl) 或整批采集(batch)
+    
+    crawl 每个日期一个任务；batch 每 batch_days 个日期一个任务，未设置时全部日期一个任务
+    （融资融券和研报一次下载覆盖所有日期）。涨停池和龙虎榜接口只提供最新交易日，无法回补。
+    """
+    sources = {
+        'analysis': {
+            'host': 'app.jiuyangongshe.com',
+            'done': lambda d: os.path.exists(f'analysis/{d}.json'),
+            'crawl': crawl_stock_analysis
+        },
+        'rzrq': {
+            'host': 'fk.tdx.com.cn',
+            'done': lambda d: os.path.exists(f'tdx_rztq/{d[:7]}/{d}.json'),
+            'batch': backfill_rzrq_dates
+        },
+        'tdx_reports': {
+            'host': 'fk.tdx.com.cn',
+            'done': lambda d: os.path.exists(f'tdx_value/{d[:7]}/{d}.json'),
+            'batch': backfill_tdx_reports_dates
+        },
+        'ztts': {
+            'host': 'webrelease.dzh.com.cn',
+            'done': lambda d: os.path.exists(f'dzh_ztts/{d[:7]}/{d}.json'),
+            'batch': backfill_ztts_dates,
+            'batch_days': BACKFILL_ZTTS_BATCH_DAYS
+        }
+    }
+    jiuyan_saved = load_jiuyan_saved_dates()
+    for user_key, info in JIUYAN_USERS.items():
+        sources[f'jiuyan:{user_key}'] = {
+            'host': 'www.jiuyangongshe.com',
+            'done': lambda d, author=info['user_name']: d in jiuyan_saved.get(author, set()),
+            'crawl': lambda d, user_key=user_key: crawl_single_jiuyan_user(user_key, d)
+        }
+    return sources
+
+def load_backfill_state():
+    """读取回补进度，文件不存在或损坏时返回空进度"""
+    if os.path.exists(BACKFILL_STATE_PATH):
+        try:
+            with open(BACKFILL_STATE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取回补进度失败: {e}")
+    return {"sources": {}}
+
+def save_backfill_state(state):
+    """原子写入回补进度"""
+    os.makedirs(os.path.dirname(BACKFILL_STATE_PATH), exist_ok=True)
+    tmp_path = BACKFILL_STATE_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, BACKFILL_STATE_PATH)
+
+def run_backfill(source_names, start_date, end_date, force=False):
+    """回补日期区间内多个数据源：跳过本地已完整或已记录完成的日期，
+    每个日期（或一小批日期）一个任务，按站点并发上限并行执行，每完成一个日期就记录进度，中断后重新运行即可续跑"""
+    sources = get_backfill_sources()
+    selected = []
+    for name in source_names:
+        if name == 'jiuyan':
+            selected.extend(key for key in sources if key.startswith('jiuyan:'))
+        elif name in sources:
+            selected.append(name)
+        else:
+            print(f"未知或不支持回补的数据源: {name}（可用: jiuyan, {', '.join(sources)}）")
+    
+    dates = [d.strftime('%Y-%m-%d') for d in trading_days(start_date, end_date)]
+    if not selected or not dates:
+        print(f"没有需要回补的内容: {start_date} ~ {end_date}")
+        return None
+    
+    state = load_backfill_state()
+    state_lock = threading.Lock()
+    
+    def make_mark(source):
+        def mark(date_str, status):
+            with state_lock:
+                state['sources'].setdefault(source, {})[date_str] = status
+                save_backfill_state(state)
+        return mark
+    
+    from task_runner import TaskRunner
+    runner = TaskRunner(host_limits=TASK_HOST_LIMITS)
+    print(f"回补区间: {dates[0]} ~ {dates[-1]}，共 {len(dates)} 个交易日")
+    for source in selected:
+        spec = sources[source]
+        progress = state['sources'].get(source, {})
+        pending = [d for d in dates if force or not (spec['done'](d) or progress.get(d) in BACKFILL_SKIP_STATUS)]
+        print(f"  {source}: 待回补 {len(pending)} 天，跳过 {len(dates) - len(pending)} 天")
+        if not pending:
+            continue
+        
+        # 同一站点的任务由 TASK_HOST_LIMITS 控制并发，排队的任务不占线程
+        mark = make_mark(source)
+        if 'crawl' in spec:
+            for date_str in pending:
+                runner.add(f"{source} {date_str}", backfill_crawl_date, host=spec['host'],
+                           args=(spec['crawl'], date_str, mark))
+        else:
+            size = spec.get('batch_days') or len(pending)
+            for i in range(0, len(pending), size):
+                batch = pending[i:i + size]
+                name = source if len(batch) == len(pending) else f"{source} {batch[0]}~{batch[-1]}"
+                runner.add(name, spec['batch'], host=spec['host'], args=(batch, mark))
+    
+    if not runner.tasks:
+        print("所有日期均已完整，无需回补")
+        return None
+    return runner.run()
+
+def main_backfill(argv):
+    """解析 backfill 命令参数"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='scraper.py backfill', description='按日期区间回补多个数据源')
+    parser.add_argument('sources', nargs='+', help='analysis / rzrq / tdx_reports / ztts / jiuyan / jiuyan:用户')
+    parser.add_argument('--from', dest='start', required=True, help='开始日期 YYYY-MM-DD')
+    parser.add_argument('--to', dest='end', help='结束日期 YYYY-MM-DD，默认最近交易日')
+    parser.add_argument('--force', action='store_true', help='忽略本地文件和进度记录，全部重新获取')
+    args = parser.parse_args(argv)
+    end = args.end or latest_trading_day().strftime('%Y-%m-%d')
+    return run_backfill(args.sources, args.start, end, args.force)
+
+# ========== 常驻调度 ==========
+
+# 与 cls_spider.yml 的时间窗口一致：(任务名, 北京时间, 说明, 执行的函数)
+DAEMON_SCHEDULE = [
+    ('jiuyan_morning', '08:30', '韭研公社盘前数据',
+     lambda: (crawl_single_jiuyan_user('盘前纪要'), crawl_single_jiuyan_user('盘前解读'))),
+    ('rzrq', '09:20', '融资融券数据', crawl_rzrq_data),
+    ('afternoon_data', '15:30', '涨停池和异动解析数据', lambda: (main_limit_up(), crawl_stock_analysis())),
+    ('dragon_tiger', '18:00', '龙虎榜数据', crawl_dragon_tiger_data),
+    ('tdx_reports', '19:00', '通达信研报数据', crawl_tdx_reports_smart),
+    ('jiuyan_evening', '23:30', '韭研公社优秀阿呆', lambda: crawl_single_jiuyan_user('优秀阿呆')),
+]
+
+def build_scheduler():
+    from scheduler import Scheduler, ScheduledTask
+    tasks = [ScheduledTask(name, at, func, description=description) for name, at, description, func in DAEMON_SCHEDULE]
+    return Scheduler(tasks)
+
+def run_daemon():
+    """常驻运行：同一进程内按时间窗口执行任务，HTTP 连接和已加载的研报ID在任务之间复用"""
+    build_scheduler().run_forever()
+
 def main():
     """主函数 - 根据命令行参数决定执行哪个功能"""
     if len(sys.argv) == 1:
         # 默认执行涨停池数据获取
+        if not check_trading_day("涨停池数据获取"):
+            return
         main_limit_up()
         generate_all_pages()
     elif len(sys.argv) >= 2:
         command = sys.argv[1].lower()
         
+        # 未指定日期的定时任务在非交易日直接退出，不发出任何请求
+        date_commands = ('limitup', 'jiuyan', 'analysis', 'dragon_tiger', 'ztts', 'tdx_reports', 'rzrq', 'all')
+        has_date_arg = any(re.fullmatch(r'\d{4}-\d{2}-\d{2}', arg) for arg in sys.argv[2:])
+        if command in date_commands and not has_date_arg and not check_trading_day(f"{command} 任务"):
+            return
+        
         if command == 'limitup':
-            main_limit_up()
+            if len(sys.argv) >= 3 and sys.argv[2] == 'poll':
+                poll_limit_up(int(sys.argv[3]) if len(sys.argv) >= 4 else LIMIT_UP_POLL_INTERVAL)
+            else:
+                main_limit_up()
             
         elif command == 'jiuyan':
             if len(sys.argv) == 2:
@@ -2077,6 +2801,33 @@ def main():
                 date_str = sys.argv[2]
                 crawl_dragon_tiger_data(date_str)
         
+        elif command == 'ladder':
+            if len(sys.argv) == 2:
+                ladder = update_ladder()
+                if ladder:
+                    print_ladder(ladder)
+            elif sys.argv[2] == 'rebuild':
+                rebuild_ladders()
+            elif len(sys.argv) == 3:
+                ladder = get_ladder(sys.argv[2])
+                if ladder:
+                    print_ladder(ladder)
+                else:
+                    print(f"本地无 {sys.argv[2]} 的涨停池数据")
+            else:
+                for ladder in get_ladders(sys.argv[2], sys.argv[3]).values():
+                    print_ladder(ladder, detail=False)
+        
+        elif command == 'seats':
+            if len(sys.argv) == 2:
+                print_seat_rankings()
+            elif sys.argv[2] == 'rebuild':
+                rebuild_seat_store()
+            elif sys.argv[2].isdigit():
+                print_seat_rankings(int(sys.argv[2]))
+            else:
+                print_seat_history(sys.argv[2])
+        
         elif command == 'ztts':
             if len(sys.argv) == 2:
                 crawl_ztts_data()
@@ -2100,25 +2851,27 @@ def main():
         
         elif command == 'all':
             print("执行所有功能...")
-            main_limit_up()
-            print("\n" + "="*60 + "\n")
-            crawl_all_jiuyan_articles()
-            print("\n" + "="*60 + "\n")
-            crawl_stock_analysis()
-            print("\n" + "="*60 + "\n")
-            crawl_dragon_tiger_data()
-            print("\n" + "="*60 + "\n")
-            crawl_ztts_data()  # 如果你有这个函数
-            print("\n" + "="*60 + "\n")
-            crawl_tdx_reports()  # 新增通达信研报
-            print("\n" + "="*60 + "\n")
-            crawl_rzrq_data()  # 新增融资融券
+            failed = run_all_tasks(sys.argv[2:] or None)
+            if failed:
+                print(f"失败的任务: {', '.join(failed)}")
+                sys.exit(1)
+        
+        elif command == 'backfill':
+            main_backfill(sys.argv[2:])
+        
+        elif command == 'daemon':
+            if len(sys.argv) == 3 and sys.argv[2] == 'status':
+                build_scheduler().print_status()
+            else:
+                run_daemon()
 
             
         else:
             print("使用说明:")
             print("  python script.py                           # 默认获取涨停池数据并生成网页")
             print("  python script.py limitup                   # 获取涨停池数据")
+            print("  python script.py limitup poll              # 盘中轮询涨停池，只记录变化")
+            print("  python script.py limitup poll 30           # 指定轮询间隔（秒）")
             print("  python script.py jiuyan                    # 爬取韭研公社所有用户文章")
             print("  python script.py jiuyan 盘前纪要           # 爬取韭研公社指定用户文章")
             print("  python script.py jiuyan 盘前纪要 2025-01-21 # 爬取韭研公社指定用户指定日期文章")
@@ -2126,20 +2879,39 @@ def main():
             print("  python script.py analysis 2025-01-21       # 获取指定日期异动解析数据")
             print("  python script.py dragon_tiger              # 获取龙虎榜数据")
             print("  python script.py dragon_tiger 2025-01-21   # 获取指定日期龙虎榜数据")
+            print("  python script.py ladder                    # 从本地涨停池计算最新连板梯队")
+            print("  python script.py ladder 2025-01-21         # 查看指定日期连板梯队")
+            print("  python script.py ladder 2025-01-01 2025-01-31 # 查看日期区间连板梯队")
+            print("  python script.py ladder rebuild            # 从本地涨停池全量重算连板梯队")
+            print("  python script.py seats                     # 查看营业部席位5日排行")
+            print("  python script.py seats 20                  # 查看营业部席位20日排行")
+            print("  python script.py seats rebuild             # 从历史龙虎榜全量重建席位库")
+            print("  python script.py seats 拉萨东环路           # 查询匹配席位的历史动向")
             print("  python script.py ztts                      # 获取涨停透视数据")
             print("  python script.py ztts 2025-01-21           # 获取指定日期涨停透视数据")
             print("  python script.py tdx_reports               # 获取通达信研报数据")  # 新增
             print("  python script.py tdx_reports 2025-01-21    # 获取指定日期通达信研报数据")  # 新增
             print("  python script.py rzrq                      # 获取融资融券数据")
             print("  python script.py rzrq 2025-01-21           # 获取指定日期融资融券数据")            
-            print("  python script.py all                       # 执行所有功能")
+            print("  python script.py all                       # 并发执行所有功能并打印耗时汇总")
+            print("  python script.py all limitup rzrq          # 只执行指定的数据源任务")
+            print("  python script.py backfill analysis rzrq --from 2025-09-01 --to 2025-09-30  # 区间回补，可中断续跑")
+            print("  python script.py backfill jiuyan:盘前纪要 ztts --from 2025-09-01             # 回补到最近交易日")
+            print("  python script.py daemon                    # 常驻运行，按定时窗口自动执行任务")
+            print("  python script.py daemon status             # 查看各定时任务最近一次执行情况")
+            print("  python script.py rzrq --profile            # 任意命令加 --profile 剖析耗时，--profile-memory 统计内存峰值（输出到 logs/profile/）")
             print("\n可用的韭研公社用户:")
             for key, info in JIUYAN_USERS.items():
                 print(f"  {key} - {info['user_name']}")
 
 
 if __name__ == "__main__":
-    main()
+    import profiler
+    profile_options = profiler.pop_profile_args(sys.argv)
+    if profile_options:
+        profiler.run_profiled(main, profile_options, profiler.profile_name(sys.argv))
+    else:
+        main()
 
 
 
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+龙虎榜营业部席位分析 - 按日写入的席位聚合库
+使用方法：
+  python scraper.py seats                # 查看5/20/60日席位排行
+  python scraper.py seats rebuild        # 从 dragon_tiger/*.json 全量重建
+  python scraper.py seats 拉萨东环路      # 查询匹配席位的历史动向
+"""
+
+import os
+import sys
+import json
+import heapq
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+# 配置
+SEAT_STORE_PATH = 'dragon_tiger/seat_store.json'
+SEAT_RANKINGS_PATH = 'dragon_tiger/seat_rankings.json'
+RANKING_WINDOWS = (5, 20, 60)
+RANKING_TOP_N = 20
+STORE_VERSION = 1
+
+# 每日流水记录字段下标: [日期(yyyymmdd整数), 买入, 卖出, 净额, [股票代码...]]
+F_DATE, F_BUY, F_SELL, F_NET, F_CODES = range(5)
+
+
+def get_beijing_time():
+    """获取北京时间 (UTC+8)"""
+    return datetime.utcnow() + timedelta(hours=8)
+
+
+def date_to_key(date_str):
+    """'2025-09-01' -> 20250901"""
+    return int(date_str.replace('-', ''))
+
+
+def key_to_date(date_key):
+    """20250901 -> '2025-09-01'"""
+    s = str(date_key)
+    return f"{s[:4]}-{s[4:6]}-{s[6:8]}"
+
+
+def aggregate_day_seats(data):
+    """把单日龙虎榜数据按席位聚合
+
+    同一席位在同一只股票的买入榜和卖出榜上会各出现一次，这里按
+    (股票, 席位) 取买卖金额的最大值去重，再按席位汇总。
+    返回 {席位名: [买入, 卖出, 标签, [股票代码...]]}
+    """
+    day_seats = {}
+    for stock_code, detail in data.get('details', {}).items():
+        if detail.get('status') != 'success':
+            continue
+
+        per_stock = {}
+        for seat in detail.get('buy_seats', []) + detail.get('sell_seats', []):
+            name = seat.get('department_name')
+            if not name:
+                continue
+            buy = seat.get('buy_amount', 0) or 0
+            sell = seat.get('sell_amount', 0) or 0
+            label = seat.get('label', '') or ''
+            if name in per_stock:
+                item = per_stock[name]
+                item[0] = max(item[0], buy)
+                item[1] = max(item[1], sell)
+                if label:
+                    item[2] = label
+            else:
+                per_stock[name] = [buy, sell, label]
+
+        for name, (buy, sell, label) in per_stock.items():
+            if name not in day_seats:
+                day_seats[name] = [0.0, 0.0, '', []]
+            agg = day_seats[name]
+            agg[0] += buy
+            agg[1] += sell
+            if label:
+                agg[2] = label
+            agg[3].append(stock_code)
+
+    return day_seats
+
+
+class SeatStore:
+    def __init__(self):
+        self.dates = []        # 已入库的交易日（yyyymmdd整数，升序）
+        self.seats = []        # 席位名称表，下标即席位ID
+        self.labels = []       # 席位标签（最近一次非空标签）
+        self.flows = []        # 每个席位的每日流水，按日期升序
+        self.seat_ids = {}     # 席位名称 -> 席位ID
+        self.day_index = {}    # 日期 -> [(席位ID, 当日流水记录)]，删除某日和计算排行窗口只看相关日期
+        self.update_time = None
+
+    # ---------- 持久化 ----------
+
+    @classmethod
+    def load(cls, path=SEAT_STORE_PATH):
+        """加载席位库，文件不存在或损坏时返回空库"""
+        store = cls()
+        if not os.path.exists(path):
+            return store
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            if raw.get('version') != STORE_VERSION:
+                print("席位库版本不匹配，将重新建立")
+                return store
+            store.dates = raw.get('dates', [])
+            store.seats = [sys.intern(name) for name in raw.get('seats', [])]
+            store.labels = raw.get('labels', [''] * len(store.seats))
+            store.flows = raw.get('flows', [[] for _ in store.seats])
+            store.seat_ids = {name: i for i, name in enumerate(store.seats)}
+            store.update_time = raw.get('update_time')
+            store.build_day_index()
+        except Exception as e:
+            print(f"读取席位库失败: {e}")
+            return cls()
+        return store
+
+    def save(self, path=SEAT_STORE_PATH):
+        """保存席位库（紧凑格式）"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.update_time = get_beijing_time().strftime("%Y-%m-%d %H:%M:%S")
+        raw = {
+            "version": STORE_VERSION,
+            "update_time": self.update_time,
+            "dates": self.dates,
+            "seats": self.seats,
+            "labels": self.labels,
+            "flows": self.flows
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def build_day_index(self):
+        """按日期索引各席位的流水（载入时建立，不写入文件）"""
+        self.day_index = {date_key: [] for date_key in self.dates}
+        for seat_id, flow in enumerate(self.flows):
+            for entry in flow:
+                self.day_index.setdefault(entry[F_DATE], []).append((seat_id, entry))
+
+    # ---------- 按日写入 ----------
+
+    def intern_seat(self, name):
+        """获取席位ID，新席位追加到名称表"""
+        seat_id = self.seat_ids.get(name)
+        if seat_id is None:
+            seat_id = len(self.seats)
+            name = sys.intern(name)
+            self.seats.append(name)
+            self.labels.append('')
+            self.flows.append([])
+            self.seat_ids[name] = seat_id
+        return seat_id
+
+    def remove_date(self, date_key):
+        """删除某日已入库的流水（重复运行同一日时使用），只处理当日出现的席位"""
+        pos = bisect_left(self.dates, date_key)
+        if pos >= len(self.dates) or self.dates[pos] != date_key:
+            return
+        del self.dates[pos]
+        for seat_id, _ in self.day_index.pop(date_key, []):
+            flow = self.flows[seat_id]
+            i = bisect_left(flow, date_key, key=lambda entry: entry[F_DATE])
+            if i < len(flow) and flow[i][F_DATE] == date_key:
+                del flow[i]
+
+    def add_day(self, data):
+        """把单日龙虎榜数据写入席位库，只处理当日出现的席位"""
+        date_str = data.get('date')
+        if not date_str:
+            return 0
+        date_key = date_to_key(date_str)
+        self.remove_date(date_key)
+
+        day_seats = aggregate_day_seats(data)
+        if not day_seats:
+            return 0
+
+        pos = bisect_left(self.dates, date_key)
+        self.dates.insert(pos, date_key)
+        day_entries = self.day_index[date_key] = []
+
+        for name, (buy, sell, label, codes) in day_seats.items():
+            seat_id = self.intern_seat(name)
+            entry = [date_key, round(buy, 4), round(sell, 4), round(buy - sell, 4), codes]
+            flow = self.flows[seat_id]
+            if not flow or flow[-1][F_DATE] < date_key:
+                flow.append(entry)
+            else:
+                flow.insert(bisect_left(flow, date_key, key=lambda e: e[F_DATE]), entry)
+            day_entries.append((seat_id, entry))
+            if label:
+                self.labels[seat_id] = label
+
+        return len(day_seats)
+
+    # ---------- 查询 ----------
+
+    def window_start(self, days):
+        """最近 days 个交易日窗口的起始日期"""
+        if not self.dates:
+            return None
+        return self.dates[max(0, len(self.dates) - days)]
+
+    def window_totals(self, days):
+        """计算窗口内每个席位的汇总，只扫描窗口内各交易日的流水（与席位总数无关）"""
+        sums = {}
+        for date_key in reversed(self.dates[max(0, len(self.dates) - days):]):
+            for seat_id, entry in self.day_index.get(date_key, ()):
+                total = sums.get(seat_id)
+                if total is None:
+                    total = sums[seat_id] = [0.0, 0.0, 0.0, 0, 0]
+                total[0] += entry[F_BUY]
+                total[1] += entry[F_SELL]
+                total[2] += entry[F_NET]
+                total[3] += 1
+                total[4] += len(entry[F_CODES])
+        return [(seat_id, *sums[seat_id]) for seat_id in sorted(sums)]
+
+    def build_rankings(self, top_n=RANKING_TOP_N, windows_days=RANKING_WINDOWS):
+        """生成席位排行，默认 5/20/60 日"""
+        def to_item(total):
+            seat_id, buy, sell, net, appearances, stocks = total
+            return {
+                "department_name": self.seats[seat_id],
+                "label": self.labels[seat_id],
+                "net_amount": round(net, 2),
+                "buy_amount": round(buy, 2),
+                "sell_amount": round(sell, 2),
+                "active_days": appearances,
+                "stock_count": stocks
+            }
+
+        windows = {}
+        for days in windows_days:
+            totals = self.window_totals(days)
+            start = self.window_start(days)
+            windows[f"{days}日"] = {
+                "start_date": key_to_date(start) if start else None,
+                "seat_count": len(totals),
+                "net_buy": [to_item(t) for t in heapq.nlargest(top_n, totals, key=lambda t: t[3])],
+                "net_sell": [to_item(t) for t in heapq.nsmallest(top_n, totals, key=lambda t: t[3])],
+                "most_active": [to_item(t) for t in heapq.nlargest(top_n, totals, key=lambda t: (t[4], t[5]))]
+            }
+
+        return {
+            "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+            "latest_date": key_to_date(self.dates[-1]) if self.dates else None,
+            "total_dates": len(self.dates),
+            "total_seats": len(self.seats),
+            "windows": windows
+        }
+
+    def find_seats(self, keyword):
+        """按关键字匹配席位名称"""
+        if keyword in self.seat_ids:
+            return [self.seat_ids[keyword]]
+        return [i for i, name in enumerate(self.seats) if keyword in name]
+
+    def seat_history(self, seat_id, days=None):
+        """获取席位的每日动向（最近 days 个交易日，默认全部）"""
+        flow = self.flows[seat_id]
+        if days:
+            start = self.window_start(days)
+            flow = flow[bisect_left(flow, start, key=lambda e: e[F_DATE]):]
+        return [{
+            "date": key_to_date(entry[F_DATE]),
+            "buy_amount": entry[F_BUY],
+            "sell_amount": entry[F_SELL],
+            "net_amount": entry[F_NET],
+            "stocks": entry[F_CODES]
+        } for entry in flow]
+
+
+def save_seat_rankings(store, path=SEAT_RANKINGS_PATH):
+    """保存席位排行文件"""
+    rankings = store.build_rankings()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rankings, f, ensure_ascii=False, indent=2)
+    return rankings
+
+
+def update_seat_store(data):
+    """每日龙虎榜保存后调用：写入当日席位并刷新排行
+
+    席位库是单个文件，每次载入并整体写回；写入当日和计算排行只处理相关日期的流水。
+    """
+    if not data or not data.get('date'):
+        return None
+    try:
+        if not os.path.exists(SEAT_STORE_PATH):
+            # 首次运行时从历史文件建库（当日文件已写入，会一并包含）
+            return rebuild_seat_store()
+
+        store = SeatStore.load()
+        seat_count = store.add_day(data)
+        store.save()
+        save_seat_rankings(store)
+        print(f"席位库已更新: {data['date']}, 当日{seat_count}个席位，累计{len(store.seats)}个席位/{len(store.dates)}个交易日")
+        return store
+    except Exception as e:
+        print(f"更新席位库失败: {e}")
+        return None
+
+
+def rebuild_seat_store(data_dir='dragon_tiger'):
+    """从 dragon_tiger/*.json 全量重建席位库（修复用）"""
+    print("开始全量重建席位库...")
+    store = SeatStore()
+    files = sorted(
+        f for f in os.listdir(data_dir)
+        if f.endswith('.json') and f[:4].isdigit()
+    ) if os.path.exists(data_dir) else []
+
+    for filename in files:
+        try:
+            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            store.add_day(data)
+        except Exception as e:
+            print(f"读取 {filename} 失败: {e}")
+            continue
+
+    store.save()
+    save_seat_rankings(store)
+    print(f"席位库重建完成: {len(store.dates)}个交易日，{len(store.seats)}个席位")
+    return store
+
+
+def print_seat_rankings(days=5, top_n=10):
+    """打印席位排行"""
+    store = SeatStore.load()
+    if not store.dates:
+        print("席位库为空，请先运行: python scraper.py seats rebuild")
+        return None
+    if days < 1:
+        print("排行天数必须为正整数，例如: python scraper.py seats 20")
+        return None
+
+    # 非默认窗口（如 3 日）按需计算
+    rankings = store.build_rankings(top_n=top_n, windows_days=(days,))
+    window = rankings['windows'][f"{days}日"]
+    print(f"龙虎榜席位排行 - 最近{days}个交易日（{window['start_date']} ~ {rankings['latest_date']}）")
+    print(f"活跃席位: {window['seat_count']} 个")
+    for title, key in (("净买入", "net_buy"), ("净卖出", "net_sell"), ("上榜次数", "most_active")):
+        print(f"\n=== {title}TOP{top_n} ===")
+        for i, item in enumerate(window[key], 1):
+            label = f" [{item['label']}]" if item['label'] else ""
+            print(f"  {i:2d}. {item['department_name']}{label} - 净额: {item['net_amount']:>10.2f}万元  "
+                  f"上榜: {item['active_days']}天/{item['stock_count']}次")
+    return rankings
+
+
+def print_seat_history(keyword, days=None):
+    """打印匹配席位的历史动向"""
+    store = SeatStore.load()
+    seat_ids = store.find_seats(keyword)
+    if not seat_ids:
+        print(f"未找到匹配的席位: {keyword}")
+        return None
+
+    for seat_id in seat_ids[:10]:
+        history = store.seat_history(seat_id, days)
+        label = f" [{store.labels[seat_id]}]" if store.labels[seat_id] else ""
+        total_net = sum(item['net_amount'] for item in history)
+        print(f"\n=== {store.seats[seat_id]}{label} ===")
+        print(f"上榜 {len(history)} 天，累计净额: {total_net:.2f}万元")
+        for item in history[-20:]:
+            print(f"  {item['date']}  买入: {item['buy_amount']:>10.2f}  卖出: {item['sell_amount']:>10.2f}  "
+                  f"净额: {item['net_amount']:>10.2f}  股票: {','.join(item['stocks'])}")
+
+    if len(seat_ids) > 10:
+        print(f"\n共匹配 {len(seat_ids)} 个席位，仅显示前10个")
+    return seat_ids
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务运行器 - 按依赖关系并发执行数据源任务，限制每个站点的并发数
+使用方法：
+  from task_runner import TaskRunner
+  runner = TaskRunner(host_limits={'fk.tdx.com.cn': 2})
+  runner.add('limitup', main_limit_up, host='x-quote.cls.cn')
+  runner.add('ztts', crawl_ztts_data, deps=('limitup',), host='webrelease.dzh.com.cn')
+  runner.run()
+
+依赖只决定先后顺序：任务在所有依赖结束（无论成功与否）后才开始。
+任务抛出异常或返回 None / False 记为失败（各 crawl 函数拿不到数据时返回 None），其余返回值记为成功。
+同一站点的任务同时运行的数量不超过 host_limits 中的上限（默认 1）。超出上限的任务留在队列里，
+站点有空位时才提交到线程池，所以按日期登记几百个任务也只占用各站点上限之和的线程。
+运行结束后打印每个任务的状态和耗时。
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+DEFAULT_HOST_LIMIT = 1
+
+
+class Task:
+    def __init__(self, name, func, deps=(), host=None, args=(), kwargs=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.host = host
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.status = 'pending'   # pending / running / success / failed
+        self.result = None
+        self.error = None
+        self.queued = None        # 依赖全部结束、可以开始的时间
+        self.started = None
+        self.finished = None
+        self.waited = 0.0         # 等待站点并发名额的时间
+
+    @property
+    def elapsed(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class TaskRunner:
+    def __init__(self, host_limits=None, default_host_limit=DEFAULT_HOST_LIMIT):
+        self.tasks = {}
+        self.host_limits = dict(host_limits or {})
+        self.default_host_limit = default_host_limit
+
+    def add(self, name, func, deps=(), host=None, args=(), kwargs=None):
+        """登记任务；deps 为需要先完成的任务名"""
+        if name in self.tasks:
+            raise ValueError(f"任务重复: {name}")
+        self.tasks[name] = Task(name, func, deps, host, args, kwargs)
+        return self.tasks[name]
+
+    def _check_graph(self):
+        """检查依赖是否存在以及是否有环"""
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"任务 {task.name} 依赖不存在的任务 {dep}")
+
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"任务依赖存在环: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.tasks[name].deps:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.tasks:
+            visit(name, [])
+
+    def _host_limit(self, host):
+        return self.host_limits.get(host, self.default_host_limit)
+
+    def _execute(self, task):
+        try:
+            task.started = time.perf_counter()
+            task.waited = task.started - task.queued
+            task.status = 'running'
+            task.result = task.func(*task.args, **task.kwargs)
+            if task.result is None or task.result is False:
+                task.status = 'failed'
+                print(f"任务 {task.name} 未返回数据，记为失败")
+            else:
+                task.status = 'success'
+        except Exception as e:
+            task.status = 'failed'
+            task.error = e
+            print(f"任务 {task.name} 执行失败: {e}")
+        finally:
+            task.finished = time.perf_counter()
+        return task
+
+    def run(self):
+        """执行全部任务，返回 {任务名: Task}"""
+        self._check_graph()
+        start = time.perf_counter()
+        pending = dict(self.tasks)
+        finished = set()
+        futures = {}
+        running = {}   # 站点 -> 正在运行的任务数
+
+        # 同时运行的任务数不超过各站点上限之和（无站点的任务各占一个线程）
+        hosts = {task.host for task in self.tasks.values() if task.host}
+        workers = sum(self._host_limit(host) for host in hosts) + sum(1 for task in self.tasks.values() if not task.host)
+        with ThreadPoolExecutor(max_workers=max(min(workers, len(self.tasks)), 1)) as executor:
+            while pending or futures:
+                now = time.perf_counter()
+                for task in list(pending.values()):
+                    if not all(dep in finished for dep in task.deps):
+                        continue
+                    if task.queued is None:
+                        task.queued = now
+                    if task.host and running.get(task.host, 0) >= self._host_limit(task.host):
+                        continue
+                    del pending[task.name]
+                    if task.host:
+                        running[task.host] = running.get(task.host, 0) + 1
+                    futures[executor.submit(self._execute, task)] = task
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = futures.pop(future)
+                    finished.add(task.name)
+                    if task.host:
+                        running[task.host] -= 1
+
+        self.print_summary(time.perf_counter() - start)
+        return self.tasks
+
+    def failed(self):
+        """未成功完成的任务名"""
+        return [name for name, task in self.tasks.items() if task.status != 'success']
+
+    def print_summary(self, total_elapsed):
+        """打印每个任务的状态和耗时"""
+        print("\n" + "=" * 60)
+        print("任务耗时汇总")
+        print("-" * 60)
+        name_width = max([16] + [len(name) + 2 for name in self.tasks])
+        print(f"{'任务':<{name_width}}{'站点':<26}{'状态':<8}{'等待':>7}{'耗时':>9}")
+        for task in sorted(self.tasks.values(), key=lambda t: t.started or 0):
+            status = {'success': '成功', 'failed': '失败'}.get(task.status, task.status)
+            print(f"{task.name:<{name_width}}{(task.host or '-'):<26}{status:<8}{task.waited:>6.1f}s{task.elapsed:>8.1f}s")
+        serial = sum(task.elapsed for task in self.tasks.values())
+        print("-" * 60)
+        print(f"总耗时 {total_elapsed:.1f}s（各任务耗时合计 {serial:.1f}s）")
+        print("=" * 60)
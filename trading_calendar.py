@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A股交易日历 - 沪深交易所休市安排（预置节假日表）
+使用方法：
+  from trading_calendar import is_trading_day, prev_trading_day, trading_days
+  python trading_calendar.py               # 查看今天是否为交易日
+  python trading_calendar.py 2025-10-01    # 查看指定日期是否为交易日
+
+节假日表来自交易所每年12月发布的次年休市安排，只列出落在工作日的休市日。
+每年发布新安排后在 HOLIDAYS 中补充一行即可；表外年份按“周一至周五”处理。
+"""
+
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+# 沪深交易所休市日（仅工作日）
+HOLIDAYS = {
+    2024: [
+        '2024-01-01',                                                              # 元旦
+        '2024-02-09', '2024-02-12', '2024-02-13', '2024-02-14', '2024-02-15', '2024-02-16',  # 春节
+        '2024-04-04', '2024-04-05',                                                # 清明节
+        '2024-05-01', '2024-05-02', '2024-05-03',                                  # 劳动节
+        '2024-06-10',                                                              # 端午节
+        '2024-09-16', '2024-09-17',                                                # 中秋节
+        '2024-10-01', '2024-10-02', '2024-10-03', '2024-10-04', '2024-10-07',      # 国庆节
+    ],
+    2025: [
+        '2025-01-01',                                                              # 元旦
+        '2025-01-28', '2025-01-29', '2025-01-30', '2025-01-31', '2025-02-03', '2025-02-04',  # 春节
+        '2025-04-04',                                                              # 清明节
+        '2025-05-01', '2025-05-02', '2025-05-05',                                  # 劳动节
+        '2025-06-02',                                                              # 端午节
+        '2025-10-01', '2025-10-02', '2025-10-03', '2025-10-06', '2025-10-07', '2025-10-08',  # 国庆节、中秋节
+    ],
+    2026: [
+        '2026-01-01', '2026-01-02',                                                # 元旦
+        '2026-02-16', '2026-02-17', '2026-02-18', '2026-02-19', '2026-02-20', '2026-02-23',  # 春节
+        '2026-04-06',                                                              # 清明节
+        '2026-05-01', '2026-05-04', '2026-05-05',                                  # 劳动节
+        '2026-06-19',                                                              # 端午节
+        '2026-09-25',                                                              # 中秋节
+        '2026-10-01', '2026-10-02', '2026-10-05', '2026-10-06', '2026-10-07',      # 国庆节
+    ],
+}
+
+FIRST_YEAR = min(HOLIDAYS)
+LAST_YEAR = max(HOLIDAYS)
+
+
+def _build_calendar():
+    """预先展开表内年份的全部交易日，查询时只做下标运算"""
+    holidays = {datetime.strptime(d, '%Y-%m-%d').date() for days in HOLIDAYS.values() for d in days}
+    days = []
+    current = date(FIRST_YEAR, 1, 1)
+    end = date(LAST_YEAR, 12, 31)
+    while current <= end:
+        if current.weekday() < 5 and current not in holidays:
+            days.append(current)
+        current += timedelta(days=1)
+    return holidays, days, {d: i for i, d in enumerate(days)}
+
+
+_HOLIDAY_SET, _TRADING_DAYS, _TRADING_INDEX = _build_calendar()
+_RANGE_START = date(FIRST_YEAR, 1, 1)
+_RANGE_END = date(LAST_YEAR, 12, 31)
+
+
+def get_beijing_time():
+    """获取北京时间 (UTC+8)"""
+    return datetime.utcnow() + timedelta(hours=8)
+
+
+def to_date(value=None):
+    """把 date / datetime / 'YYYY-MM-DD' / 'YYYYMMDD' 统一为 date，默认北京时间今天"""
+    if value is None:
+        return get_beijing_time().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    fmt = '%Y%m%d' if len(value) == 8 else '%Y-%m-%d'
+    return datetime.strptime(value, fmt).date()
+
+
+def _in_table(d):
+    return _RANGE_START <= d <= _RANGE_END
+
+
+def is_holiday(value=None):
+    """是否为工作日休市（节假日）"""
+    return to_date(value) in _HOLIDAY_SET
+
+
+def is_trading_day(value=None):
+    """是否为交易日"""
+    d = to_date(value)
+    if _in_table(d):
+        return d in _TRADING_INDEX
+    return d.weekday() < 5
+
+
+def prev_trading_day(value=None, n=1):
+    """value 之前第 n 个交易日（不含 value 本身）"""
+    d = to_date(value)
+    if _in_table(d):
+        pos = bisect_left(_TRADING_DAYS, d) - n
+        if pos >= 0:
+            return _TRADING_DAYS[pos]
+    # 表外日期按工作日逐日回退
+    while n > 0:
+        d -= timedelta(days=1)
+        if is_trading_day(d):
+            n -= 1
+    return d
+
+
+def next_trading_day(value=None, n=1):
+    """value 之后第 n 个交易日（不含 value 本身）"""
+    d = to_date(value)
+    if _in_table(d):
+        pos = bisect_right(_TRADING_DAYS, d) + n - 1
+        if pos < len(_TRADING_DAYS):
+            return _TRADING_DAYS[pos]
+    while n > 0:
+        d += timedelta(days=1)
+        if is_trading_day(d):
+            n -= 1
+    return d
+
+
+def latest_trading_day(value=None):
+    """value 当天若为交易日则返回当天，否则返回之前最近的交易日"""
+    d = to_date(value)
+    return d if is_trading_day(d) else prev_trading_day(d)
+
+
+def trading_days(start, end):
+    """[start, end] 区间内的全部交易日（升序）"""
+    start, end = to_date(start), to_date(end)
+    if start > end:
+        return []
+    if _in_table(start) and _in_table(end):
+        return _TRADING_DAYS[bisect_left(_TRADING_DAYS, start):bisect_right(_TRADING_DAYS, end)]
+    days = []
+    current = start
+    while current <= end:
+        if is_trading_day(current):
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def trading_days_between(start, end):
+    """从 start 到 end 相隔的交易日数（end 为 start 的下一个交易日时返回 1）"""
+    start, end = to_date(start), to_date(end)
+    if start in _TRADING_INDEX and end in _TRADING_INDEX:
+        return _TRADING_INDEX[end] - _TRADING_INDEX[start]
+    if start <= end:
+        return len(trading_days(start, end)) - (1 if is_trading_day(start) else 0)
+    return -trading_days_between(end, start)
+
+
+def check_trading_day(task_name, value=None):
+    """定时任务入口检查：非交易日打印提示并返回 False，调用方直接退出"""
+    d = to_date(value)
+    if is_trading_day(d):
+        return True
+    reason = "节假日休市" if d in _HOLIDAY_SET else "周末休市"
+    print(f"{d} {reason}，跳过{task_name}（上一交易日: {prev_trading_day(d)}）")
+    return False
+
+
+if __name__ == "__main__":
+    target = to_date(sys.argv[1]) if len(sys.argv) > 1 else to_date()
+    if is_trading_day(target):
+        print(f"{target} 是交易日")
+    else:
+        print(f"{target} 不是交易日")
+    print(f"上一交易日: {prev_trading_day(target)}")
+    print(f"下一交易日: {next_trading_day(target)}")
+    if not (FIRST_YEAR <= target.year <= LAST_YEAR):
+        print(f"注意：{target.year} 年不在节假日表内（{FIRST_YEAR}-{LAST_YEAR}），仅按周末判断")
@@ -5,37 +5,102 @@
 使用方法：
   python ztts_crawler_enhanced.py              # 获取最新数据并推送
   python ztts_crawler_enhanced.py 2025-01-21   # 获取指定日期数据
+  python ztts_crawler_simple.py --wait=40      # 浏览器等待数据就绪的上限（秒）
+  python ztts_crawler_simple.py --full-profile # 使用完整（有界面）浏览器配置
+  python ztts_crawler_simple.py 2025-09-01 2025-09-30  # 批量回补日期区间（复用同一浏览器）
+  python ztts_crawler_simple.py rebuild_index  # 全量重建 dzh_ztts/index.json
+  python ztts_crawler_simple.py --profile      # 剖析耗时（--profile-memory 统计内存峰值），输出到 logs/profile/
 """
 
 import os
 import json
 import time
 import sys
+import shutil
+import threading
 import subprocess
-import requests
-from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.edge.options import Options
+from datetime import datetime
+from trading_calendar import is_trading_day, latest_trading_day, prev_trading_day, check_trading_day, trading_days
+from records import LadderStock, record_to_dict
+import metrics
 
 # 配置
 TARGET_URL = "https://webrelease.dzh.com.cn/htmlweb/ztts/index.php"
+# 设置环境变量 UPSTREAM_BASE（如 http://127.0.0.1:8800）时接口请求改发到本地模拟服务（mock_upstream.py），
+# 浏览器采集仍打开真实页面
+UPSTREAM_BASE = os.environ.get('UPSTREAM_BASE', '').rstrip('/')
+API_URL = f"{UPSTREAM_BASE or 'https://webrelease.dzh.com.cn'}/htmlweb/ztts/api.php"
 DATA_DIR = "dzh_ztts"
-WAIT_TIME = 25  # 增加等待时间确保数据完全加载
+WAIT_TIME = 25  # 等待页面数据就绪的上限（秒），数据就绪即继续，可用 --wait=秒数 调整
+WAIT_POLL = 0.5  # 检查页面状态的间隔（秒）
+LADDER_FETCH_WORKERS = 4  # 批量回补时并发获取涨停梯队的线程数
+
+API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Accept': 'application/json',
+    'Referer': TARGET_URL
+}
+
+# 浏览器配置
+BROWSER = 'auto'       # edge / chrome / auto（Windows 用 Edge，其他系统用 Chrome/Chromium）
+LEAN_PROFILE = True    # 默认使用精简配置：无头、不加载图片、屏蔽字体和统计脚本、eager 加载；--full-profile 关闭
+CHROMIUM_BINARIES = ('chromium', 'chromium-browser', 'google-chrome')
+
+# 精简配置下通过 CDP 屏蔽的请求（图片、字体、第三方统计）
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*hm.baidu.com*', '*cnzz.com*', '*umeng.com*', '*growingio.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*'
+]
+
+# 浏览器采集才需要Selenium，首次用到时才导入；rebuild_index 等不开浏览器的命令在未安装Selenium的环境也能运行
+webdriver = None
+
+def import_selenium():
+    """导入 Selenium 到模块全局，未安装时返回 False"""
+    global webdriver, By, WebDriverWait, EC, Options, ChromeOptions, TimeoutException
+    if webdriver is not None:
+        return True
+    try:
+        from selenium import webdriver as _webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.edge.options import Options
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.common.exceptions import TimeoutException
+    except ImportError:
+        return False
+    webdriver = _webdriver
+    return True
+
+def new_session():
+    """新建 HTTP 会话（requests 只在需要联网时导入），记录请求跟踪和采集指标"""
+    import requests
+    import http_trace
+    session = http_trace.trace_session(requests.Session())
+    return metrics.install_session_hooks(session)
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def shared_session():
+    """未传入会话时共用的 HTTP 会话（批量回补的工作线程也会并发首次调用）"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = new_session()
+    return _shared_session
 
 def get_latest_trading_day():
-    """获取最新交易日"""
-    current_date = datetime.now().date()
-    while current_date.weekday() >= 5:  # 周末
-        current_date -= timedelta(days=1)
+    """获取最新交易日（按交易日历跳过周末和节假日）"""
+    current_date = latest_trading_day(datetime.now().date())
     
     # 如果是今天但在9点前，返回前一个交易日
     if current_date == datetime.now().date() and datetime.now().hour < 9:
-        current_date -= timedelta(days=1)
-        while current_date.weekday() >= 5:
-            current_date -= timedelta(days=1)
+        current_date = prev_trading_day(current_date)
     
     return current_date
 
@@ -84,34 +149,43 @@ def git_push_data(date_str):
         print(f"💡 请稍后手动推送: git push")
         return False
 
-def get_ladder_data_via_api(date_str):
-    """通过API获取涨停梯队个股数据"""
+def fetch_api_service(service, date_str, session=None):
+    """请求 api.php 的单个服务，返回 data 字段；出错返回 None"""
     api_date = date_str.replace('-', '')  # 2025-01-21 -> 20250121
-    
-    url = "https://webrelease.dzh.com.cn/htmlweb/ztts/api.php"
-    params = {'service': 'getZttdData', 'date': api_date}
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-        'Accept': 'application/json',
-        'Referer': 'https://webrelease.dzh.com.cn/htmlweb/ztts/index.php'
-    }
+    params = {'service': service, 'date': api_date}
     
     try:
-        print(f"🌐 获取涨停梯队API数据...")
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = (session or shared_session()).get(API_URL, params=params, headers=API_HEADERS, timeout=10)
         response.raise_for_status()
         
         data = response.json()
         if data.get('code') == 0:
-            print(f"✅ 涨停梯队数据获取成功，共 {len(data.get('data', []))} 只股票")
-            return process_ladder_data(data['data'])
-        else:
-            print(f"❌ API返回错误: {data.get('msg', '未知错误')}")
-            return {}
-            
+            return data.get('data')
+        print(f"❌ API {service} 返回错误: {data.get('msg', '未知错误')}")
     except Exception as e:
-        print(f"❌ API请求失败: {e}")
+        print(f"❌ API {service} 请求失败: {e}")
+    return None
+
+def get_ladder_data_via_api(date_str, session=None):
+    """通过API获取涨停梯队个股数据"""
+    print(f"🌐 获取涨停梯队API数据...")
+    items = fetch_api_service('getZttdData', date_str, session)
+    if items is None:
         return {}
+    print(f"✅ 涨停梯队数据获取成功，共 {len(items)} 只股票")
+    return process_ladder_data(items)
+
+def get_ladder_data_local(date_str):
+    """API不可用时，从本地涨停池历史计算涨停梯队"""
+    try:
+        from ladder_engine import get_ladder
+        ladder = get_ladder(date_str)
+        if ladder:
+            print(f"✅ 使用本地涨停池计算的涨停梯队，共 {ladder['limit_up_count']} 只股票")
+            return {key: ladder[key] for key in ('ladder_stocks', 'market_distribution', 'board_distribution')}
+    except Exception as e:
+        print(f"❌ 本地涨停梯队计算失败: {e}")
+    return {}
 
 def get_market_type(code):
     """根据股票代码判断市场类型"""
@@ -139,17 +213,17 @@ def process_ladder_data(api_data):
         if bnum not in board_groups:
             board_groups[bnum] = []
         
-        stock_data = {
-            'code': item['code'],
-            'name': item['name'],
-            'close_price': item['close'],
-            'change_rate': round(item['zf'] * 100, 2),
-            'turnover_rate': round(item['fbrate'] * 100, 2),
-            'dnum': item['dnum'],
-            'bnum': item['bnum'],
-            'board_label': f"{item['dnum']}天{item['bnum']}板",
-            'market': market
-        }
+        stock_data = LadderStock(
+            code=item['code'],
+            name=item['name'],
+            close_price=item['close'],
+            change_rate=round(item['zf'] * 100, 2),
+            turnover_rate=round(item['fbrate'] * 100, 2),
+            dnum=item['dnum'],
+            bnum=item['bnum'],
+            board_label=f"{item['dnum']}天{item['bnum']}板",
+            market=market
+        )
         
         board_groups[bnum].append(stock_data)
         market_count[market] = market_count.get(market, 0) + 1
@@ -164,23 +238,109 @@ def process_ladder_data(api_data):
     }
 
 class ZTTSCrawler:
-    def __init__(self, target_date):
+    def __init__(self, target_date, wait_timeout=WAIT_TIME, lean_profile=LEAN_PROFILE):
         self.target_date = target_date
         self.actual_date = None
         self.driver = None
+        self.wait_timeout = wait_timeout
+        self.lean_profile = lean_profile
     
-    def setup_driver(self):
-        """设置浏览器"""
+    def setup_driver(self, lean_profile=LEAN_PROFILE):
+        """设置浏览器，lean_profile 为 True 时使用精简无头配置"""
         print(f"🚀 设置浏览器...")
+        if not import_selenium():
+            raise RuntimeError("未安装 selenium，无法使用浏览器采集")
         
-        options = Options()
+        browser = BROWSER
+        if browser == 'auto':
+            browser = 'edge' if sys.platform.startswith('win') else 'chrome'
+        
+        options = Options() if browser == 'edge' else ChromeOptions()
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--window-size=1920,1080')
         
-        self.driver = webdriver.Edge(options=options)
+        if browser == 'chrome':
+            # 没有 Chrome 时使用系统 Chromium
+            for binary in CHROMIUM_BINARIES:
+                path = shutil.which(binary)
+                if path:
+                    options.binary_location = path
+                    break
+        
+        if lean_profile:
+            options.add_argument('--headless=new')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--disable-extensions')
+            options.add_argument('--disable-background-networking')
+            options.add_argument('--no-first-run')
+            options.add_argument('--mute-audio')
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_experimental_option('prefs', {
+                'profile.managed_default_content_settings.images': 2
+            })
+            # DOMContentLoaded 后即返回，数据是否就绪由 wait_for_state 判断
+            options.page_load_strategy = 'eager'
+        
+        self.driver = webdriver.Edge(options=options) if browser == 'edge' else webdriver.Chrome(options=options)
+        print(f"🚀 浏览器: {browser}{'（精简无头配置）' if lean_profile else ''}")
+        
+        # 字体没有对应的内容设置，和统计脚本一样通过 CDP 按 URL 屏蔽
+        if lean_profile:
+            try:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                print(f"⚠️ 设置请求屏蔽失败: {e}")
     
     
+    def get_vue_state(self):
+        """读取 Vue 实例的日期和 todayStat 快照，实例未就绪时返回 None"""
+        script = """
+        try {
+            var el = document.querySelector('#app');
+            var app = el && el.__vue__;
+            if (!app) return null;
+            return {
+                today: app.today || app.thisDay || null,
+                stat: app.todayStat ? JSON.stringify(app.todayStat) : null
+            };
+        } catch (error) {
+            return null;
+        }
+        """
+        try:
+            return self.driver.execute_script(script)
+        except Exception:
+            return None
+
+    def wait_for_state(self, description, date=None, not_date=None, not_stat=None):
+        """等待 Vue 实例就绪且 todayStat 已填充，可附加日期条件
+        
+        date: today 必须等于该日期；not_date / not_stat: 日期或 todayStat 必须已经变化。
+        超过 wait_timeout 返回最后一次读取的状态，不抛异常。
+        """
+        def ready(driver):
+            state = self.get_vue_state()
+            if not state or not state.get('stat'):
+                return False
+            if date is not None and state.get('today') != date:
+                return False
+            if not_date is not None and state.get('today') == not_date:
+                return False
+            if not_stat is not None and state.get('stat') == not_stat:
+                return False
+            return state
+        
+        start = time.time()
+        try:
+            state = WebDriverWait(self.driver, self.wait_timeout, poll_frequency=WAIT_POLL).until(ready)
+            print(f"✅ {description}（{time.time() - start:.1f}秒）")
+            return state
+        except TimeoutException:
+            print(f"⚠️ 等待{description}超时（{self.wait_timeout}秒）")
+            return self.get_vue_state()
+
     def navigate_to_date(self, target_date_str):
         """导航到指定日期"""
         print(f"📅 尝试导航到日期: {target_date_str}")
@@ -219,23 +379,20 @@ class ZTTSCrawler:
                     print(f"❌ 按钮已禁用，无法继续翻页")
                     break
                 
+                before = self.get_vue_state() or {}
                 button.click()
                 print(f"🔄 执行第 {i+1} 次点击...")
                 
-                # 等待更长时间确保数据更新
-                time.sleep(20)  # 增加到8秒
-                
-                # 多次检查日期是否更新
-                for check_attempt in range(5):
-                    new_date = self.get_current_date()
-                    if new_date != current_date:
-                        print(f"📅 日期已更新: {new_date}")
-                        current_date = new_date
-                        break
-                    time.sleep(1)
+                # 中间日期只等日期切换，不等数据
+                state = self.wait_for_state("日期切换", not_date=current_date)
+                new_date = state.get('today') if state else None
+                if new_date and new_date != current_date:
+                    print(f"📅 日期已更新: {new_date}")
+                    current_date = new_date
                 
-                # 检查是否到达目标日期
+                # 检查是否到达目标日期，并等待新一天的 todayStat 到达
                 if current_date == target_date_str:
+                    self.wait_for_state("目标日期数据就绪", date=target_date_str, not_stat=before.get('stat'))
                     print(f"✅ 成功导航到目标日期")
                     return True
                     
@@ -267,62 +424,80 @@ class ZTTSCrawler:
             return None
 
     
+    def open_page(self):
+        """启动浏览器并打开涨停透视页面，等待 Vue 数据就绪"""
+        self.setup_driver(self.lean_profile)
+        
+        # 访问页面
+        self.driver.get(TARGET_URL)
+        
+        # 等待加载
+        wait = WebDriverWait(self.driver, 30)
+        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        
+        print(f"⏳ 等待Vue应用加载（最长 {self.wait_timeout} 秒）...")
+        self.wait_for_state("Vue应用数据就绪")
+    
+    def close(self):
+        """关闭浏览器"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+    
     def crawl_data(self):
         """爬取数据"""
+        try:
+            return self.crawl_date(self.target_date)
+        finally:
+            self.close()
+    
+    def crawl_date(self, target_date, ladder_data=None):
+        """在已打开的页面上采集指定日期，浏览器未启动时先打开页面（批量回补时复用同一浏览器）"""
+        self.target_date = target_date
         print(f"🕷️ 开始爬取数据（目标日期：{self.target_date}）...")
         
-        self.setup_driver()
+        if self.driver is None:
+            self.open_page()
         
-        try:
-            # 访问页面
-            self.driver.get(TARGET_URL)
-            
-            # 等待加载
-            wait = WebDriverWait(self.driver, 30)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            
-            print(f"⏳ 等待Vue应用加载 {WAIT_TIME} 秒...")
-            time.sleep(WAIT_TIME)
-            
-            # 获取当前页面日期
-            current_date = self.get_current_date()
-            print(f"📅 页面加载完成，当前日期: {current_date}")
-            
-            # 如果需要，导航到目标日期
-            target_date_str = self.target_date.strftime('%Y%m%d')
-            if current_date != target_date_str:
-                success = self.navigate_to_date(target_date_str)
-                if not success:
-                    print(f"❌ 无法导航到目标日期，使用当前页面数据")
-                
-                # 等待数据更新
-                time.sleep(5)
+        # 获取当前页面日期
+        current_date = self.get_current_date()
+        print(f"📅 页面加载完成，当前日期: {current_date}")
+        
+        # 如果需要，导航到目标日期
+        target_date_str = self.target_date.strftime('%Y%m%d')
+        if current_date != target_date_str:
+            success = self.navigate_to_date(target_date_str)
+            if success:
+                # 等待目标日期数据就绪
+                self.wait_for_state("目标日期数据就绪", date=target_date_str)
+            else:
+                # 目标日期不会出现，不必再等满超时
+                print(f"❌ 无法导航到目标日期，使用当前页面数据")
+        
+        # 获取实际数据日期
+        self.actual_date = self.get_actual_date()
+        print(f"📅 实际数据日期: {self.actual_date}")
+        
+        # 提取基础数据
+        base_data = self.extract_data()
+        
+        if base_data:
+            print("✅ 基础数据爬取成功")
             
-            # 获取实际数据日期
-            self.actual_date = self.get_actual_date()
-            print(f"📅 实际数据日期: {self.actual_date}")
+            # 获取涨停梯队数据（API），预先获取的梯队只在日期一致时使用
+            date_str = self.actual_date.strftime('%Y-%m-%d')
+            if not ladder_data or self.actual_date != target_date:
+                ladder_data = get_ladder_data_via_api(date_str)
+            if not ladder_data:
+                ladder_data = get_ladder_data_local(date_str)
             
-            # 提取基础数据
-            base_data = self.extract_data()
+            # 合并数据
+            base_data['涨停梯队数据'] = ladder_data
             
-            if base_data:
-                print("✅ 基础数据爬取成功")
-                
-                # 获取涨停梯队数据（API）
-                date_str = self.actual_date.strftime('%Y-%m-%d')
-                ladder_data = get_ladder_data_via_api(date_str)
-                
-                # 合并数据
-                base_data['涨停梯队数据'] = ladder_data
-                
-                return base_data
-            else:
-                print("❌ 基础数据爬取失败")
-                return None
-                
-        finally:
-            if self.driver:
-                self.driver.quit()
+            return base_data
+        else:
+            print("❌ 基础数据爬取失败")
+            return None
     
     def get_actual_date(self):
         """获取页面实际数据日期"""
@@ -446,6 +621,14 @@ class DataFormatter:
         # 直接返回从DOM获取的完整解读文本
         return full_text
     
+    def analysis_source(self):
+        """完整解读的实际来源"""
+        if self.data.get('完整解读文本'):
+            return "页面DOM提取"
+        if self.data.get('todayWad完整数据'):
+            return "根据趋势数据生成"
+        return "无"
+    
     def generate_fallback_analysis(self):
         """备用分析生成（当DOM文本获取失败时）"""
         todayWad = self.data.get('todayWad完整数据', {})
@@ -599,7 +782,7 @@ class DataFormatter:
             },
             "市场分析": {
                 "完整解读": self.generate_analysis_from_dom(),
-                "分析来源": "页面DOM提取"
+                "分析来源": self.analysis_source()
             },
             "核心指标": {
                 "活跃资金情绪": self.data.get('活跃资金情绪'),
@@ -650,11 +833,65 @@ class DataFormatter:
             "原始数据": self.data
         }
 
-def update_index():
-    """更新索引文件"""
+def build_index_entry(date_str, report):
+    """根据单日JSON报告生成索引条目"""
+    year_month = date_str[:7]
+    return {
+        "date": date_str,
+        "update_time": report.get('报告信息', {}).get('生成时间', ''),
+        "source": "大智慧涨停透视",
+        "files": {
+            "json": f"dzh_ztts/{year_month}/{date_str}.json",
+            "txt": f"dzh_ztts/{year_month}/{date_str}.txt"
+        },
+        "core_data": {
+            "涨停数量": report.get('核心指标', {}).get('涨停数量'),
+            "封板率": report.get('核心指标', {}).get('封板率'),
+            "最高板数": report.get('核心指标', {}).get('最高板数'),
+            "活跃资金情绪": report.get('核心指标', {}).get('活跃资金情绪')
+        },
+        "market_analysis": report.get('市场分析', {}).get('完整解读', '')[:200] + "..."
+    }
+
+def save_index(dates_data):
+    """按日期升序写入索引文件"""
+    index_path = os.path.join(DATA_DIR, 'index.json')
+    dates_data = dict(sorted(dates_data.items()))
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(dates_data, f, ensure_ascii=False, indent=2)
+    return dates_data
+
+def update_index(reports):
+    """增量更新索引：只替换刚保存的日期（{日期: JSON报告}），不再重新解析历史报告"""
     try:
         index_path = os.path.join(DATA_DIR, 'index.json')
         dates_data = {}
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                try:
+                    dates_data = json.load(f)
+                    if not isinstance(dates_data, dict):
+                        dates_data = {}
+                except:
+                    dates_data = {}
+        
+        if not dates_data:
+            # 索引缺失或损坏时全量重建一次
+            return rebuild_index()
+        
+        for date_str, report in reports.items():
+            dates_data[date_str] = build_index_entry(date_str, report)
+        dates_data = save_index(dates_data)
+        
+        print(f"📑 索引文件已更新: {', '.join(sorted(reports))}，共 {len(dates_data)} 条记录")
+        
+    except Exception as e:
+        print(f"❌ 更新索引文件失败: {e}")
+
+def rebuild_index():
+    """全量重建索引（修复用）：遍历所有月份目录并重新解析每日报告"""
+    try:
+        dates_data = {}
         
         if os.path.exists(DATA_DIR):
             for year_month in os.listdir(DATA_DIR):
@@ -669,75 +906,173 @@ def update_index():
                                 with open(file_path, 'r', encoding='utf-8') as f:
                                     data = json.load(f)
                                 
-                                dates_data[date_str] = {
-                                    "date": date_str,
-                                    "update_time": data.get('报告信息', {}).get('生成时间', ''),
-                                    "source": "大智慧涨停透视",
-                                    "files": {
-                                        "json": f"dzh_ztts/{year_month}/{filename}",
-                                        "txt": f"dzh_ztts/{year_month}/{date_str}.txt"
-                                    },
-                                    "core_data": {
-                                        "涨停数量": data.get('核心指标', {}).get('涨停数量'),
-                                        "封板率": data.get('核心指标', {}).get('封板率'),
-                                        "最高板数": data.get('核心指标', {}).get('最高板数'),
-                                        "活跃资金情绪": data.get('核心指标', {}).get('活跃资金情绪')
-                                    },
-                                    "market_analysis": data.get('市场分析', {}).get('完整解读', '')[:200] + "..."
-                                }
+                                dates_data[date_str] = build_index_entry(date_str, data)
                             except:
                                 continue
         
-        with open(index_path, 'w', encoding='utf-8') as f:
-            json.dump(dates_data, f, ensure_ascii=False, indent=2)
+        dates_data = save_index(dates_data)
         
-        print(f"📑 索引文件已更新: {len(dates_data)} 条记录")
+        print(f"📑 索引文件已重建: {len(dates_data)} 条记录")
         
     except Exception as e:
-        print(f"❌ 更新索引文件失败: {e}")
+        print(f"❌ 重建索引文件失败: {e}")
+
+def prefetch_ladders(date_strs, max_workers=LADDER_FETCH_WORKERS):
+    """并发获取多个交易日的 getZttdData 原始数据，返回 {日期: 数据或None}"""
+    print(f"🌐 并发获取 {len(date_strs)} 个交易日的涨停梯队...")
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda d: fetch_api_service('getZttdData', d), date_strs))
+    ladders = dict(zip(date_strs, results))
+    print(f"✅ 涨停梯队获取完成: {sum(1 for v in results if v is not None)}/{len(date_strs)}")
+    return ladders
+
+def collect_data(target_date, wait_timeout=WAIT_TIME, crawler=None, ladders=None, lean_profile=LEAN_PROFILE):
+    """用浏览器采集页面数据，返回 (数据, 实际数据日期)
+    
+    crawler / ladders 由批量回补传入：复用的浏览器采集器（不在此关闭）、
+    预先获取的 {日期: getZttdData 数据}。
+    lean_profile: 需要新建浏览器时是否使用精简配置。
+    """
+    ladders = ladders or {}
+    date_str = target_date.strftime('%Y-%m-%d')
+    
+    if not import_selenium():
+        print("❌ 未安装 selenium，无法使用浏览器采集")
+        return None, target_date
+    
+    if crawler is None:
+        crawler = ZTTSCrawler(target_date, wait_timeout, lean_profile)
+        data = crawler.crawl_data()
+    else:
+        items = ladders.get(date_str)
+        data = crawler.crawl_date(target_date, process_ladder_data(items) if items else None)
+    return data, crawler.actual_date or target_date
+
+def save_report(data, actual_date):
+    """生成并保存单日 JSON/TXT 报告，返回 (文件路径, JSON报告, 格式化器)"""
+    formatter = DataFormatter(data, actual_date)
+    
+    json_report = formatter.generate_json()
+    txt_report = formatter.generate_txt()
+    
+    paths = get_file_paths(actual_date)
+    
+    with open(paths['json'], 'w', encoding='utf-8') as f:
+        json.dump(json_report, f, ensure_ascii=False, indent=2, default=record_to_dict)
+    
+    with open(paths['txt'], 'w', encoding='utf-8') as f:
+        f.write(txt_report)
+    
+    print(f"📁 文件保存成功:")
+    print(f"   JSON: {paths['json']}")
+    print(f"   TXT:  {paths['txt']}")
+    return paths, json_report, formatter
+
+def backfill(start_date, end_date, wait_timeout=WAIT_TIME, dates=None, on_result=None, push=True,
+             lean_profile=LEAN_PROFILE):
+    """批量回补日期区间：复用一个浏览器逐日采集，涨停梯队并发预取，最后统一更新索引
+    
+    dates 指定时只采集这些交易日（忽略 start_date / end_date）；
+    on_result(日期, 是否成功) 在每个日期结束后调用，供调用方记录进度。
+    """
+    dates = sorted(dates) if dates is not None else trading_days(start_date, end_date)
+    if not dates:
+        print(f"❌ {start_date} ~ {end_date} 没有交易日")
+        return False
+    
+    print(f"🚀 涨停透视批量回补: {dates[0]} ~ {dates[-1]}，共 {len(dates)} 个交易日")
+    date_strs = [d.strftime('%Y-%m-%d') for d in dates]
+    ladders = prefetch_ladders(date_strs)
+    
+    crawler = ZTTSCrawler(dates[0], wait_timeout, lean_profile)
+    reports = {}
+    failed = []
+    try:
+        for i, target_date in enumerate(dates, 1):
+            print(f"\n[{i}/{len(dates)}] 📅 {target_date}")
+            try:
+                data, actual_date = collect_data(target_date, wait_timeout, crawler, ladders)
+                if not data:
+                    failed.append(str(target_date))
+                    continue
+                if actual_date != target_date:
+                    # 页面没能切换到目标日期，不覆盖其他日期的数据
+                    print(f"⚠️ 实际数据日期 {actual_date} 与目标日期不一致，跳过")
+                    failed.append(str(target_date))
+                    continue
+                paths, json_report, _ = save_report(data, actual_date)
+                reports[paths['date_str']] = json_report
+            except Exception as e:
+                print(f"❌ {target_date} 采集失败: {e}")
+                failed.append(str(target_date))
+            finally:
+                if on_result:
+                    on_result(str(target_date), str(target_date) not in failed)
+    finally:
+        crawler.close()
+        # 中途中断时已保存的日期也要进索引
+        if reports:
+            update_index(reports)
+    
+    print(f"\n📊 回补完成: 成功 {len(reports)} 天，失败 {len(failed)} 天")
+    if failed:
+        print(f"   失败日期: {', '.join(failed)}")
+    
+    if reports and push:
+        git_push_data(f"{date_strs[0]} ~ {date_strs[-1]}")
+    return not failed
 
 def main():
     """主函数"""
     # 解析命令行参数
-    if len(sys.argv) > 1:
-        target_date = parse_date(sys.argv[1])
+    lean_profile = LEAN_PROFILE and '--full-profile' not in sys.argv
+    wait_timeout = WAIT_TIME
+    for arg in sys.argv[1:]:
+        if arg.startswith('--wait='):
+            value = arg.split('=', 1)[1]
+            try:
+                wait_timeout = float(value)
+            except ValueError:
+                wait_timeout = 0
+            if wait_timeout <= 0:
+                print(f"❌ 无效的等待时间: {value}（应为正的秒数，例如 --wait=40）")
+                print(__doc__)
+                return False
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    
+    if args and args[0] == 'rebuild_index':
+        rebuild_index()
+        return True
+    elif len(args) >= 2:
+        return backfill(parse_date(args[0]), parse_date(args[1]), wait_timeout, lean_profile=lean_profile)
+    elif args:
+        target_date = parse_date(args[0])
+        if not is_trading_day(target_date):
+            target_date = latest_trading_day(target_date)
+            print(f"📅 指定日期不是交易日，改为最近交易日: {target_date}")
     else:
+        # 定时任务在非交易日直接退出，不启动浏览器
+        if not check_trading_day("涨停透视数据爬取", datetime.now().date()):
+            return False
         target_date = get_latest_trading_day()
     
     print(f"🚀 涨停透视数据爬虫启动")
     print(f"📅 目标日期: {target_date}")
     
     # 爬取数据
-    crawler = ZTTSCrawler(target_date)
-    data = crawler.crawl_data()
+    data, actual_date = collect_data(target_date, wait_timeout, lean_profile=lean_profile)
     
     if not data:
         print("❌ 爬取失败")
         return False
     
-    # 格式化数据
-    actual_date = crawler.actual_date or target_date
-    formatter = DataFormatter(data, actual_date)
-    
-    json_report = formatter.generate_json()
-    txt_report = formatter.generate_txt()
-    
-    # 保存文件
-    paths = get_file_paths(actual_date)
-    
     try:
-        with open(paths['json'], 'w', encoding='utf-8') as f:
-            json.dump(json_report, f, ensure_ascii=False, indent=2)
-        
-        with open(paths['txt'], 'w', encoding='utf-8') as f:
-            f.write(txt_report)
+        # 格式化并保存文件
+        paths, json_report, formatter = save_report(data, actual_date)
         
-        print(f"📁 文件保存成功:")
-        print(f"   JSON: {paths['json']}")
-        print(f"   TXT:  {paths['txt']}")
-        
-        # 更新索引文件
-        update_index()
+        # 更新索引文件（只更新当天条目）
+        update_index({paths['date_str']: json_report})
         
         # 显示关键指标
         print(f"\n📈 关键指标:")
@@ -783,4 +1118,9 @@ def main():
         return False
 
 if __name__ == "__main__":
-    main()
+    import profiler
+    profile_options = profiler.pop_profile_args(sys.argv)
+    if profile_options:
+        profiler.run_profiled(main, profile_options, profiler.profile_name(sys.argv))
+    else:
+        main()